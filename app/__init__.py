@@ -27,7 +27,8 @@ CAPTCHA_CONFIG = {
 }
 
 def setup_logger():
-    log = Logger()
+    from .config import Config
+    log = Logger(level=Config.LOG_LEVEL, log_format=Config.LOG_FORMAT)
 
     return log
 
@@ -42,7 +42,12 @@ CREATE TABLE `test_runs`  (
   `status` int(0) NOT NULL COMMENT '系统状态（1--正常 2--错误 3--卡住 4--新状态） ',
   `type` int(0) NOT NULL COMMENT '操作类型（1-唤醒操作 2-休眠操作）',
   `strategy` int(0) NOT NULL,
-  PRIMARY KEY (`run_id`) USING BTREE
+  PRIMARY KEY (`run_id`) USING BTREE,
+  INDEX `ix_test_runs_round_type_run`(`round_id`, `type`, `run_id`) USING BTREE,
+  INDEX `ix_test_runs_round_strategy_run`(`round_id`, `strategy`, `run_id`) USING BTREE,
+  INDEX `ix_test_runs_type`(`type`) USING BTREE,
+  INDEX `ix_test_runs_round_status_strategy_duration`(`round_id`, `status`, `strategy`, `actual_duration`) USING BTREE,
+  INDEX `ix_test_runs_status_strategy`(`status`, `strategy`) USING BTREE
 ) ENGINE = InnoDB AUTO_INCREMENT = 2860 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '测试记录表' ROW_FORMAT = Dynamic;
 
 SET FOREIGN_KEY_CHECKS = 1;
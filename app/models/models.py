@@ -28,6 +28,13 @@ t_test_run_log_relation = db.Table(
 
 class TestRuns(db.Model):
     __tablename__ = 'test_runs'
+    __table_args__ = (
+        db.Index('ix_test_runs_round_type_run', 'round_id', 'type', 'run_id'),
+        db.Index('ix_test_runs_round_strategy_run', 'round_id', 'strategy', 'run_id'),
+        db.Index('ix_test_runs_type', 'type'),
+        db.Index('ix_test_runs_round_status_strategy_duration', 'round_id', 'status', 'strategy', 'actual_duration'),
+        db.Index('ix_test_runs_status_strategy', 'status', 'strategy'),
+    )
 
     run_id = db.Column(db.Integer, primary_key=True, info='自增id')
     actual_input = db.Column(db.JSON, nullable=False, info='实际输入')
@@ -4,17 +4,26 @@ import threading
 import time
 import io
 import zipfile
+import numpy as np
 from ..base import base
 from .. import setup_logger
 from app.config import Config as DefaultConfig
 from app.services.process_control import ProcessCtrl
+from app.services.campaign_coordinator import CampaignCoordinator
+from app.services.platform_client import get_bench_urls
+from app.services.campaign_stats import get_campaign_stats
+from app.services.chart_data import DETAIL_JSON_FIELDS, get_chart_service, parse_fields, parse_record
+from app.services.signal_store import get_signal_store
+from app.services.replay_diff import replay_diff
+from app.services.replay_runner import replay_db_paths
 from app.services.database_handler import TestResultHandler
+from app.services.schema_check import missing_indexes, create_missing_indexes
 
 _lock = threading.Lock()
 _thread = None
 _controller = None
 _logger = setup_logger()
-_status = {"running": False, "start_time": None, "base_run_id": None}
+_status = {"running": False, "start_time": None}
 
 class AppConfigProxy:
     def __getattr__(self, name):
@@ -51,17 +60,28 @@ def serve_assets(filename):
     assets_dir = os.path.join(root, "frontend", "dist", "assets")
     return send_from_directory(assets_dir, filename)
 
+def _campaign_db_url():
+    """测试任务写入的数据库（与 ProcessCtrl 一致：优先 DATABASE）"""
+    return current_app.config.get("DATABASE") or current_app.config.get("SQLALCHEMY_DATABASE_URI",
+                                                                        os.path.join("app", "db.db"))
+
 def _run_controller(app_obj):
     global _controller
     cfg = AppConfigProxy()
-    _controller = ProcessCtrl(_logger, cfg, app_obj)
+    # 多台架且开启多进程执行时，每个台架一个工作进程执行一个分片
+    bench_urls = get_bench_urls(cfg)
+    mode = (getattr(cfg, "MODE", "") or "").strip().upper()
+    replay_mode = (getattr(cfg, "REPLAY_MODE", "REPLAY") or "").strip().upper()
+    if getattr(cfg, "CAMPAIGN_PROCESSES", False) and len(bench_urls) > 1 and mode != replay_mode:
+        _controller = CampaignCoordinator(_logger, cfg, bench_urls, app_obj)
+    else:
+        _controller = ProcessCtrl(_logger, cfg, app_obj)
     try:
         _controller.run()
     finally:
         with _lock:
             _status["running"] = False
             _status["start_time"] = None
-            _status["base_run_id"] = None
 
 @base.route("/control/start", methods=["POST"])
 def start_control():
@@ -71,29 +91,8 @@ def start_control():
             return jsonify({"ok": 0, "message": "already running"}), 409
         _status["running"] = True
         _status["start_time"] = int(time.time())
-        # 记录启动时的 run_id 基线
-        try:
-            db_path = current_app.config.get("DATABASE")
-            if not db_path:
-                db_url = current_app.config.get("SQLALCHEMY_DATABASE_URI", os.path.join("app", "db.db"))
-                if db_url.startswith("sqlite:///"):
-                    db_path = db_url.replace("sqlite:///", "")
-                else:
-                    db_path = db_url
-
-            import sqlite3
-            conn = sqlite3.connect(db_path)
-            cur = conn.cursor()
-            cur.execute("SELECT MAX(run_id) FROM test_runs")
-            row = cur.fetchone()
-            _status["base_run_id"] = int(row[0]) if row and row[0] is not None else 0
-        except Exception:
-            _status["base_run_id"] = 0
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
+        # 运行计数清零，之后由每条测试结果提交时累加
+        get_campaign_stats(_campaign_db_url()).start()
         _thread = threading.Thread(target=_run_controller, args=(current_app._get_current_object(),), daemon=True)
         _thread.start()
     return jsonify({"ok": 1})
@@ -112,35 +111,22 @@ def control_status():
     running = False
     with _lock:
         running = _status["running"]
-    db_url = current_app.config.get("SQLALCHEMY_DATABASE_URI", os.path.join("app", "db.db"))
-    conn = None
-    runs_since_start = 0
-    exceptions_since_start = 0
-    base_run_id = _status.get("base_run_id") or 0
-    try:
-        import sqlite3
-        conn = sqlite3.connect(db_url)
-        cur = conn.cursor()
-        # 计算自启动以来新增条数
-        cur.execute("SELECT MAX(run_id) FROM test_runs")
-        row = cur.fetchone()
-        latest_run_id = int(row[0]) if row and row[0] is not None else base_run_id
-        runs_since_start = max(0, latest_run_id - base_run_id)
-        # 计算自启动以来异常条数
-        cur.execute("SELECT COUNT(1) FROM test_runs WHERE run_id > ? AND (status != 1 OR strategy < 0)", (base_run_id,))
-        erow = cur.fetchone()
-        exceptions_since_start = int(erow[0]) if erow and erow[0] is not None else 0
-    except Exception:
-        runs_since_start = 0
-        exceptions_since_start = 0
-    finally:
-        if conn:
-            conn.close()
-    if not running:
-        runs_since_start = 0
-        exceptions_since_start = 0
     goal = getattr(DefaultConfig, "RUN_TIMES", 0)
-    return jsonify({"running": running, "runs": runs_since_start, "goal": goal, "exceptions": exceptions_since_start})
+    # 自启动以来的运行计数（内存中累加，不访问数据库）
+    stats = get_campaign_stats(_campaign_db_url()).snapshot(goal)
+    if not running:
+        stats.update(runs=0, exceptions=0, statusCounts={}, throughput=0, eta=None)
+    # 测试平台各接口耗时统计
+    latency = {}
+    if _controller is not None and getattr(_controller, "platform_client", None) is not None:
+        latency = _controller.platform_client.latency_stats()
+    # 多进程执行时各分片的进度
+    shards = []
+    if _controller is not None and hasattr(_controller, "shard_status"):
+        shards = _controller.shard_status()
+    return jsonify({"running": running, "runs": stats["runs"], "goal": goal, "exceptions": stats["exceptions"],
+                    "statusCounts": stats["statusCounts"], "throughput": stats["throughput"], "eta": stats["eta"],
+                    "latency": latency, "shards": shards})
 
 def _tail_lines(file_path, max_lines):
     try:
@@ -263,11 +249,21 @@ def save_config():
 
 @base.route("/charts/data", methods=["GET"])
 def get_charts_data():
-    """获取图表数据，从数据库读取 test_runs 表，包含 JSON 字段用于信号对比"""
+    """获取图表数据，从数据库读取 test_runs 表，包含 JSON 字段用于信号对比
+    分页：start/end 按序号取记录；after/before（run_id 游标）与 limit 按主键范围取记录，响应带 nextAfter/prevBefore
+    fields：逗号分隔的返回字段，列表视图只取标量列，完整记录通过 /charts/run/<run_id> 获取
+    """
     global _temp_db_path
     round_id = request.args.get("round_id", None)
     start_idx = request.args.get("start", 1, type=int)
     end_idx = request.args.get("end", 100, type=int)
+    after = request.args.get("after", None, type=int)
+    before = request.args.get("before", None, type=int)
+    limit = request.args.get("limit", None, type=int)
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"ok": 0, "message": str(e)}), 400
     
     # 优先使用上传的数据库
     if _temp_db_path and os.path.exists(_temp_db_path):
@@ -275,125 +271,10 @@ def get_charts_data():
     else:
         db_url = current_app.config.get("SQLALCHEMY_DATABASE_URI", os.path.join("app", "db.db"))
     
-    conn = None
     try:
-        import sqlite3
-        import json as json_module
-        conn = sqlite3.connect(db_url)
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        
-        # 获取所有轮次
-        cur.execute("SELECT DISTINCT round_id FROM test_runs ORDER BY round_id")
-        rounds = [row[0] for row in cur.fetchall()]
-        
-        # 计算 LIMIT 和 OFFSET
-        limit = end_idx - start_idx + 1
-        offset = start_idx - 1
-        
-        # 获取测试记录（包含 JSON 字段）
-        if round_id:
-            cur.execute("""
-                SELECT run_id, round_id, type, status, strategy, expected_duration, actual_duration,
-                       actual_input, expected_output, actual_output
-                FROM test_runs 
-                WHERE round_id = ? 
-                ORDER BY run_id ASC 
-                LIMIT ? OFFSET ?
-            """, (round_id, limit, offset))
-        else:
-            cur.execute("""
-                SELECT run_id, round_id, type, status, strategy, expected_duration, actual_duration,
-                       actual_input, expected_output, actual_output
-                FROM test_runs 
-                ORDER BY run_id ASC 
-                LIMIT ? OFFSET ?
-            """, (limit, offset))
-        
-        rows = cur.fetchall()
-        records = []
-        for row in rows:
-            # 解析 JSON 字段
-            actual_input = None
-            expected_output = None
-            actual_output = None
-            
-            try:
-                if row[7]:
-                    actual_input = json_module.loads(row[7]) if isinstance(row[7], str) else row[7]
-            except:
-                pass
-            try:
-                if row[8]:
-                    expected_output = json_module.loads(row[8]) if isinstance(row[8], str) else row[8]
-            except:
-                pass
-            try:
-                if row[9]:
-                    actual_output = json_module.loads(row[9]) if isinstance(row[9], str) else row[9]
-            except:
-                pass
-            
-            records.append({
-                "run_id": row[0],
-                "round_id": row[1],
-                "type": row[2],
-                "status": row[3],
-                "strategy": row[4],
-                "expected_duration": row[5],
-                "actual_duration": row[6],
-                "actual_input": actual_input,
-                "expected_output": expected_output,
-                "actual_output": actual_output
-            })
-        
-        # 统计信息
-        if round_id:
-            cur.execute("SELECT COUNT(*) FROM test_runs WHERE round_id = ?", (round_id,))
-        else:
-            cur.execute("SELECT COUNT(*) FROM test_runs")
-        total = cur.fetchone()[0]
-        
-        if round_id:
-            cur.execute("SELECT COUNT(*) FROM test_runs WHERE round_id = ? AND status = 1", (round_id,))
-        else:
-            cur.execute("SELECT COUNT(*) FROM test_runs WHERE status = 1")
-        normal = cur.fetchone()[0]
-        
-        if round_id:
-            cur.execute("SELECT COUNT(*) FROM test_runs WHERE round_id = ? AND (status != 1 OR strategy < 0)", (round_id,))
-        else:
-            cur.execute("SELECT COUNT(*) FROM test_runs WHERE status != 1 OR strategy < 0")
-        error = cur.fetchone()[0]
-        
-        if round_id:
-            cur.execute("SELECT AVG(actual_duration) FROM test_runs WHERE round_id = ?", (round_id,))
-        else:
-            cur.execute("SELECT AVG(actual_duration) FROM test_runs")
-        avg_row = cur.fetchone()
-        avg_duration = round(avg_row[0], 2) if avg_row[0] else 0
-        
-        # 状态分布统计
-        status_counts = {}
-        for s in [1, 2, 3, 4]:
-            if round_id:
-                cur.execute("SELECT COUNT(*) FROM test_runs WHERE round_id = ? AND status = ?", (round_id, s))
-            else:
-                cur.execute("SELECT COUNT(*) FROM test_runs WHERE status = ?", (s,))
-            status_counts[s] = cur.fetchone()[0]
-        
-        return jsonify({
-            "rounds": rounds,
-            "records": records,
-            "stats": {
-                "total": total,
-                "normal": normal,
-                "error": error,
-                "avgDuration": avg_duration
-            },
-            "statusCounts": status_counts
-        })
-        
+        # 统计由一条分组聚合查询得到，数据库未变化时统计与记录页都直接取缓存
+        return jsonify(get_chart_service(db_url).chart_data(round_id or None, start_idx, end_idx, fields=fields,
+                                                            after=after, before=before, limit=limit))
     except Exception as e:
         return jsonify({
             "rounds": [],
@@ -402,9 +283,83 @@ def get_charts_data():
             "statusCounts": {1: 0, 2: 0, 3: 0, 4: 0},
             "error": str(e)
         })
-    finally:
-        if conn:
-            conn.close()
+
+
+@base.route("/charts/run/<int:run_id>", methods=["GET"])
+def get_chart_run(run_id):
+    """获取单条测试记录详情（含完整 JSON 字段），供记录列表按需加载"""
+    try:
+        handler = TestResultHandler(_logger, get_charts_db_path())
+        row = handler.get_test_run_by_id(run_id)
+    except Exception as e:
+        return jsonify({"ok": 0, "message": str(e)}), 500
+    if row is None:
+        return jsonify({"ok": 0, "message": "run not found"}), 404
+    return jsonify({"ok": 1, "record": parse_record(row, DETAIL_JSON_FIELDS)})
+
+
+# /charts/signals 单次最多返回的数据点数
+MAX_SIGNAL_POINTS = 100000
+
+@base.route("/charts/signals", methods=["GET"])
+def get_chart_signals():
+    """获取信号时间序列（列式信号存储，按数据序号切片）
+    names：逗号分隔的信号名称，为空时返回可用信号列表
+    start/end：数据序号范围（从1开始，含 end），默认全部
+    common=1：只返回所有信号都有值的数据点
+    """
+    try:
+        db_path = get_charts_db_path()
+        store = get_signal_store(db_path)
+        # 上传的数据库不会再写入，run_id 空缺无需等待
+        store.sync(settle_gaps=db_path != _temp_db_path)
+    except Exception as e:
+        return jsonify({"ok": 0, "message": str(e)}), 500
+    count = store.count
+    names = [name.strip() for name in request.args.get("names", "").split(",") if name.strip()]
+    if not names:
+        return jsonify({"ok": 1, "count": count, "names": store.names()})
+    unknown = [name for name in names if name not in store.names()]
+    if unknown:
+        return jsonify({"ok": 0, "message": f"未知信号: {', '.join(unknown)}"}), 400
+
+    start = max(1, request.args.get("start", 1, type=int))
+    end = min(count, request.args.get("end", count, type=int), start + MAX_SIGNAL_POINTS - 1)
+    series = {name: store.series(name, start - 1, end) for name in names}
+    positions = np.arange(start - 1, max(start - 1, end))
+    if request.args.get("common") in ("1", "true"):
+        mask = np.ones(len(positions), dtype=bool)
+        for values in series.values():
+            mask &= ~np.isnan(values)
+        positions = positions[mask]
+        series = {name: values[mask] for name, values in series.items()}
+    run_ids = store.run_ids(start - 1, end)[positions - (start - 1)]
+    return jsonify({
+        "ok": 1,
+        "count": count,
+        "indexes": (positions + 1).tolist(),
+        "runIds": run_ids.tolist(),
+        "series": {name: [None if value != value else value for value in np.asarray(values).tolist()]
+                   for name, values in series.items()},
+    })
+
+
+@base.route("/charts/replay-diff", methods=["GET"])
+def get_replay_diff():
+    """回放结果对比：按源 run_id 对比源库与回放库的状态/策略变化及耗时差分位数
+    start/end：源 run_id 范围（含），默认使用回放配置 REPLAY_START_RUN_ID / REPLAY_END_RUN_ID
+    """
+    cfg = AppConfigProxy()
+    start = request.args.get("start", cfg.REPLAY_START_RUN_ID, type=int)
+    end = request.args.get("end", cfg.REPLAY_END_RUN_ID, type=int)
+    source_path, replay_path = replay_db_paths(cfg)
+    try:
+        report = replay_diff(source_path, replay_path, start, end)
+    except FileNotFoundError as e:
+        return jsonify({"ok": 0, "message": str(e)}), 404
+    except Exception as e:
+        return jsonify({"ok": 0, "message": str(e)}), 500
+    return jsonify(dict(report, ok=1, source=source_path, replay=replay_path, start=start, end=end))
 
 
 # 用于存储当前使用的临时数据库路径
@@ -443,6 +398,11 @@ def upload_charts_db():
             conn.close()
             os.remove(temp_path)
             return jsonify({"ok": 0, "message": "Database does not contain test_runs table"}), 400
+        # 旧数据库缺少常用查询索引时报告，并在上传副本上补建
+        missing = missing_indexes(conn)
+        if missing:
+            _logger.warn(f"上传的数据库缺少索引: {missing}，正在补建")
+            create_missing_indexes(conn)
         conn.close()
     except Exception as e:
         if os.path.exists(temp_path):
@@ -452,7 +412,8 @@ def upload_charts_db():
     # 保存临时数据库路径
     _temp_db_path = temp_path
     
-    return jsonify({"ok": 1, "message": "Database uploaded successfully", "filename": filename})
+    return jsonify({"ok": 1, "message": "Database uploaded successfully", "filename": filename,
+                    "missingIndexes": missing})
 
 
 def get_charts_db_path():
@@ -0,0 +1,28 @@
+"""
+测试平台接口交互模块（异步版本）
+与 bq_api 中的复位/读取/发送逻辑完全一致，请求放到线程池中执行，
+复用调用方持有的连接池客户端，供 asyncio 执行引擎并发驱动多个台架。
+"""
+
+import asyncio
+import functools
+
+from .bq_api import api_reset, read_api, send_api
+
+
+async def _run_blocking(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
+
+
+# 复位API
+async def api_reset_async(self):
+    return await _run_blocking(api_reset, self)
+
+
+async def read_api_async(self):
+    return await _run_blocking(read_api, self)
+
+
+async def send_api_async(self, signal_data):
+    return await _run_blocking(send_api, self, signal_data)
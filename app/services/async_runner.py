@@ -0,0 +1,202 @@
+"""
+多台架异步执行引擎
+从变异模块的用例池中取出用例，分发到多个测试平台台架并发执行，
+每个台架的并发用例数受 BENCH_CONCURRENCY 限制，结果仍按当前轮次 round_id 写入 test_runs。
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .async_bq_api import api_reset_async, read_api_async, send_api_async
+from .database_handler import TestResultHandler
+from .platform_client import BenchConfig, get_platform_client
+from .result_judge import ResultJudge, INITIAL_SIGNAL_VALUES
+from .signal_table import SignalTable
+from .state_waiter import StateWaiter
+
+
+class AsyncResultJudge(ResultJudge):
+    """异步结果判断模块：判定逻辑与ResultJudge一致，平台交互与等待使用协程"""
+
+    async def process_test_data_async(self, test_data_in: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        处理测试数据并执行测试（协程版本）
+
+        Args:
+            test_data_in: 用例数据
+
+        Returns:
+            Dict: 处理结果
+        """
+        try:
+            test_data = self._normalize_test_data(test_data_in)
+            return await self.judge_test_result_async(test_data)
+        except Exception as e:
+            self.logger.error(f"处理测试数据时发生错误: {str(e)}")
+            return {"status": "error", "message": f"处理测试数据时发生错误: {str(e)}"}
+
+    async def judge_test_result_async(self, test_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        判断测试结果（协程版本），流程与 judge_test_result 相同
+
+        Args:
+            test_data: 测试数据
+
+        Returns:
+            Dict: 判断结果，包含strategy、stop_signal和in_data
+        """
+        self.logger.info("开始判断测试结果")
+        loop = asyncio.get_running_loop()
+
+        # 每次运行策略初始化为0
+        self.new_processing_strategy = 0
+        self.stop_signal = False
+
+        db = TestResultHandler(self.logger, self.db_url)
+        in_data = test_data.get("in_data", [])
+        failed = {"strategy": -1, "stop_signal": True, "in_data": in_data}
+
+        try:
+            self.test_times += 1
+            self.expected_results = test_data.get("expected_results", [])
+            self.signal_table = SignalTable(self.signal_mapping, self.expected_results)
+
+            # 先读取一次信号，确认平台可用
+            initial_signals = await read_api_async(self)
+            if initial_signals.get("status") != "success":
+                self.logger.error(f"读取初始信号失败: {initial_signals.get('message')}")
+                return failed
+            self.initial_signal_values = dict(INITIAL_SIGNAL_VALUES)
+
+            # 发送输入信号
+            if not in_data:
+                return failed
+            send_result = await send_api_async(self, in_data)
+            if send_result.get("ok") != 1:
+                return failed
+
+            est_time = 20
+            waiter = StateWaiter(self.config, est_time)
+            target_state = self._resolve_target_state()
+            self.signal_table.reset_baseline()
+
+            # 在预期时间内按自适应间隔读取信号
+            async for _ in waiter.polls_async():
+                result = await read_api_async(self)
+                if self._is_result_abnormal(result):
+                    self._save_error_info(result)
+                    if not self._should_continue_test(result):
+                        self.logger.info("非预期异常，退出测试")
+                        return failed
+                else:
+                    # 整车状态未变化时无需重新判断
+                    if not self._vehicle_state_moved(result):
+                        continue
+                    vehicle_state = self._extract_vehicle_state(result)
+                    waiter.observe(vehicle_state)
+                    if vehicle_state is not None and vehicle_state == target_state:
+                        self.logger.info("测试通过，整车状态达到目标值: %s", target_state)
+                        duration = waiter.elapsed_ms(result)
+                        self.run_id = await loop.run_in_executor(
+                            None,
+                            lambda: db.store_test_result(
+                                duration,
+                                test_data=test_data,
+                                result_data=self._storable_result(result),
+                                strategy=0,
+                                round_id=self.round_id,
+                                run_id=self.replay_run_id
+                            )
+                        )
+                        self.logger.info("数据插入成功，run_id: %s", self.run_id)
+                        return await loop.run_in_executor(None, self._finish_case, in_data)
+
+            self.logger.info("预期时间结束，未得到明确结果，默认继续测试")
+
+        except Exception as err:
+            self.logger.error(f"测试结果判断过程中发生错误: {str(err)}")
+
+        return await loop.run_in_executor(None, self._finish_case, in_data)
+
+
+class AsyncCampaignRunner:
+    """多台架异步执行引擎：共享一个用例池，按台架分发并发执行"""
+
+    def __init__(self, logger, config, bench_urls: List[str], round_id: int, app=None,
+                 concurrency: Optional[int] = None, should_stop: Optional[Callable[[], bool]] = None):
+        """
+        :param bench_urls: 测试平台台架基础URL列表
+        :param round_id: 当前轮次id，结果按该轮次写入 test_runs
+        :param concurrency: 每个台架同时执行的用例数，默认读取 BENCH_CONCURRENCY
+        :param should_stop: 外部停止信号回调
+        """
+        self.logger = logger
+        self.config = config
+        self.bench_urls = list(bench_urls)
+        self.round_id = round_id
+        self.app = app
+        self.concurrency = max(1, int(concurrency or getattr(config, "BENCH_CONCURRENCY", 1) or 1))
+        self.should_stop = should_stop or (lambda: False)
+        # 用例运行策略要求停止
+        self.stop_signal = False
+        # 处理测试数据失败，结束本轮
+        self.failed = False
+        self.completed = {url: 0 for url in self.bench_urls}
+
+    def run(self, data_variation) -> Dict[str, Any]:
+        """
+        执行用例池中的全部用例，直到用例取完或收到停止信号
+        :param data_variation: 测试输入数据变异模块实例（提供 pop_first_data）
+        :return: dict - stop_signal / failed / completed(各台架完成用例数)
+        """
+        return asyncio.run(self._run(data_variation))
+
+    async def _run(self, data_variation) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        workers = len(self.bench_urls) * self.concurrency
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=workers + 1, thread_name_prefix="bench"))
+
+        await asyncio.gather(*(self._run_bench(url, data_variation) for url in self.bench_urls))
+        self.logger.info(f"多台架执行结束，各台架完成用例数: {self.completed}")
+        return {"stop_signal": self.stop_signal, "failed": self.failed, "completed": dict(self.completed)}
+
+    async def _run_bench(self, url: str, data_variation) -> None:
+        bench_config = BenchConfig(self.config, url)
+        client = get_platform_client(bench_config)
+        judges = [
+            AsyncResultJudge(self.logger, config=bench_config, round_id=self.round_id, app=self.app,
+                             platform_client=client)
+            for _ in range(self.concurrency)
+        ]
+
+        # 测试平台接口交互模块，台架开始执行前发送复位消息
+        if not await api_reset_async(judges[0]):
+            self.logger.error(f"台架 {url} 复位失败，不参与本轮执行")
+            return
+
+        await asyncio.gather(*(self._run_slot(url, judge, data_variation) for judge in judges))
+
+    async def _run_slot(self, url: str, judge: AsyncResultJudge, data_variation) -> None:
+        while not self._stopped():
+            # 测试输入数据变异模块---取出数据（事件循环单线程，无需加锁）
+            test_data = data_variation.pop_first_data()
+            if test_data is None:
+                break
+
+            result = await judge.process_test_data_async(test_data)
+
+            if 'status' in result:
+                self.logger.error(f"台架 {url} 测试结果判断模块---处理测试数据---失败")
+                self.failed = True
+                break
+
+            if result.get("stop_signal") is True:
+                self.logger.error(f"台架 {url} 测试结果判断模块---调用用例运行策略---停止")
+                self.stop_signal = True
+                break
+
+            self.completed[url] += 1
+
+    def _stopped(self) -> bool:
+        return self.stop_signal or self.failed or self.should_stop()
@@ -3,6 +3,17 @@ import time
 
 import requests
 
+from .platform_client import get_platform_client
+from ..utils.log_ctrl import LazyJson
+
+
+def _platform_client(self):
+    """优先使用调用方持有的共享客户端，否则按配置获取"""
+    client = getattr(self, "platform_client", None)
+    if client is None:
+        client = get_platform_client(self.config)
+    return client
+
 
 # 复位API
 def api_reset(self):
@@ -13,7 +24,7 @@ def api_reset(self):
             "type": 1,  # 1-恢复
             "signals": []  # 恢复模式下不需要指定信号
         }
-        response = requests.post(reset_url, json=reset_data)
+        response = _platform_client(self).post("reset", reset_url, json=reset_data)
         if response.status_code != 200:
             self.logger.error(f"测试平台接口交互模块---发送复位消息---失败: {response.text}")
             return False
@@ -46,7 +57,7 @@ def api_get_map(self):
         }
         # 发送 POST 请求
         try:
-            response = requests.post(url, json=data, headers=headers, verify=True)  # verify=True 表示验证 SSL 证书
+            response = _platform_client(self).post("mapping", url, json=data, headers=headers, verify=True)  # verify=True 表示验证 SSL 证书
 
             # 打印响应状态码和响应内容
             print(f"Status Code: {response.status_code}")
@@ -80,14 +91,22 @@ def read_api(self):
 
         # 准备请求数据（mock 平台期望: {"signals": [...]}）
         payload = {"signals": signal_names, "mode": 0}
+        client = _platform_client(self)
+        kwargs = {}
+        # 长轮询：平台挂起请求直到信号变化或等待超时，读取超时需加上等待时间
+        wait_ms = int(getattr(self.config, "READ_LONG_POLL_MS", 0) or 0)
+        if wait_ms > 0:
+            payload["waitMs"] = wait_ms
+            connect_timeout, read_timeout = client.timeouts.get("read", (2, 5))
+            kwargs["timeout"] = (connect_timeout, read_timeout + wait_ms / 1000.0)
 
         # 发送请求
-        response = requests.post(read_url, json=payload)
+        response = client.post("read", read_url, json=payload, **kwargs)
 
         # 解析响应
         if response.status_code == 200:
             result = response.json()
-            self.logger.info(f"API响应: {json.dumps(result, ensure_ascii=False)}")
+            self.logger.info("API响应: %s", LazyJson(result))
 
             if result.get("ok") == 1:
                 # 处理读取结果
@@ -140,13 +159,13 @@ def send_api(self, signal_data):
             })
 
         # 发送请求
-        self.logger.info(f"发送信号: {json.dumps(payload, ensure_ascii=False)}")
-        response = requests.post(send_url, json=payload)
+        self.logger.info("发送信号: %s", LazyJson(payload))
+        response = _platform_client(self).post("send", send_url, json=payload)
 
         # 解析响应
         if response.status_code == 200:
             result = response.json()
-            self.logger.info(f"API响应: {json.dumps(result, ensure_ascii=False)}")
+            self.logger.info("API响应: %s", LazyJson(result))
             return result
         else:
             self.logger.error(f"API请求失败，状态码: {response.status_code}")
@@ -0,0 +1,368 @@
+"""
+多进程分片执行
+每个台架启动一个工作进程，按种子用例序号把用例池切分为分片（第 k 个进程执行序号对进程数取余等于 k 的用例，
+第二轮执行属于该分片的新状态记录），各进程使用各自的测试平台URL；
+- 写入：工作进程不直接写数据库，插入语句经队列交给唯一的写入进程批量提交，run_id 由共享计数器分配；
+- 进度：工作进程把每条已提交结果的状态和日志发回主进程，由主进程累加到运行统计并写入主日志；
+- 轮次：所有分片完成本轮后才开始下一轮，下一轮基于数据库中的新状态生成用例。
+"""
+
+import multiprocessing
+import queue
+import random
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import Future, wait
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.config import Config as DefaultConfig
+from .campaign_stats import get_campaign_stats, is_exception, register_campaign_stats
+from .data_init import DataInit
+from .data_variation import DataVariation
+from .database_handler import TestResultHandler
+from .platform_client import BenchConfig
+from .process_control import ProcessCtrl
+from .sqlite_store import (SQLiteStore, load_max_id, open_reader, register_store, resolve_db_path,
+                           unregister_store)
+
+# 主进程读取进度事件的等待时间(秒)
+EVENT_POLL_INTERVAL = 0.2
+
+
+class _QueueLogger:
+    """工作进程/写入进程的日志：消息发回主进程，由主进程的日志对象记录"""
+
+    def __init__(self, events, prefix: str):
+        self._events = events
+        self._prefix = prefix
+
+    def _put(self, level: str, message, args, fields) -> None:
+        # 参数在工作进程内格式化为字符串，结构化字段原样随事件发送
+        if args:
+            message = message % args
+        self._events.put(("log", level, f"{self._prefix}{message}", fields))
+
+    def info(self, message, *args, **fields):
+        self._put("info", message, args, fields)
+
+    def error(self, message, *args, **fields):
+        self._put("error", message, args, fields)
+
+    def warn(self, message, *args, **fields):
+        self._put("warn", message, args, fields)
+
+    def debug(self, message, *args, **fields):
+        self._put("debug", message, args, fields)
+
+
+class _QueueStats:
+    """工作进程的运行统计：每条已提交结果的状态发回主进程"""
+
+    def __init__(self, events, shard: int):
+        self._events = events
+        self._shard = shard
+
+    def record(self, status: int, strategy: int) -> None:
+        self._events.put(("stored", self._shard, status, strategy))
+
+
+class _ConfigSnapshot:
+    """主进程配置的快照（工作进程中无法访问 Flask 应用配置）"""
+
+    def __init__(self, values: Dict[str, Any]):
+        self.__dict__.update(values)
+
+
+def config_snapshot(config) -> Dict[str, Any]:
+    """按 Config 中定义的配置项读取当前配置值，结果可传给子进程"""
+    values = {}
+    for name in dir(DefaultConfig):
+        if name.startswith("_") or callable(getattr(DefaultConfig, name)):
+            continue
+        values[name] = getattr(config, name, getattr(DefaultConfig, name))
+    return values
+
+
+class RemoteStore:
+    """
+    工作进程中的数据库访问，接口与 SQLiteStore 一致：
+    读取直接连接数据库文件；写入转发给写入进程，submit 返回的 Future 在写入进程提交后完成（不携带 lastrowid）；
+    自增主键从进程间共享的计数器分配。
+    """
+
+    def __init__(self, path: str, writes, shard: int, id_counters: Dict[str, Any], acks, logger=None):
+        """
+        :param path: 数据库文件路径
+        :param writes: 写入队列，元素为 (分片序号, sql, 参数)
+        :param shard: 分片序号
+        :param id_counters: {表名: 共享计数器}，计数器的值为已分配的最大主键
+        :param acks: 写入进程的本分片回执队列，按写操作顺序每条一个回执（成功为 None，失败为错误信息）
+        """
+        self.path = path
+        self.logger = logger
+        self._writes = writes
+        self._shard = shard
+        self._id_counters = id_counters
+        self._acks = acks
+        # 已转发、尚未收到回执的写操作，顺序与写入队列一致
+        self._pending = deque()
+        self._pending_lock = threading.Lock()
+        threading.Thread(target=self._ack_loop, name=f"campaign-acks-{shard}", daemon=True).start()
+
+    def connection(self) -> sqlite3.Connection:
+        """打开一条读连接（row_factory 为 sqlite3.Row），调用方用完后 close()"""
+        return open_reader(self.path)
+
+    def allocate_id(self, table: str, column: str) -> int:
+        """从共享计数器分配主键，只支持创建时提供了计数器的表"""
+        counter = self._id_counters[table]
+        with counter.get_lock():
+            counter.value += 1
+            return counter.value
+
+    def submit(self, sql: str, params: Sequence[Any] = ()) -> Future:
+        future = Future()
+        with self._pending_lock:
+            self._pending.append(future)
+            self._writes.put((self._shard, sql, tuple(params)))
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """写入屏障：等待本进程提交的写操作全部由写入进程提交到数据库"""
+        with self._pending_lock:
+            last = self._pending[-1] if self._pending else None
+        if last is None:
+            return True
+        # 回执按顺序到达，最后一条完成即全部完成
+        wait([last], timeout)
+        return last.done()
+
+    def _ack_loop(self) -> None:
+        while True:
+            error = self._acks.get()
+            with self._pending_lock:
+                if not self._pending:
+                    continue
+                future = self._pending.popleft()
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(sqlite3.DatabaseError(error))
+
+    def close(self) -> None:
+        self.flush()
+        unregister_store(self)
+
+
+def _acknowledge(acks, future) -> None:
+    error = future.exception()
+    acks.put(None if error is None else str(error))
+
+
+def writer_main(path: str, writes, events, acks: List[Any], batch_rows: Optional[int] = None,
+                batch_ms: Optional[int] = None) -> None:
+    """写入进程：按顺序提交各分片的写操作，收到 None 后提交剩余写操作并退出"""
+    logger = _QueueLogger(events, "[写入进程] ")
+    store = SQLiteStore(path, logger=logger, batch_rows=batch_rows, batch_ms=batch_ms)
+    try:
+        while True:
+            item = writes.get()
+            if item is None:
+                break
+            shard, sql, params = item
+            future = store.submit(sql, params)
+            # 失败的写操作同样回执，避免工作进程的写入屏障一直等待
+            future.add_done_callback(partial(_acknowledge, acks[shard]))
+    finally:
+        store.close()
+
+
+def shard_main(spec: Dict[str, Any], writes, events, run_ids, acks, stop_event) -> None:
+    """
+    工作进程：在一个台架上执行一个分片的用例
+    :param spec: shard / shard_count / url / round_times / round_id / db_path / config
+    """
+    shard = spec["shard"]
+    shard_range = (shard, spec["shard_count"])
+    logger = _QueueLogger(events, f"[分片{shard} {spec['url']}] ")
+    config = BenchConfig(_ConfigSnapshot(spec["config"]), spec["url"])
+
+    store = RemoteStore(spec["db_path"], writes, shard, {"test_runs": run_ids}, acks, logger=logger)
+    register_store(spec["db_path"], store)
+    register_campaign_stats(spec["db_path"], _QueueStats(events, shard))
+    controller = ProcessCtrl(logger, config, None)
+
+    def watch_stop():
+        stop_event.wait()
+        controller.sing_stop = True
+
+    threading.Thread(target=watch_stop, name="campaign-stop", daemon=True).start()
+
+    state = "done"
+    try:
+        # 数据初始化模块---读取json数据
+        data_init = DataInit(logger, config)
+        _, err = data_init.separate_data()
+        if err is not None:
+            logger.error("数据初始化模块---读取失败流程结束---失败")
+            state = "failed"
+            return
+
+        # 测试输入数据变异模块---只生成本分片的用例
+        data_variation = DataVariation(logger, config, case_list=data_init.get_case_list())
+        if data_variation.generate_initial_variations(shard=shard_range) is not True:
+            logger.error("测试输入数据变异模块---判断变异结果---失败")
+            state = "failed"
+            return
+        if spec["round_times"] != 1 and not data_variation.based_new_state_fuzz(spec["round_id"], shard=shard_range):
+            state = "no_new_state"
+            return
+
+        if controller.run_cases(data_variation, spec["round_id"]):
+            state = "stop_signal"
+    except Exception as e:
+        logger.error(f"分片执行异常: {e}")
+        state = "failed"
+    finally:
+        store.close()
+        events.put(("finished", shard, state))
+
+
+class CampaignCoordinator:
+    """多台架多进程执行：每个台架一个工作进程执行一个分片，结果经写入进程写入同一数据库"""
+
+    def __init__(self, logger, config, bench_urls: List[str], app=None):
+        """
+        :param bench_urls: 测试平台台架基础URL列表，每个台架一个分片
+        """
+        self.logger = logger
+        self.config = config
+        self.bench_urls = list(bench_urls)
+        self.app = app
+        # 各台架接口耗时在工作进程中统计
+        self.platform_client = None
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._shards_lock = threading.Lock()
+        self.stats = None
+        self.shards = [
+            {"shard": index, "bench": url, "round": 0, "state": "pending", "completed": 0, "exceptions": 0}
+            for index, url in enumerate(self.bench_urls)
+        ]
+
+    @property
+    def sing_stop(self) -> bool:
+        return self._stop_event.is_set()
+
+    @sing_stop.setter
+    def sing_stop(self, value: bool) -> None:
+        if value:
+            self._stop_event.set()
+
+    def shard_status(self) -> List[Dict[str, Any]]:
+        """各分片进度：所在轮次、状态、已提交结果数、异常结果数"""
+        with self._shards_lock:
+            return [dict(shard) for shard in self.shards]
+
+    def run(self) -> None:
+        db_url = getattr(self.config, "DATABASE", None) or self.config.SQLALCHEMY_DATABASE_URI
+        db_path = resolve_db_path(db_url)
+        db_handler = TestResultHandler(self.logger, db_url=db_url, app=self.app)
+        self.stats = get_campaign_stats(db_url)
+        previous_round_id = db_handler.get_latest_round_id()
+        current_round_id = 1 if previous_round_id is None else previous_round_id + 1
+
+        snapshot = config_snapshot(self.config)
+        # 所有分片使用同一随机种子，分片合起来与单进程执行的种子用例一致
+        if snapshot.get("CASE_SEED") is None:
+            snapshot["CASE_SEED"] = random.randrange(2 ** 32)
+        self.logger.info(f"多进程执行：{len(self.bench_urls)} 个分片，seed={snapshot['CASE_SEED']}，"
+                         f"round_id={current_round_id}")
+
+        context = self._context
+        writes = context.Queue()
+        events = context.Queue()
+        run_ids = context.Value("q", load_max_id(db_path, "test_runs", "run_id"))
+        acks = [context.Queue() for _ in self.bench_urls]
+        writer = context.Process(target=writer_main, name="campaign-writer",
+                                 args=(db_path, writes, events, acks, snapshot.get("DB_BATCH_ROWS"),
+                                       snapshot.get("DB_BATCH_MS")))
+        writer.start()
+        try:
+            round_times = 1
+            while round_times < 3 and not self.sing_stop:
+                states = self._run_round(round_times, current_round_id, db_path, snapshot, writes, events,
+                                         run_ids, acks)
+                if "failed" in states or "stop_signal" in states:
+                    self.logger.error("测试结果判断模块---调用用例运行策略---停止")
+                    self.sing_stop = True
+                    break
+                if "no_new_state" in states:
+                    break
+                round_times += 1
+        finally:
+            writes.put(None)
+            while writer.is_alive():
+                self._drain_events(events)
+                writer.join(EVENT_POLL_INTERVAL)
+            self._drain_events(events, block=False)
+            # 写入进程分配了新的 run_id，本进程的主键缓存需要重新读取
+            if isinstance(db_handler.store, SQLiteStore):
+                db_handler.store.reload_ids()
+
+        self.logger.info("测试结果判断模块---调用用例运行策略---停止")
+
+    def _run_round(self, round_times, round_id, db_path, snapshot, writes, events, run_ids, acks) -> List[str]:
+        """启动本轮全部分片并等待结束，返回各分片的结束状态"""
+        states = {}
+        processes = []
+        for index, url in enumerate(self.bench_urls):
+            spec = {"shard": index, "shard_count": len(self.bench_urls), "url": url, "round_times": round_times,
+                    "round_id": round_id, "db_path": db_path, "config": snapshot}
+            process = self._context.Process(target=shard_main, name=f"campaign-shard-{index}",
+                                            args=(spec, writes, events, run_ids, acks[index], self._stop_event))
+            process.start()
+            processes.append(process)
+            self._update(index, round=round_times, state="running")
+
+        while any(process.is_alive() for process in processes):
+            self._drain_events(events, states)
+        # 进程退出前已把队列中的事件全部送出
+        self._drain_events(events, states, block=False)
+        for index, process in enumerate(processes):
+            process.join()
+            if index not in states:
+                self.logger.error(f"分片 {index} 进程异常退出，exitcode={process.exitcode}")
+                states[index] = "failed"
+                self._update(index, state="failed")
+        return list(states.values())
+
+    def _drain_events(self, events, states: Optional[Dict[int, str]] = None, block: bool = True) -> None:
+        while True:
+            try:
+                event = events.get(timeout=EVENT_POLL_INTERVAL) if block else events.get_nowait()
+            except queue.Empty:
+                return
+            kind = event[0]
+            if kind == "log":
+                getattr(self.logger, event[1])(event[2], **event[3])
+            elif kind == "stored":
+                _, index, status, strategy = event
+                self.stats.record(status, strategy)
+                with self._shards_lock:
+                    self.shards[index]["completed"] += 1
+                    self.shards[index]["exceptions"] += int(is_exception(status, strategy))
+            elif kind == "finished":
+                if states is not None:
+                    states[event[1]] = event[2]
+                self._update(event[1], state=event[2])
+                # 与单台架执行一致：任一分片触发停止或失败时立即通知其余分片停止
+                if event[2] in ("stop_signal", "failed"):
+                    self.sing_stop = True
+            block = False
+
+    def _update(self, index: int, **values) -> None:
+        with self._shards_lock:
+            self.shards[index].update(values)
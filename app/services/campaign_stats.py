@@ -0,0 +1,103 @@
+"""
+测试任务运行统计
+由 store_test_result 在每条 test_runs 记录提交时累加（次数、异常数、各状态条数、最近一段时间的完成时刻），
+/control/status 直接读取内存中的计数，轮询不再访问数据库。
+异常的判定与原查询一致：status != 1 OR strategy < 0。
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from .sqlite_store import resolve_db_path
+
+# 默认吞吐量统计窗口(秒)
+DEFAULT_THROUGHPUT_WINDOW = 60
+
+
+def is_exception(status: int, strategy: Optional[int]) -> bool:
+    """异常结果：status != 1 OR strategy < 0"""
+    return status != 1 or (strategy is not None and strategy < 0)
+
+
+class CampaignStats:
+    """单个数据库的测试任务计数，start() 时清零"""
+
+    def __init__(self, window: float = DEFAULT_THROUGHPUT_WINDOW):
+        """
+        :param window: 吞吐量统计窗口(秒)，按最近 window 秒内完成的用例数计算每分钟用例数
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._times = deque()
+        self.start_time = None
+        self.runs = 0
+        self.exceptions = 0
+        self.status_counts: Dict[int, int] = {}
+
+    def start(self) -> None:
+        """测试任务开始：清零计数并记录开始时间"""
+        with self._lock:
+            self._times.clear()
+            self.start_time = time.monotonic()
+            self.runs = 0
+            self.exceptions = 0
+            self.status_counts = {}
+
+    def record(self, status: int, strategy: int) -> None:
+        """记录一条已提交的测试结果"""
+        now = time.monotonic()
+        with self._lock:
+            self.runs += 1
+            if is_exception(status, strategy):
+                self.exceptions += 1
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            self._times.append(now)
+            self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        while self._times and self._times[0] < now - self.window:
+            self._times.popleft()
+
+    def snapshot(self, goal: Optional[int] = None) -> Dict[str, Any]:
+        """
+        当前计数
+        :param goal: 目标用例数（RUN_TIMES），用于估算剩余时间
+        :return: runs / exceptions / statusCounts / throughput(用例/分钟) / eta(秒，无法估算时为 None)
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            runs = self.runs
+            elapsed = now - self.start_time if self.start_time is not None else 0
+            span = min(self.window, elapsed)
+            throughput = len(self._times) * 60.0 / span if span > 0 else 0.0
+            status_counts = dict(self.status_counts)
+            exceptions = self.exceptions
+        eta = None
+        if goal and throughput > 0:
+            eta = round(max(0, goal - runs) * 60.0 / throughput, 1)
+        return {"runs": runs, "exceptions": exceptions, "statusCounts": status_counts,
+                "throughput": round(throughput, 2), "eta": eta}
+
+
+_stats: Dict[str, CampaignStats] = {}
+_stats_lock = threading.Lock()
+
+
+def get_campaign_stats(db_url: str) -> CampaignStats:
+    """获取数据库对应的共享运行统计"""
+    path = resolve_db_path(db_url)
+    with _stats_lock:
+        stats = _stats.get(path)
+        if stats is None:
+            stats = CampaignStats()
+            _stats[path] = stats
+        return stats
+
+
+def register_campaign_stats(db_url: str, stats) -> None:
+    """指定数据库在本进程内使用的运行统计（需提供 record），多进程执行时工作进程借此把计数发回主进程"""
+    with _stats_lock:
+        _stats[resolve_db_path(db_url)] = stats
@@ -0,0 +1,82 @@
+"""
+用例目录
+classify_cases 分类完成后一次性建立的参数/用例索引，变异时按参数名称或UUID直接查找，
+不再逐条遍历 expected_case / error_case / stuck_case 列表。
+查找结果与原线性查找一致：同名（同UUID）参数取列表中第一次出现的。
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class CaseCatalog:
+    """按用例类型（1/2）建立的参数名称、UUID索引"""
+
+    def __init__(self, expected_cases: Dict[int, List[Dict[str, Any]]],
+                 error_cases: Optional[Dict[int, List[Dict[str, Any]]]] = None,
+                 stuck_cases: Optional[Dict[int, List[Dict[str, Any]]]] = None):
+        """
+        :param expected_cases: {用例类型: expected_case 列表}
+        :param error_cases: {用例类型: error_case 列表}（元素含 in_put、error）
+        :param stuck_cases: {用例类型: stuck_case 列表}（元素含 in_put、stuck）
+        """
+        # 参数名称 -> 参数配置
+        self._params_by_name: Dict[int, Dict[Any, Dict[str, Any]]] = {}
+        # 参数UUID -> (所属用例, 是否单参数用例)
+        self._cases_by_uuid: Dict[int, Dict[Any, Tuple[Dict[str, Any], bool]]] = {}
+        # 用例对象 -> 在 expected_case 列表中的下标
+        self._case_positions: Dict[int, Dict[int, int]] = {}
+        for case_type, cases in expected_cases.items():
+            by_name = self._params_by_name.setdefault(case_type, {})
+            by_uuid = self._cases_by_uuid.setdefault(case_type, {})
+            positions = self._case_positions.setdefault(case_type, {})
+            for position, case in enumerate(cases):
+                positions.setdefault(id(case), position)
+                in_put = case.get("in_put")
+                if isinstance(in_put, dict):
+                    by_name.setdefault(in_put.get("name"), in_put)
+                    by_uuid.setdefault(in_put.get("uuid"), (case, True))
+                elif isinstance(in_put, list):
+                    for param in in_put:
+                        by_name.setdefault(param.get("name"), param)
+                        by_uuid.setdefault(param.get("uuid"), (case, False))
+
+        # 单参数用例的错误/卡顿信息：UUID -> 列表
+        self._errors_by_uuid = self._single_param_index(error_cases or {}, "error")
+        self._stucks_by_uuid = self._single_param_index(stuck_cases or {}, "stuck")
+
+    @staticmethod
+    def _single_param_index(groups: Dict[int, List[Dict[str, Any]]], key: str) -> Dict[int, Dict[Any, Any]]:
+        index = {}
+        for case_type, entries in groups.items():
+            by_uuid = index.setdefault(case_type, {})
+            for entry in entries:
+                in_put = entry.get("in_put")
+                if isinstance(in_put, dict):
+                    by_uuid.setdefault(in_put.get("uuid"), entry.get(key, []))
+        return index
+
+    def param_by_name(self, name: str, case_type: int) -> Optional[Dict[str, Any]]:
+        """按参数名称查找原始参数配置"""
+        return self._params_by_name.get(case_type, {}).get(name)
+
+    def case_by_uuid(self, uuid: Any, case_type: int) -> Optional[Tuple[Dict[str, Any], bool]]:
+        """
+        按参数UUID查找所属的原始用例
+        :return: (用例, 是否单参数用例)，找不到返回 None
+        """
+        return self._cases_by_uuid.get(case_type, {}).get(uuid)
+
+    def position(self, case: Any, case_type: int) -> int:
+        """用例在 expected_case 列表中的下标，不存在时抛出 ValueError（与 list.index 一致）"""
+        position = self._case_positions.get(case_type, {}).get(id(case))
+        if position is None:
+            raise ValueError(f"{case!r} is not in list")
+        return position
+
+    def errors_for(self, uuid: Any, case_type: int = 1, default: Any = None) -> Any:
+        """单参数用例的错误预期，找不到返回 default"""
+        return self._errors_by_uuid.get(case_type, {}).get(uuid, default)
+
+    def stucks_for(self, uuid: Any, case_type: int = 1, default: Any = None) -> Any:
+        """单参数用例的卡顿预期，找不到返回 default"""
+        return self._stucks_by_uuid.get(case_type, {}).get(uuid, default)
@@ -0,0 +1,124 @@
+"""
+测试用例池
+前端为变异用例（双端队列，插入与弹出均为 O(1)），后端为按顺序排列的种子用例来源。
+种子来源可以是列表，也可以是生成器：用例在弹出时才生成，不需要预先构建全部 RUN_TIMES 条。
+弹出顺序与原列表实现一致：变异用例先于剩余的种子用例执行。
+变异用例以 MutantCase（共享的原用例 + 输入值覆盖）入池，弹出时才展开为完整用例。
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+
+class MutantCase:
+    """
+    写时复制的变异用例：引用原用例（只读，不复制），只记录被修改的输入值和元数据
+    in_data 为单参数(dict)时 values 的键为 0，多参数(list)时为参数下标
+    """
+
+    __slots__ = ("template", "values", "updates")
+
+    def __init__(self, template: Dict[str, Any], values: Optional[Dict[int, Any]] = None,
+                 updates: Optional[Dict[str, Any]] = None):
+        """
+        :param template: 原用例
+        :param values: {参数下标: 新值}
+        :param updates: 覆盖的用例字段（expected_results / error / est_time）
+        """
+        self.template = template
+        self.values = values or {}
+        self.updates = updates
+
+    def materialize(self) -> Dict[str, Any]:
+        """展开为完整用例：只复制 in_data，预期结果与错误信息仍引用原用例"""
+        case = dict(self.template)
+        in_data = case.get("in_data")
+        values = self.values
+        if isinstance(in_data, dict):
+            in_data = dict(in_data)
+            if 0 in values:
+                in_data["value"] = values[0]
+        elif isinstance(in_data, list):
+            in_data = [dict(param, value=values[i]) if i in values else dict(param)
+                       for i, param in enumerate(in_data)]
+        case["in_data"] = in_data
+        if self.updates:
+            case.update(self.updates)
+        return case
+
+
+class _Source:
+    """种子用例来源：迭代器 + 预计剩余数量（未知时为 None）"""
+
+    __slots__ = ("iterator", "remaining")
+
+    def __init__(self, iterator: Iterator[Dict[str, Any]], remaining: Optional[int]):
+        self.iterator = iterator
+        self.remaining = remaining
+
+
+class CasePool:
+    """变异用例优先的双端用例池"""
+
+    def __init__(self):
+        self._front = deque()
+        self._sources = deque()
+
+    def push_front(self, cases: Iterable[Union[Dict[str, Any], MutantCase]]) -> None:
+        """将一批用例（或 MutantCase）按原顺序插入池前端（先于池中已有用例弹出）"""
+        self._front.extendleft(reversed(list(cases)))
+
+    def extend(self, cases: Iterable[Dict[str, Any]], count: Optional[int] = None) -> None:
+        """
+        在池末尾追加一个种子用例来源
+        :param cases: 用例列表或生成器，生成器在弹出时才逐条生成
+        :param count: 来源的预计用例数，仅用于 len() 统计；列表等可求长度的来源自动获取
+        """
+        if count is None and hasattr(cases, "__len__"):
+            count = len(cases)
+        self._sources.append(_Source(iter(cases), count))
+
+    def append(self, case: Dict[str, Any]) -> None:
+        """在池末尾追加一条用例"""
+        self.extend((case,))
+
+    def pop(self) -> Optional[Dict[str, Any]]:
+        """弹出下一条用例，池为空时返回 None"""
+        if self._front:
+            case = self._front.popleft()
+            return case.materialize() if isinstance(case, MutantCase) else case
+        while self._sources:
+            source = self._sources[0]
+            case = next(source.iterator, None)
+            if case is not None:
+                if source.remaining is not None:
+                    source.remaining = max(0, source.remaining - 1)
+                return case
+            self._sources.popleft()
+        return None
+
+    def peek(self) -> Optional[Dict[str, Any]]:
+        """查看下一条用例但不弹出（惰性来源会生成该用例并暂存到前端）"""
+        case = self.pop()
+        if case is not None:
+            self._front.appendleft(case)
+        return case
+
+    def clear(self) -> None:
+        self._front.clear()
+        self._sources.clear()
+
+    def __len__(self) -> int:
+        """剩余用例数；惰性来源按预计数量统计（生成时跳过的用例会使实际数量偏少）"""
+        return len(self._front) + sum(source.remaining or 0 for source in self._sources)
+
+    def __bool__(self) -> bool:
+        return self.peek() is not None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """依次弹出全部用例"""
+        while True:
+            case = self.pop()
+            if case is None:
+                return
+            yield case
@@ -0,0 +1,293 @@
+"""
+图表数据服务
+/charts/data 的统计信息由一条按 round_id 分组的聚合查询得到（走 ix_test_runs_round_status_strategy_duration
+覆盖索引），全部轮次与指定轮次的统计都从分组结果合并；记录页中的 JSON 字段在查询时解析一次。
+记录浏览支持按 run_id 的游标分页（after/before，走主键范围扫描，页深度不影响耗时；扫描范围限定在
+该轮次的最小/最大 run_id 之间，最小/最大值随统计查询一起得到）和字段投影
+（列表视图只取标量列，完整 JSON 由详情接口按 run_id 单独获取）。
+两者都按数据库文件签名（db 文件与 -wal 文件的修改时间、大小）缓存，数据库未变化时直接返回缓存。
+缓存的结果由多个请求共享，使用方不得原地修改。
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .sqlite_store import resolve_db_path
+
+# 默认缓存的记录页数
+DEFAULT_PAGE_CACHE_SIZE = 64
+# 图表统计的状态
+CHART_STATUSES = (1, 2, 3, 4)
+# 游标分页每页最多条数
+MAX_PAGE_SIZE = 1000
+# 记录中需要解析的 JSON 字段
+JSON_FIELDS = ("actual_input", "expected_output", "actual_output")
+# 记录可选字段（fields= 投影），run_id 始终返回
+RECORD_FIELDS = ("run_id", "round_id", "type", "status", "strategy", "expected_duration", "actual_duration",
+                 "actual_input", "expected_output", "actual_output")
+# 详情中需要解析的 JSON 字段
+DETAIL_JSON_FIELDS = JSON_FIELDS + ("expected_error_output", "expected_stuck_output")
+
+_SUMMARY_SQL = """
+    SELECT round_id,
+           COUNT(*),
+           SUM(CASE WHEN status = 1 THEN 1 ELSE 0 END),
+           SUM(CASE WHEN status != 1 OR strategy < 0 THEN 1 ELSE 0 END),
+           TOTAL(actual_duration),
+           COUNT(actual_duration),
+           SUM(CASE WHEN status = 2 THEN 1 ELSE 0 END),
+           SUM(CASE WHEN status = 3 THEN 1 ELSE 0 END),
+           SUM(CASE WHEN status = 4 THEN 1 ELSE 0 END),
+           MIN(run_id),
+           MAX(run_id)
+    FROM test_runs
+    GROUP BY round_id
+    ORDER BY round_id
+"""
+
+
+def parse_fields(fields: Any) -> Tuple[str, ...]:
+    """
+    解析字段投影参数（逗号分隔的字符串或列表），为空时返回全部字段
+    :raises ValueError: 包含未知字段
+    """
+    if not fields:
+        return RECORD_FIELDS
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    requested = {field.strip() for field in fields if field and field.strip()}
+    unknown = requested - set(RECORD_FIELDS)
+    if unknown:
+        raise ValueError(f"未知字段: {', '.join(sorted(unknown))}")
+    requested.add("run_id")
+    return tuple(field for field in RECORD_FIELDS if field in requested)
+
+
+def parse_record(row: Dict[str, Any], json_fields=JSON_FIELDS) -> Dict[str, Any]:
+    """解析记录中的 JSON 字段（无法解析时为 None）"""
+    record = dict(row)
+    for field in json_fields:
+        if field in record:
+            record[field] = _parse_json(record[field])
+    return record
+
+
+def _parse_json(value: Any) -> Any:
+    if not value:
+        return None
+    if not isinstance(value, str):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        return None
+
+
+def _round_key(round_id: Any) -> Any:
+    """请求参数中的 round_id 为字符串，按整数轮次比较"""
+    try:
+        return int(round_id)
+    except (TypeError, ValueError):
+        return round_id
+
+
+class ChartDataService:
+    """单个数据库文件的图表数据查询与缓存"""
+
+    def __init__(self, path: str, page_cache_size: int = DEFAULT_PAGE_CACHE_SIZE):
+        self.path = path
+        self.page_cache_size = page_cache_size
+        self._lock = threading.Lock()
+        self._summary: Optional[Tuple[Tuple, List[Tuple]]] = None
+        self._pages: "OrderedDict[Tuple, Tuple[Tuple, List[Dict[str, Any]]]]" = OrderedDict()
+
+    def signature(self) -> Tuple:
+        """数据库签名：db 文件与 -wal 文件的 (修改时间ns, 大小)，未提交检查点的写入体现在 -wal 上"""
+        signature = []
+        for path in (self.path, f"{self.path}-wal"):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    # ---------------------------------------------------------------- 统计
+    def _round_rows(self, signature: Tuple) -> List[Tuple]:
+        with self._lock:
+            if self._summary is not None and self._summary[0] == signature:
+                return self._summary[1]
+        conn = self._connect()
+        try:
+            rows = conn.execute(_SUMMARY_SQL).fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            self._summary = (signature, rows)
+        return rows
+
+    def summary(self, round_id: Any = None, signature: Optional[Tuple] = None) -> Dict[str, Any]:
+        """
+        轮次列表与统计信息
+        :param round_id: 只统计该轮次，为空时统计全部记录
+        :return: dict - rounds / stats(total, normal, error, avgDuration) / statusCounts
+        """
+        rows = self._round_rows(signature or self.signature())
+        if round_id is not None:
+            key = _round_key(round_id)
+            rows_in_scope = [row for row in rows if row[0] == key]
+        else:
+            rows_in_scope = rows
+
+        total = normal = error = duration_count = 0
+        duration_sum = 0.0
+        status_counts = {status: 0 for status in CHART_STATUSES}
+        for row in rows_in_scope:
+            total += row[1]
+            normal += row[2] or 0
+            error += row[3] or 0
+            duration_sum += row[4] or 0
+            duration_count += row[5] or 0
+            status_counts[1] += row[2] or 0
+            status_counts[2] += row[6] or 0
+            status_counts[3] += row[7] or 0
+            status_counts[4] += row[8] or 0
+
+        avg_duration = duration_sum / duration_count if duration_count else 0
+        return {
+            "rounds": [row[0] for row in rows],
+            "stats": {
+                "total": total,
+                "normal": normal,
+                "error": error,
+                "avgDuration": round(avg_duration, 2) if avg_duration else 0,
+            },
+            "statusCounts": status_counts,
+        }
+
+    def _run_id_bounds(self, round_id: Any, signature: Tuple) -> Optional[Tuple[int, int]]:
+        """轮次（为空时为全部记录）的 (最小 run_id, 最大 run_id)，没有记录时为 None"""
+        rows = self._round_rows(signature)
+        if round_id is not None:
+            key = _round_key(round_id)
+            rows = [row for row in rows if row[0] == key]
+        if not rows:
+            return None
+        return min(row[9] for row in rows), max(row[10] for row in rows)
+
+    # ---------------------------------------------------------------- 记录
+    def records(self, round_id: Any = None, start: int = 1, end: int = 100,
+                signature: Optional[Tuple] = None, fields: Optional[Tuple[str, ...]] = None) -> List[Dict[str, Any]]:
+        """
+        按 run_id 升序取第 start 到 end 条记录（从1开始），JSON 字段已解析
+        """
+        return self._query(round_id, "", (), "ASC", end - start + 1, start - 1, fields or RECORD_FIELDS,
+                           signature or self.signature())
+
+    def page(self, round_id: Any = None, after: Optional[int] = None, before: Optional[int] = None,
+             limit: int = 100, fields: Optional[Tuple[str, ...]] = None,
+             signature: Optional[Tuple] = None) -> Dict[str, Any]:
+        """
+        按 run_id 游标分页
+        :param after: 取 run_id 大于 after 的前 limit 条（下一页）
+        :param before: 取 run_id 小于 before 的最后 limit 条（上一页），after 为空时生效
+        :param fields: 返回的字段（见 parse_fields），默认全部
+        :return: dict - records(按 run_id 升序) / nextAfter / prevBefore（没有更多记录时为 None）
+        """
+        signature = signature or self.signature()
+        fields = fields or RECORD_FIELDS
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        bounds = self._run_id_bounds(round_id, signature)
+        if bounds is None:
+            return {"records": [], "nextAfter": None, "prevBefore": None}
+        low, high = bounds
+        # 扫描范围限定在 [low, high]，越过轮次边界的请求不会扫描到表头/表尾
+        if after is None and before is not None:
+            rows = self._query(round_id, "run_id < ? AND run_id >= ?", (int(before), low), "DESC", limit, 0,
+                               fields, signature)
+            records = list(reversed(rows))
+        else:
+            start = low - 1 if after is None else max(int(after), low - 1)
+            records = self._query(round_id, "run_id > ? AND run_id <= ?", (start, high), "ASC", limit, 0,
+                                  fields, signature)
+        # 只有该侧确实还有记录时才返回游标
+        next_after = records[-1]["run_id"] if records and records[-1]["run_id"] < high else None
+        prev_before = records[0]["run_id"] if records and records[0]["run_id"] > low else None
+        return {"records": records, "nextAfter": next_after, "prevBefore": prev_before}
+
+    def _query(self, round_id: Any, where: str, params: Tuple, order: str, limit: int, offset: int,
+               fields: Tuple[str, ...], signature: Tuple) -> List[Dict[str, Any]]:
+        round_key = None if round_id is None else _round_key(round_id)
+        key = (round_key, where, params, order, limit, offset, fields)
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is not None and cached[0] == signature:
+                self._pages.move_to_end(key)
+                return cached[1]
+
+        conditions = [where] if where else []
+        if round_id is not None:
+            # 有游标时按主键范围扫描并过滤轮次（范围已限定在该轮次的 run_id 区间内），避免按轮次索引取出整轮记录再排序
+            conditions.insert(0, "+round_id = ?" if where else "round_id = ?")
+            params = (round_key,) + params
+        sql = f"SELECT {', '.join(fields)} FROM test_runs"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY run_id {order} LIMIT ? OFFSET ?"
+
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(sql, params + (limit, offset)).fetchall()
+        finally:
+            conn.close()
+        records = [parse_record(row) for row in rows]
+
+        with self._lock:
+            self._pages[key] = (signature, records)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.page_cache_size:
+                self._pages.popitem(last=False)
+        return records
+
+    def chart_data(self, round_id: Any = None, start: int = 1, end: int = 100,
+                   fields: Optional[Tuple[str, ...]] = None, after: Optional[int] = None,
+                   before: Optional[int] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        /charts/data 的完整响应：统计与记录使用同一数据库签名
+        给出 after / before / limit 任一参数时按 run_id 游标分页，否则按 start/end 取记录
+        """
+        signature = self.signature()
+        data = self.summary(round_id, signature)
+        if after is None and before is None and limit is None:
+            data["records"] = self.records(round_id, start, end, signature, fields)
+        else:
+            data.update(self.page(round_id, after, before, limit or end - start + 1, fields, signature))
+        return data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._summary = None
+            self._pages.clear()
+
+
+_services: Dict[str, ChartDataService] = {}
+_services_lock = threading.Lock()
+
+
+def get_chart_service(db_url: str) -> ChartDataService:
+    """获取数据库文件对应的共享图表数据服务"""
+    path = resolve_db_path(db_url)
+    with _services_lock:
+        service = _services.get(path)
+        if service is None:
+            service = ChartDataService(path)
+            _services[path] = service
+        return service
@@ -1,8 +1,14 @@
 import os
 import json
 
+from .definition_loader import (cached_case_list, directory_signature, read_json, read_json_files,
+                                store_case_list)
+
 
 class DataInit:
+    # 用例类型 -> 预期时间
+    CASE_TYPE_TIME = {1: 20, 2: 60}
+
     def __init__(self, logger, config):
         # 初始化存储数据的列表
         # self.json_data_list = []
@@ -18,16 +24,17 @@ class DataInit:
 
         self.logger = logger
         self.data_dir = config.DATA_DIR + config.DIR_NAME
+        # 并行解析线程数、是否使用 case_list 快照文件
+        self.workers = getattr(config, "DEFINITION_LOAD_WORKERS", None)
+        self.snapshot = bool(getattr(config, "DEFINITION_SNAPSHOT", False))
 
     def read_file(self, filename):
         file_path = os.path.join(self.data_dir, filename)
         # 打开并读取文件内容
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                # 将 JSON 数据解析为字典
-                json_data = json.load(file)
-                # 将字典添加到列表中
-                return json_data, None
+            # 将 JSON 数据解析为字典（文件未变化时复用缓存）
+            json_data = read_json(file_path)
+            return json_data, None
         except Exception as e:
             self.logger.error(f"Error reading file {filename}: {e.args[0]}")
             return None, e
@@ -35,9 +42,11 @@ class DataInit:
     def load_json_files(self):
         """
         从指定目录中读取符合要求的 JSON 文件，并将内容加载为字典列表。
+        test_xxx.json 与 assert_xxx.json 按文件名后缀 xxx 配对，返回的两个列表按后缀排序、一一对应；
+        没有配对文件的定义文件记录告警后跳过，不影响其它用例加载。
 
         :param
-        :return:
+        :return: test数据列表，assert数据列表，错误
         """
         self.logger.info("start load_json_files")
         file_num = os.listdir(self.data_dir)
@@ -45,24 +54,35 @@ class DataInit:
             self.logger.error("no json_files")
             return None, None, Exception
 
+        # 按后缀建立 test_ / assert_ 文件索引
+        test_files = {}
+        assert_files = {}
+        for filename in file_num:
+            if not filename.endswith('.json'):
+                continue
+            if filename.startswith('test_'):
+                test_files[filename[len('test_'):-len('.json')]] = filename
+            elif filename.startswith('assert_'):
+                assert_files[filename[len('assert_'):-len('.json')]] = filename
+
+        unmatched = sorted([test_files[key] for key in test_files.keys() - assert_files.keys()] +
+                           [assert_files[key] for key in assert_files.keys() - test_files.keys()])
+        if unmatched:
+            self.logger.warn(f"以下定义文件没有配对的 test_/assert_ 文件，已跳过: {unmatched}")
+
+        suffixes = sorted(test_files.keys() & assert_files.keys())
+        filenames = [name for key in suffixes for name in (test_files[key], assert_files[key])]
         json_data_list = []
         assert_data_list = []
-        # 遍历指定目录下的所有文件
-        for filename in os.listdir(self.data_dir):
-            # 检查文件名是否以 'test_' 开头并以 '.json' 结尾
-            if filename.startswith('test_') and filename.endswith('.json'):
-                json_data, err = self.read_file(filename)
-                if err is not None:
-                    self.logger.error("read_file error")
-                    return None, None, err
+        # 并行解析
+        for filename, json_data, err in read_json_files(self.data_dir, filenames, self.workers):
+            if err is not None:
+                self.logger.error(f"Error reading file {filename}: {err.args[0] if err.args else err}")
+                self.logger.error("read_file error")
+                return None, None, err
+            if filename.startswith('test_'):
                 json_data_list.append(json_data)
-
-            # 检查文件名是否以 'assert_' 开头并以 '.json' 结尾
-            if filename.startswith('assert_') and filename.endswith('.json'):
-                json_data, err = self.read_file(filename)
-                if err is not None:
-                    self.logger.error("read_file error")
-                    return None, None, err
+            else:
                 assert_data_list.append(json_data)
         return json_data_list, assert_data_list, None
 
@@ -105,6 +125,17 @@ class DataInit:
         :param
         :return: in输入参数列表，out状态返回参数列表，确定标准预期，确定标准错误
         """
+        # 定义文件未变化时直接复用缓存的用例（跨轮次、跨测试任务）
+        try:
+            signature = directory_signature(self.data_dir)
+        except OSError:
+            signature = None
+        if signature:
+            cached = cached_case_list(self.data_dir, signature, snapshot=self.snapshot, logger=self.logger)
+            if cached is not None:
+                self.case_list.extend(cached)
+                return True, None
+
         # 加载目录下文件
         json_data_list, assert_data_list, err = self.load_json_files()
 
@@ -113,96 +144,52 @@ class DataInit:
             self.logger.error("load_json_files run error")
             return False, err
 
-        # 数量对不上，返回错误
-        if len(json_data_list) != len(assert_data_list):
-            return False, "json数据和assert数据不配对"
-
-        else:
-
-            i = 0
-            while i < len(json_data_list):
-
-                # 用例类型变量
-                case_type = json_data_list[i]["case_type"]
-                # 出入参详细信息列表
-                io_info_detail = json_data_list[i]["types"]
-
-                if case_type == 1:
-                    # 初始化
-                    in_data_range_dict = {"type": 1, "in_data": []}
-                    out_data_range_dict = {"type": 1, "out_data": []}
-                    for t in io_info_detail:
-                        # 出参入参值
-                        direction = t["direction"]
-                        # 输入信号参数范围插入
-                        if direction == "in":
-                            # 组织数据
-                            data = self.data_dict(t)
-                            # 插入数据
-                            in_data_range_dict["in_data"].append(data)
-
-                        # 状态反馈参数范围插入
-                        if direction == "out":
-                            # 组织数据
-                            data = self.data_dict(t)
-                            # 插入数据
-                            out_data_range_dict["out_data"].append(data)
-                    # 标准预期
-                    expected_data_dict = {"type": 1, "time": 20, "expected": []}
-                    for k in assert_data_list[i]["value"]:
-                        expected_data_dict["expected"].append({"in_put": k["in_put"],
-                                                               "out_put": k["out_put"]})
-                    # 错误&卡顿预期
-                    error_data_dict = {"type": 1, "time": 20, "error": []}
-                    for k in assert_data_list[i]["value"]:
-                        error_data_dict["error"].append({"in_put": k["in_put"],
-                                                            "error": k["error"],
-                                                            "stuck": k["stuck"]})
-                    # 向列表中插入数据
-                    self.case_list.append({"out_data_range_dict": out_data_range_dict,
-                                           "in_data_range_dict": in_data_range_dict,
-                                           "expected_results": expected_data_dict,
-                                           "error_results": error_data_dict})
-
-                elif case_type == 2:
-                    # 初始化
-                    in_data_range_dict = {"type": 2, "in_data": []}
-                    out_data_range_dict = {"type": 2, "out_data": []}
-                    for t in io_info_detail:
-                        # 出参入参值
-                        direction = t["direction"]
-                        # 输入信号参数范围插入
-                        if direction == "in":
-                            # 组织数据
-                            data = self.data_dict(t)
-                            # 插入数据
-                            in_data_range_dict["in_data"].append(data)
-
-                        # 状态反馈参数范围插入
-                        if direction == "out":
-                            # 组织数据
-                            data = self.data_dict(t)
-                            # 插入数据
-                            out_data_range_dict["out_data"].append(data)
-                    # 标准预期
-                    expected_data_dict = {"type": 2, "time": 60, "expected": []}
-                    for k in assert_data_list[i]["value"]:
-                        expected_data_dict["expected"].append({"in_put": k["in_put"],
-                                                               "out_put": k["out_put"]})
-                    # 错误&卡顿预期
-                    error_data_dict = {"type": 2, "time": 60, "error": []}
-                    for k in assert_data_list[i]["value"]:
-                        error_data_dict["error"].append({"in_put": k["in_put"],
-                                                            "error": k["error"],
-                                                            "stuck": k["stuck"]})
-                    # 向表中插入数据
-                    self.case_list.append({"out_data_range_dict": out_data_range_dict,
-                                           "in_data_range_dict": in_data_range_dict,
-                                           "expected_results": expected_data_dict,
-                                           "error_results": error_data_dict})
-                else:
-                    self.logger.error("出现未定义参数值")
-                    return False, "未定义参数值"
-
-                i += 1
-            return True, None
+        # 按后缀配对后的 test/assert 数据一一对应
+        for json_data, assert_data in zip(json_data_list, assert_data_list):
+
+            # 用例类型变量
+            case_type = json_data["case_type"]
+            # 出入参详细信息列表
+            io_info_detail = json_data["types"]
+
+            # 用例类型对应的预期时间：1--单输入信号 20，2--多输入信号 60
+            if case_type not in self.CASE_TYPE_TIME:
+                self.logger.error("出现未定义参数值")
+                return False, "未定义参数值"
+            case_time = self.CASE_TYPE_TIME[case_type]
+
+            # 初始化
+            in_data_range_dict = {"type": case_type, "in_data": []}
+            out_data_range_dict = {"type": case_type, "out_data": []}
+            for t in io_info_detail:
+                # 出参入参值
+                direction = t["direction"]
+                # 输入信号参数范围插入
+                if direction == "in":
+                    # 组织数据、插入数据
+                    in_data_range_dict["in_data"].append(self.data_dict(t))
+
+                # 状态反馈参数范围插入
+                if direction == "out":
+                    # 组织数据、插入数据
+                    out_data_range_dict["out_data"].append(self.data_dict(t))
+
+            # 标准预期 & 错误&卡顿预期：一次遍历
+            expected_data_dict = {"type": case_type, "time": case_time, "expected": []}
+            error_data_dict = {"type": case_type, "time": case_time, "error": []}
+            for k in assert_data["value"]:
+                expected_data_dict["expected"].append({"in_put": k["in_put"],
+                                                       "out_put": k["out_put"]})
+                error_data_dict["error"].append({"in_put": k["in_put"],
+                                                 "error": k["error"],
+                                                 "stuck": k["stuck"]})
+            # 向列表中插入数据
+            self.case_list.append({"out_data_range_dict": out_data_range_dict,
+                                   "in_data_range_dict": in_data_range_dict,
+                                   "expected_results": expected_data_dict,
+                                   "error_results": error_data_dict})
+
+        if signature:
+            store_case_list(self.data_dir, signature, list(self.case_list), snapshot=self.snapshot,
+                            logger=self.logger)
+        return True, None
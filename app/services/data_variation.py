@@ -1,13 +1,17 @@
 import random
 import copy
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 from itertools import product
 from app.models.models import *
 import os
 import json
 from .database_handler import TestResultHandler
+from .case_pool import CasePool, MutantCase
+from .param_domain import DomainIndex
+from .case_catalog import CaseCatalog
+from .definition_loader import read_json
 
 '''
 in_type 1--范围内取值 2--固定值
@@ -32,20 +36,29 @@ class DataVariation:
         self.error_time_type2 = None
         self.error_case_type2 = []
         self.stuck_case_type2 = []
+        # 参数取值域索引与用例目录（classify_cases 时建立）
+        self.domains = DomainIndex()
+        self.catalog = CaseCatalog({})
         ''''''
-        self.data_pool = []
+        self.data_pool = CasePool()
         self.current_case = {}
         self.app = app
         # 新增：单参数随机选择的参数池
         self.single_param_pool = []
+        # 种子用例模板与随机种子
+        self._seed_templates = {1: [], 2: []}
+        self.case_seed = None
         
     # ---------- 公共接口 ----------
-    def generate_initial_variations(self) -> bool:
-        """生成初始变异数据池"""
+    def generate_initial_variations(self, shard: Optional[Tuple[int, int]] = None) -> bool:
+        """
+        生成初始变异数据池（种子用例在弹出时才生成）
+        :param shard: (分片序号, 分片总数)，多进程执行时只生成序号对分片总数取余等于分片序号的种子用例
+        """
         run_times = self.config.RUN_TIMES
         mode = self.config.MODE
 
-        self.data_pool = []  # 清空现有数据池
+        self.data_pool.clear()  # 清空现有数据池
         self.classify_cases() # 预处理origin_cases，进行分类
         self.build_single_param_pool() # 建立单参数随机选择池
         # if not self.expected_case_type1 or not self.expected_case_type2:
@@ -73,140 +86,32 @@ class DataVariation:
             self.logger.error(f"未知的运行模式：{mode}")
             return False
 
-        # 生成type1用例（随机选择不同参数）
-        for _ in range(type1_count):
-            # 随机选择一个参数进行唤醒测试
-            if self.single_param_pool:
-                # 从参数池中随机选择一个参数
-                selected_param = random.choice(self.single_param_pool)
-                in_put = selected_param["param_config"]
-                expected_results = selected_param["expected_output"]
-                error_info = selected_param["error_info"]
-                stuck_info = selected_param["stuck_info"]
-                print(in_put)
-            else:
-                # 回退到原始方法
-                if not self.expected_case_type1:
-                    continue
-                idx = random.randint(0, len(self.expected_case_type1) - 1)
-                original_case = self.expected_case_type1[idx]
-                if type(original_case["in_put"]) == type([]):
-                    continue
-                in_put = original_case["in_put"]
-                expected_results = original_case["out_put"]
-                error_info = self.error_case_type1[idx].get("error", [])
-                stuck_info = self.stuck_case_type1[idx].get("stuck", [])
-                print(f"使用原始方法: {in_put}")
-            
-            '''新的 in_put 字段'''
-            # 判断 in_put 的类型
-            step_len = float(in_put.get("step_len", 1))
-            if step_len.is_integer():
-                data_type = "int"
-            else:
-                data_type = "float"
-            # 调用 generate_value 来生成具体的 in_put 的 value
-            in_put_value = self.generate_value(in_put)
-            
-            new_in_put = {
-                "name": in_put.get("name"),
-                "data_type": data_type,
-                "value": in_put_value,
-                "ID": in_put.get("uuid", "")
-            }
-
-            ''' 新的 error 字段'''
-            new_error = [
-                {"error_type": 1, "out_data": error_info},
-                {"error_type": 2, "out_data": stuck_info}
-            ]
-            
-            new_data = {
-                "type": 1,
-                "in_data": new_in_put,
-                "expected_results": expected_results,
-                "error": new_error,
-                "est_time": self.expected_time_type1
-            }
-            
-            # 将生成的数据添加到数据池
-            self.data_pool.append(new_data)
-        
-        # 生成type2用例
-        for _ in range(type2_count):
-            idx = random.randint(0, len(self.expected_case_type2) - 1)
-            original_case = self.expected_case_type2[idx]
-            in_put_list = original_case["in_put"]
-            if type(original_case["in_put"]) == type({}):
-                continue
-            expected_results = original_case["out_put"]
-            '''新的 in_put 字段'''
-            new_in_put = []
-            for in_put in in_put_list:
-                step_len = float(in_put.get("step_len", 1))
-                if step_len.is_integer():
-                    data_type = "int"
-                else:
-                    data_type = "float"
-
-                in_put_value = self.generate_value(in_put)
-
-                new_in_put_ele = {
-                    "name": in_put.get("name"),
-                    "data_type": data_type,
-                    "value": in_put_value,
-                    "ID": ""
-                }
-                new_in_put.append(new_in_put_ele)
-
-            ''' 新的 error 字段'''
-            error_entry = self.error_case_type2[idx].get("error")
-            stuck_entry = self.stuck_case_type2[idx].get("stuck")
-            new_error = [
-                {"error_type": 1, "out_data": error_entry},
-                {"error_type": 2, "out_data": stuck_entry}
-            ]
-            
-            new_data = {
-                "type": 2,
-                "in_data": new_in_put,
-                "expected_results": expected_results,
-                "error": new_error,
-                "est_time": self.expected_time_type1
-            }
-            
-            # 将生成的数据添加到数据池
-            self.data_pool.append(new_data)
-
-        if mode == "MIX":
-            n = len(self.data_pool)
-            mid = n // 2
-            first_half = self.data_pool[:mid]
-            second_half = self.data_pool[mid:]
-            result = []
-            for i in range(mid):
-                result.append(first_half[i])
-                result.append(second_half[i])
-            self.data_pool = result
-            # random.shuffle(self.data_pool)
-        # 可以在output.json看生成的用例数据
-        #with open("output.json", "w", encoding="utf-8") as f:
-             #json.dump(self.data_pool, f, ensure_ascii=False, indent=4)
+        # 种子用例按序号惰性生成：第 i 条只由 (CASE_SEED, i) 决定，可从 CASE_START 续跑
+        self._build_seed_templates()
+        seed = getattr(self.config, "CASE_SEED", None)
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.case_seed = seed
+        start = max(0, int(getattr(self.config, "CASE_START", 0) or 0))
+        total = type1_count + type2_count
+        step = 1
+        if shard is not None:
+            shard_index, step = shard
+            start += (shard_index - start) % step
+        self.logger.info(f"种子用例生成：seed={seed}，共 {total} 条，从第 {start} 条开始")
+        self.data_pool.extend(self.iter_seed_cases(seed, type1_count, type2_count, mode, start, step),
+                              count=len(range(start, total, step)))
 
         return True
 
     def pop_first_data(self) -> Optional[Dict[str, Any]]:
         """获取并删除 data_pool 中的第一个数据"""
-        if self.data_pool:
-            self.current_case = self.data_pool[0]
-            return self.data_pool.pop(0)
-        else:
-            if self.data_pool is []:
-                self.logger.info("数据池为空，无法弹出数据")
-                return None
-            else:
-                self.logger.error("数据池弹出操作异常")
-                return None
+        case = self.data_pool.pop()
+        if case is None:
+            self.logger.info("数据池为空，无法弹出数据")
+            return None
+        self.current_case = case
+        return case
 
     def trigger_variation(self, response: Dict[str, Any]) -> Optional[bool]:
         """根据返回结果决定是否继续变异并调用对应策略的变异函数。"""
@@ -228,15 +133,20 @@ class DataVariation:
         elif strategy == 3:
             self.generate_repeat_execution()
 
-    def based_new_state_fuzz(self, round_id):
-        """基于新状态发生变异，向数据池中插入数据。"""
+    def based_new_state_fuzz(self, round_id, shard: Optional[Tuple[int, int]] = None):
+        """
+        基于新状态发生变异，向数据池中插入数据。
+        :param shard: (分片序号, 分片总数)，多进程执行时只处理属于该分片的新状态记录
+        """
         # 数据库中查询上一轮所有新状态数据
-        self.data_pool = []
+        self.data_pool.clear()
         db_handler = TestResultHandler(self.logger, db_url=self.config.SQLALCHEMY_DATABASE_URI, app=self.app)
         datalist = db_handler.get_new_status_by_round(round_id)
         if datalist is None:
             self.logger.error("未发现上一轮有新状态，测试停止")
             return False
+        if shard is not None:
+            datalist = datalist[shard[0]::shard[1]]
         for i in datalist:
             current_case = {"type": 0, "in_data": [], 'expected_results': [], 'error': [], 'est_time': 0}
             current_case["type"] = i["type"]
@@ -273,10 +183,11 @@ class DataVariation:
 
 
     # ---------- 变异策略实现 ----------
+    # 变异用例以 MutantCase 入池：共享当前用例，只记录修改的输入值，弹出时才展开为完整用例
     def generate_single_param(self) -> None:
         """单参数变异策略：生成邻近值的变异用例并插入数据池前端"""
         variation_time = self.config.SINGLE_VARIATION_TIME
-        current_case = copy.deepcopy(self.current_case)
+        current_case = self.current_case
         if not current_case:
             self.logger.error("当前用例不存在，无法进行单参数变异")
             return
@@ -288,7 +199,6 @@ class DataVariation:
 
         param = current_case["in_data"]
         case_type = current_case["type"]
-        mutated_cases = []
 
         # 获取原始参数配置
         original_config = self.find_original_param_config(param["name"], case_type)
@@ -302,36 +212,21 @@ class DataVariation:
             self.logger.error(f"参数{param['name']}的可能值列表为空")
             return
 
+        domain = self.domains.get(original_config)
+
+        # 所有变异用例共用同一份元数据
+        updates = self.case_metadata(original_config)
+
         # 处理固定值情况
         if len(possible_values) == 1:
-            for _ in range(variation_time):
-                new_case = copy.deepcopy(current_case)
-                new_case["in_data"]["value"] = possible_values[0]
-                self.regenerate_case_metadata(new_case, original_config)
-                mutated_cases.append(new_case)
-            self.data_pool[0:0] = mutated_cases  # 批量插入前端
+            self.data_pool.push_front(MutantCase(current_case, {0: possible_values[0]}, updates)
+                                      for _ in range(variation_time))  # 批量插入前端
             return
 
         try:
             current_value = float(param["value"])
-            idx = possible_values.index(current_value)
-
-            neighbor_values = []
-            window_radius = 0
-            max_radius = max(idx, len(possible_values) - idx - 1)
-
-            # 螺旋式滑动窗口算法
-            while len(neighbor_values) < variation_time and window_radius <= max_radius:
-                # 向左扩展
-                if idx - window_radius >= 0:
-                    neighbor_values.append(possible_values[idx - window_radius])
-                # 向右扩展（避免radius=0时重复添加当前值）
-                if window_radius != 0 and idx + window_radius < len(possible_values):
-                    neighbor_values.append(possible_values[idx + window_radius])
-                window_radius += 1
-
-            # 去重并排除当前值
-            neighbor_values = [v for v in list(set(neighbor_values)) if v != current_value]
+            # 螺旋式滑动窗口取邻近值（去重并排除当前值）
+            neighbor_values = domain.neighbors(current_value, variation_time)
 
             # 保底机制：如果无可用值则回退全量值（包含当前值）
             if not neighbor_values:
@@ -344,20 +239,13 @@ class DataVariation:
         # 生成10个值
         neighbor_values = random.choices(neighbor_values, k=variation_time)
 
-        # 生成变异用例
-        for new_value in neighbor_values:
-            new_case = copy.deepcopy(current_case)
-            new_case["in_data"]["value"] = new_value
-            self.regenerate_case_metadata(new_case, original_config)
-            mutated_cases.append(new_case)
-
-        # 插入数据池前端
-        self.data_pool[0:0] = mutated_cases
+        # 生成变异用例并插入数据池前端
+        self.data_pool.push_front(MutantCase(current_case, {0: new_value}, updates) for new_value in neighbor_values)
 
     def generate_multi_param(self) -> None:
         """多参数变异策略：生成邻近值的变异用例并插入数据池前端"""
         variation_time = self.config.MULTIPLE_VARIATION_TIME
-        current_case = copy.deepcopy(self.current_case)
+        current_case = self.current_case
         if not current_case:
             self.logger.error("当前用例不存在，无法进行多参数变异策略2")
             return
@@ -382,6 +270,7 @@ class DataVariation:
                 continue
 
             # 获取可能的值范围
+            domain = self.domains.get(original_config)
             possible_values = self.get_param_values(original_config)
             if not possible_values:  # 空值保护
                 self.logger.error(f"参数{param['name']}的可能值列表为空")
@@ -394,24 +283,8 @@ class DataVariation:
 
             try:
                 current_value = float(param["value"])
-                idx = possible_values.index(current_value)
-
-                neighbor_values = []
-                window_radius = 0
-                max_radius = max(idx, len(possible_values) - idx - 1)
-
-                # 螺旋式滑动窗口算法
-                while len(neighbor_values) < variation_time and window_radius <= max_radius:
-                    # 向左扩展
-                    if idx - window_radius >= 0:
-                        neighbor_values.append(possible_values[idx - window_radius])
-                    # 向右扩展
-                    if idx + window_radius < len(possible_values) and window_radius != 0:
-                        neighbor_values.append(possible_values[idx + window_radius])
-                    window_radius += 1
-
-                # 移除当前值并去重
-                neighbor_values = [v for v in list(set(neighbor_values)) if v != current_value]
+                # 螺旋式滑动窗口取邻近值（移除当前值并去重）
+                neighbor_values = domain.neighbors(current_value, variation_time)
 
                 # 保底逻辑：如果全部排除则使用全部可能值
                 if not neighbor_values:
@@ -429,35 +302,38 @@ class DataVariation:
             self.logger.error("没有有效的参数可以进行变异")
             return
 
+        # 元数据按参数缓存，同一参数只查找一次原始用例
+        metadata_cache = {}
+
         # 生成变异用例组合
         for _ in range(variation_time):  # 生成10个变异组合
-            new_case = copy.deepcopy(current_case)
-            modified = False
+            values = {}
 
             # 对每个参数随机选择是否变异(50%概率)
-            for param in new_case["in_data"]:
+            for i, param in enumerate(params):
                 if param["ID"] in param_neighbors and random.random() < 0.5:
                     # 随机选择一个邻近值
                     new_value = random.choice(param_neighbors[param["ID"]])
-                    param["value"] = str(new_value) if param["data_type"] == "float" else str(int(new_value))
-                    modified = True
+                    values[i] = str(new_value) if param["data_type"] == "float" else str(int(new_value))
 
             # 如果至少修改了一个参数，则添加到变异用例列表
-            if modified:
+            if values:
                 # 获取第一个修改参数的原始配置用于重新生成元数据
-                for param in new_case["in_data"]:
-                    if "value" in param and param["value"] != current_case["in_data"][0]["value"]:
-                        original_config = self.find_original_param_config(param["ID"], type)
-                        if original_config:
-                            self.regenerate_case_metadata(new_case, original_config)
+                updates = None
+                for i, param in enumerate(params):
+                    if "value" in param and values.get(i, param["value"]) != params[0]["value"]:
+                        if param["ID"] not in metadata_cache:
+                            original_config = self.find_original_param_config(param["ID"], type)
+                            metadata_cache[param["ID"]] = (
+                                (True, self.case_metadata(original_config)) if original_config else (False, None))
+                        found, updates = metadata_cache[param["ID"]]
+                        if found:
                             break
 
-                mutated_cases.append(new_case)
+                mutated_cases.append(MutantCase(current_case, values, updates))
 
         # 将新用例插入数据池前端
-        for case in reversed(mutated_cases):
-            self.data_pool.insert(0, case)
-        print(self.data_pool)
+        self.data_pool.push_front(mutated_cases)
 
     def generate_repeat_execution(self) -> None:
         """多参数变异-3：向列表前端添加若干与实际异常数据重复的数据"""
@@ -467,35 +343,110 @@ class DataVariation:
             return
 
         # 直接复制原始用例指定次数并添加到前端
-        for _ in range(variation_time):
-            self.data_pool.insert(0, copy.deepcopy(self.current_case))
+        self.data_pool.push_front(MutantCase(self.current_case) for _ in range(variation_time))
 
     # ---------- 辅助方法 ----------
+    def iter_seed_cases(self, seed: int, type1_count: int, type2_count: int, mode: str,
+                        start: int = 0, step: int = 1) -> Iterator[Dict[str, Any]]:
+        """
+        按序号逐条生成种子用例
+        :param seed: 随机种子，同一 seed 下第 i 条用例固定
+        :param type1_count: type1用例数
+        :param type2_count: type2用例数
+        :param mode: 运行模式，MIX 模式下 type1 与 type2 交替
+        :param start: 起始序号，续跑时跳过前 start 条且不需要重新生成
+        :param step: 序号步长，分片执行时每个分片隔 step 条取一条
+        """
+        for index in range(start, type1_count + type2_count, step):
+            if mode == "MIX":
+                case_type = 1 if index % 2 == 0 else 2
+            else:
+                case_type = 1 if index < type1_count else 2
+            case = self.generate_seed_case(seed, index, case_type)
+            if case is not None:
+                yield case
+
+    def generate_seed_case(self, seed: int, index: int, case_type: int) -> Optional[Dict[str, Any]]:
+        """
+        生成第 index 条种子用例，预期结果与错误/卡顿信息按引用共享模板，只有输入值是新建的
+        :return: 用例数据，该类型没有可用模板时返回 None
+        """
+        templates = self._seed_templates.get(case_type)
+        if not templates:
+            return None
+        rng = np.random.default_rng([int(seed), index])
+        template = templates[int(rng.integers(len(templates)))]
+        # 一次为用例的全部参数取值
+        values = self.domains.sample_batch(template["domains"], 1, rng)[:, 0].tolist()
+        in_data = []
+        for param, domain, value in zip(template["params"], template["domains"], values):
+            if np.isnan(value):
+                self.logger.error(f"无法处理in_type为{domain.in_type}的输入配置：{param}")
+                value = None
+            in_data.append({
+                "name": param.get("name"),
+                "data_type": domain.data_type,
+                "value": value,
+                "ID": param.get("uuid", "") if case_type == 1 else ""
+            })
+        return {
+            "type": case_type,
+            "in_data": in_data[0] if case_type == 1 else in_data,
+            "expected_results": template["expected_results"],
+            "error": template["error"],
+            "est_time": self.expected_time_type1
+        }
+
+    def _build_seed_templates(self) -> None:
+        """整理种子用例模板：type1 来自单参数池（为空时回退到原始单参数用例），type2 来自原始多参数用例"""
+        type1_templates = []
+        if self.single_param_pool:
+            for param in self.single_param_pool:
+                type1_templates.append(self._seed_template(
+                    [param["param_config"]], param["expected_output"], param["error_info"], param["stuck_info"]))
+        else:
+            for idx, case in enumerate(self.expected_case_type1):
+                if not isinstance(case["in_put"], dict):
+                    continue
+                error_info = self.error_case_type1[idx].get("error", []) if idx < len(self.error_case_type1) else []
+                stuck_info = self.stuck_case_type1[idx].get("stuck", []) if idx < len(self.stuck_case_type1) else []
+                type1_templates.append(self._seed_template([case["in_put"]], case["out_put"], error_info, stuck_info))
+
+        type2_templates = []
+        for idx, case in enumerate(self.expected_case_type2):
+            if not isinstance(case["in_put"], list):
+                continue
+            error_entry = self.error_case_type2[idx].get("error") if idx < len(self.error_case_type2) else None
+            stuck_entry = self.stuck_case_type2[idx].get("stuck") if idx < len(self.stuck_case_type2) else None
+            type2_templates.append(self._seed_template(case["in_put"], case["out_put"], error_entry, stuck_entry))
+
+        self._seed_templates = {1: type1_templates, 2: type2_templates}
+
+    def _seed_template(self, params: List[Dict[str, Any]], expected_results: Any, error_info: Any,
+                       stuck_info: Any) -> Dict[str, Any]:
+        return {
+            "params": params,
+            "domains": [self.domains.get(param) for param in params],
+            "expected_results": expected_results,
+            "error": [
+                {"error_type": 1, "out_data": error_info},
+                {"error_type": 2, "out_data": stuck_info}
+            ]
+        }
+
     def build_single_param_pool(self) -> None:
         """建立单参数随机选择池，包含所有可用于唤醒测试的参数"""
         self.single_param_pool = []
+        # 已在参数池中的参数UUID（避免重复）
+        pooled_uuids = set()
         
         # 1. 添加原有的单参数用例（如CC2电压）
         for case in self.expected_case_type1:
             in_put = case.get("in_put")
             if isinstance(in_put, dict):
                 # 查找对应的错误和卡顿信息
-                error_info = []
-                stuck_info = []
-                
-                # 在error_case_type1中查找对应的信息
-                for error_case in self.error_case_type1:
-                    error_in_put = error_case.get("in_put")
-                    if isinstance(error_in_put, dict) and error_in_put.get("uuid") == in_put.get("uuid"):
-                        error_info = error_case.get("error", [])
-                        break
-                
-                # 在stuck_case_type1中查找对应的信息
-                for stuck_case in self.stuck_case_type1:
-                    stuck_in_put = stuck_case.get("in_put")
-                    if isinstance(stuck_in_put, dict) and stuck_in_put.get("uuid") == in_put.get("uuid"):
-                        stuck_info = stuck_case.get("stuck", [])
-                        break
+                error_info = self.catalog.errors_for(in_put.get("uuid"), default=[])
+                stuck_info = self.catalog.stucks_for(in_put.get("uuid"), default=[])
                 
                 param_entry = {
                     "param_config": in_put,
@@ -505,12 +456,13 @@ class DataVariation:
                     "source": "type1_original"
                 }
                 self.single_param_pool.append(param_entry)
+                pooled_uuids.add(in_put.get("uuid"))
         
         # 2. 从专门的单参数唤醒测试配置文件中加载标准配置
         wake_config_file = os.path.join(self.config.DATA_DIR, "assert_001.json")
         try:
-            with open(wake_config_file, 'r', encoding='utf-8') as f:
-                wake_config_data = json.load(f)
+            # 文件未变化时复用缓存的解析结果
+            wake_config_data = read_json(wake_config_file)
                 
             # 遍历专门的单参数唤醒测试配置
             for wake_case in wake_config_data.get("value", []):
@@ -518,7 +470,8 @@ class DataVariation:
                 if isinstance(in_put, dict):
                     # 检查是否已经在参数池中（避免重复）
                     param_uuid = in_put.get("uuid")
-                    if not any(p["param_config"].get("uuid") == param_uuid for p in self.single_param_pool):
+                    if param_uuid not in pooled_uuids:
+                        pooled_uuids.add(param_uuid)
                         
                         param_entry = {
                             "param_config": in_put,                        # 使用标准的参数配置
@@ -639,111 +592,75 @@ class DataVariation:
                             "stuck": stuck_list
                         })
 
+        # 建立参数名称/UUID索引
+        self.catalog = CaseCatalog(
+            {1: self.expected_case_type1, 2: self.expected_case_type2},
+            error_cases={1: self.error_case_type1, 2: self.error_case_type2},
+            stuck_cases={1: self.stuck_case_type1, 2: self.stuck_case_type2},
+        )
 
-    def generate_value(self, in_put: Dict[str, Any]) -> Any:
+        # 为所有输入参数建立取值域
+        self.domains = DomainIndex()
+        for case in self.expected_case_type1 + self.expected_case_type2:
+            in_put = case.get("in_put")
+            for param in (in_put if isinstance(in_put, list) else [in_put]):
+                if isinstance(param, dict):
+                    self.domains.get(param)
+
+    def generate_value(self, in_put: Dict[str, Any], rng: Optional[random.Random] = None) -> Any:
         """
         根据给定的 in_put 生成对应的随机值
         :param in_put: 包含生成信息的字典
+        :param rng: 随机数生成器，默认使用全局 random
         :return: 生成的随机值
         """
-        in_type = in_put.get("in_type")
-        in_range = in_put.get("in_range")
-        min_value = float(in_put.get("min", 0))
-        max_value = in_put.get("max")
-        if max_value != '':
-            max_value = float(max_value)
-        step_len = float(in_put.get("step_len", 1))
-        
-        # 如果 in_type 为 2，直接返回最小值1
-        if in_type == 2:
-            return min_value
+        rng = rng or random
+        domain = self.domains.get(in_put)
 
-        # 如果 in_type 为 1，范围内生成随机值
+        # 如果 in_type 为 2，直接返回最小值1
         # 用到了 in_range ，但其实 in_range = 2就是 in_type = 2
-        if in_type == 1:
-            if in_range == 1:  # 不包含边界值
-                range_size = (max_value - min_value) / step_len
-                random_index = random.randint(1, int(range_size) - 1)
-                value = min_value + random_index * step_len
-            elif in_range == 2:  # 固定值单值
-                return min_value
-            
-            # 根据 step_len 对生成的随机值进行四舍五入
-            return value
+        if domain.fixed:
+            return domain.min
+
+        # 如果 in_type 为 1，范围内生成随机值（不包含边界值）
+        if domain.random_range:
+            random_index = rng.randint(1, domain.range_size - 1)
+            return domain.min + random_index * domain.step
 
         # 3. 如果不符合条件，则返回 None 或抛出异常（视需求）
-        self.logger.error(f"无法处理in_type为{in_type}的输入配置：{in_put}")
+        self.logger.error(f"无法处理in_type为{domain.in_type}的输入配置：{in_put}")
         return None
 
     def get_param_values(self, param: Dict) -> List:
-        """获取参数的可能值列表"""
-        if param["in_type"] == 2:  # 固定值
-            return [float(param["min"])]
-
-        #if param["enum_type"] == 1:  # 枚举值
-            #return param["enum_list"]
-
-        # 确保数值参数是数字类型
-        try:
-            min_val = float(param["min"])
-            max_val = float(param["max"])
-            step = float(param.get("step_len", 1))
-        except (ValueError, TypeError) as e:
-            self.logger.error(f"参数值转换失败: {str(e)}")
+        """获取参数的可能值列表（取值域在 classify_cases 时建立）"""
+        domain = self.domains.get(param)
+        if domain.error:
+            self.logger.error(domain.error)
             return []
-
-        # 生成候选值序列
-        try:
-            values = list(np.arange(min_val, max_val + step, step))
-            values = np.round(values, 1).tolist()
-        except Exception as e:
-            self.logger.error(f"生成参数值序列失败: {str(e)}")
-            return []
-
-        # 处理不包含边界的情况
-        if param.get("in_range", 0) == 1:  # 默认包含边界
-            values = [
-                v for v in values
-                if not (np.isclose(v, min_val) or np.isclose(v, max_val))
-            ]
-
-        return values
+        return domain.value_list
 
     def find_original_param_config(self, name: str, type: int) -> Optional[Dict]:
-        """根据参数ID查找原始配置"""
-        # 搜索type1用例
-        if type == 1:
-            for case in self.expected_case_type1:
-                in_put = case["in_put"]
-                if isinstance(in_put, dict) and in_put.get("name") == name:
-                    return in_put
-                elif isinstance(in_put, list):
-                    for param in in_put:
-                        if param.get("name") == name:
-                            return param
-
-        # 搜索type2用例
-        elif type == 2:
-            for case in self.expected_case_type2:
-                in_put = case["in_put"]
-                if isinstance(in_put, dict) and in_put.get("name") == name:
-                    return in_put
-                elif isinstance(in_put, list):
-                    for param in in_put:
-                        if param.get("name") == name:
-                            return param
-
+        """根据参数名称查找原始配置"""
+        param = self.catalog.param_by_name(name, type)
+        if param is not None:
+            return param
 
         self.logger.error(f"未找到原始参数配置: ID={name}")
         return None
 
     def regenerate_case_metadata(self, new_case: Dict, original_config: Dict) -> None:
         """重新生成用例的元数据"""
+        updates = self.case_metadata(original_config)
+        if updates:
+            new_case.update(updates)
+
+    def case_metadata(self, original_config: Dict) -> Optional[Dict[str, Any]]:
+        """根据原始参数配置查找用例的预期结果、错误信息和预期时间，找不到时返回 None"""
         # 查找原始用例和类型
         case_type = self.current_case["type"]
         original_case = self.find_original_case(original_config, case_type)
         if not original_case:
-            return
+            return None
 
         # 根据类型获取对应的错误信息
         error_group = self.error_case_type1 if case_type == 1 else self.error_case_type2
@@ -752,47 +669,25 @@ class DataVariation:
 
         try:
             # 查找原始用例在对应类型用例列表中的索引
-            case_list = self.expected_case_type1 if case_type == 1 else self.expected_case_type2
-            idx = case_list.index(original_case)
+            idx = self.catalog.position(original_case, case_type)
 
-            # 更新预期结果和错误信息
-            new_case.update({
+            # 预期结果和错误信息
+            return {
                 "expected_results": original_case["out_put"],
                 "error": [
                     {"error_type": 1, "out_data": error_group[idx]["error"]},
                     {"error_type": 2, "out_data": stuck_group[idx]["stuck"]}
                 ],
                 "est_time": expected_time
-            })
+            }
         except (ValueError, IndexError) as e:
             self.logger.error(f"匹配原始用例错误信息失败: {str(e)}")
+            return None
 
     def find_original_case(self, param_config: Dict, type: int) -> Tuple[Optional[Dict], Optional[int]]:
         """根据参数配置查找原始用例和类型"""
-        # 在type1用例中查找
-        if type == 1:
-            for case in self.expected_case_type1:
-                in_put = case["in_put"]
-                if isinstance(in_put, dict) and in_put.get("uuid") == param_config.get("uuid"):
-                    return case, 1
-                elif isinstance(in_put, list):
-                    for param in in_put:
-                        if param.get("uuid") == param_config.get("uuid"):
-                            return case
-
-        # 在type2用例中查找
-        elif type == 2:
-            for case in self.expected_case_type2:
-                in_put = case["in_put"]
-                if isinstance(in_put, dict) and in_put.get("uuid") == param_config.get("uuid"):
-                    return case, 2
-                elif isinstance(in_put, list):
-                    for param in in_put:
-                        if param.get("uuid") == param_config.get("uuid"):
-                            return case
-
-        return None, None
-
-
-
-    
\ No newline at end of file
+        found = self.catalog.case_by_uuid(param_config.get("uuid"), type)
+        if found is None:
+            return None, None
+        case, single_param = found
+        return (case, type) if single_param else case
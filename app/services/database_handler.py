@@ -8,6 +8,13 @@ import time
 from datetime import datetime
 import sqlite3
 import time
+from contextlib import nullcontext
+from functools import cached_property, partial
+from app.config import Config as DefaultConfig
+from .sqlite_store import flush_store, get_store, open_reader, resolve_db_path
+from .duration_window import get_duration_window
+from .duration_detector import get_duration_detector
+from .campaign_stats import get_campaign_stats
 # from config import DATABASE
 
 
@@ -21,8 +28,29 @@ class TestResultHandler:
         self.app = app
         self.database = db_url
 
+    # 以下共享状态在首次使用时创建，只读查询（如图表按 run_id 取记录）不创建
+    @cached_property
+    def store(self):
+        """共享的数据库连接与后台批量写入"""
+        return get_store(self.database, self.logger)
+
+    @cached_property
+    def durations(self):
+        """最近测试记录的耗时窗口，供耗时分析使用"""
+        return get_duration_window(self.database, getattr(DefaultConfig, "DURATION_WINDOW", 20))
+
+    @cached_property
+    def detector(self):
+        """流式耗时异常检测"""
+        return get_duration_detector(self.database, logger=self.logger)
+
+    @cached_property
+    def stats(self):
+        """测试任务运行计数，供 /control/status 使用"""
+        return get_campaign_stats(self.database)
+
     def store_test_result(self, actual_duration, test_data_file=None, test_data=None, result_data=None, strategy=0,
-                          round_id=None):
+                          round_id=None, run_id=None):
         """
         将测试数据存储到数据库中
         :param actual_duration: 实际执行耗时（毫秒）
@@ -31,7 +59,8 @@ class TestResultHandler:
         :param result_data: 测试执行结果数据（可选）
         :param strategy: 策略标识（0: 正常, 1/2: 新状态, -1: 平台错误, -2: 错误, -3: 卡住）
         :param round_id: 所属轮次ID（可选）
-        :return: run_id (int) 插入记录的主键ID，失败返回 None
+        :param run_id: 指定主键（可选，回放按源记录 run_id 写入，已存在时覆盖），为空时自动分配
+        :return: run_id (int) 插入记录的主键ID（写入由后台提交，提交失败时按 run_id 记录错误日志），失败返回 None
         """
         # 读取 test_data
         try:
@@ -92,9 +121,10 @@ class TestResultHandler:
                 'strategy': strategy
             }
 
-            # 构建插入语句
+            # 构建插入语句（run_id 预先分配，插入由后台写线程批量提交）
             sql = '''
-                  INSERT INTO test_runs (actual_input, \
+                  INSERT %s INTO test_runs (run_id, \
+                                         actual_input, \
                                          expected_output, \
                                          round_id, \
                                          expected_error_output, \
@@ -105,37 +135,48 @@ class TestResultHandler:
                                          status, \
                                          type, \
                                          strategy) \
-                  VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) \
-                  '''
+                  VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) \
+                  ''' % ("OR REPLACE" if run_id is not None else "")
 
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
             try:
-                self.logger.info("正在执行数据库插入操作...")
-                cursor.execute(sql, (
-                    insert_values['actual_input'],
-                    insert_values['expected_output'],
-                    insert_values['round_id'],
-                    insert_values['expected_error_output'],
-                    insert_values['expected_stuck_output'],
-                    insert_values['actual_output'],
-                    insert_values['expected_duration'],
-                    insert_values['actual_duration'],
-                    insert_values['status'],
-                    insert_values['type'],
-                    insert_values['strategy']
-                ))
-                conn.commit()
-                new_id = cursor.lastrowid
-                self.logger.info(f"数据插入成功! run_id = {new_id}")
+                # 分配 run_id 时在检测器锁内完成分配与检测，耗时检测按 run_id 顺序进行
+                with (self.detector.ordered() if run_id is None else nullcontext()):
+                    new_id = run_id if run_id is not None else self.store.allocate_id("test_runs", "run_id")
+                    self.logger.info("正在提交数据库插入操作...")
+                    future = self.store.submit(sql, (
+                        new_id,
+                        insert_values['actual_input'],
+                        insert_values['expected_output'],
+                        insert_values['round_id'],
+                        insert_values['expected_error_output'],
+                        insert_values['expected_stuck_output'],
+                        insert_values['actual_output'],
+                        insert_values['expected_duration'],
+                        insert_values['actual_duration'],
+                        insert_values['status'],
+                        insert_values['type'],
+                        insert_values['strategy']
+                    ))
+                    duration_row = {
+                        'run_id': new_id,
+                        'round_id': insert_values['round_id'],
+                        'actual_input': insert_values['actual_input'],
+                        'actual_duration': insert_values['actual_duration'],
+                        'status': insert_values['status'],
+                        'strategy': insert_values['strategy'],
+                        'type': insert_values['type'],
+                    }
+                    self.durations.append(duration_row)
+                    anomalies = self._observe_duration(duration_row)
+                for anomaly in anomalies:
+                    self._record_duration_anomaly(anomaly)
+                # 写入提交后才计入运行统计，失败时从耗时窗口移除
+                future.add_done_callback(partial(self._on_result_written, duration_row))
+                self.logger.info("数据插入已提交! run_id = %s", new_id)
                 return new_id
             except Exception as e:
-                conn.rollback()
                 self.logger.error(f"数据库插入失败: {e}")
                 return None
-            finally:
-                cursor.close()
-                conn.close()
 
         except Exception as e:
             self.logger.error(f"存储测试结果时发生异常: {e}")
@@ -202,10 +243,22 @@ class TestResultHandler:
     #         self.logger.error(f"数据插入失败: {str(e)}")
     #         return Exception(f"存储测试结果失败: {str(e)}")
 
+    def _on_result_written(self, row, future):
+        """test_runs 插入的完成回调（在写线程中执行）"""
+        error = future.exception()
+        if error is not None:
+            self.durations.discard(row['run_id'])
+            self.logger.error(f"测试结果写入失败，run_id = {row['run_id']}: {error}")
+            return
+        self.stats.record(row['status'], row['strategy'])
+
     def get_db_connection(self):
-        conn = sqlite3.connect(self.database)
-        conn.row_factory = sqlite3.Row
-        return conn
+        # 短连接，调用方用完后 close()
+        return self.store.connection()
+
+    def flush(self, timeout=None):
+        """写入屏障：等待已提交的插入全部落库"""
+        return self.store.flush(timeout)
 
     def get_all_test_runs(self):
         """只返回数据，不涉及 Flask 的 jsonify"""
@@ -215,60 +268,31 @@ class TestResultHandler:
         return [dict(run) for run in runs]
 
     def get_test_run_by_id(self, run_id):
-        conn = self.get_db_connection()
-        run = conn.execute('SELECT * FROM test_runs WHERE run_id = ?', (run_id,)).fetchone()
-        conn.close()
+        """只读查询单条记录：使用只读短连接，不创建共享 store（本进程已有 store 时先等待其写入落库）"""
+        flush_store(self.database)
+        conn = open_reader(resolve_db_path(self.database), read_only=True)
+        try:
+            run = conn.execute('SELECT * FROM test_runs WHERE run_id = ?', (run_id,)).fetchone()
+        finally:
+            conn.close()
         return dict(run) if run else None
 
     def get_recent_durations(self, run_id):
         """
         获取截至当前 run_id 的最近20条成功插入记录的耗时与 run_id（不分类型）
+        优先使用内存中的滑动窗口（由 store_test_result 追加），冷启动时才查询数据库
         :param run_id: 当前测试运行ID（用于限定上界）
         :return: tuple (duration_list, run_id_list, results) - 执行时间列表、run_id列表、完整记录列表；
                  出错或未找到返回 ([], [], [])
         """
-        # if not run_id:
-        #     self.logger.error("run_id不能为空")
-        #     return None
-
-        conn = None
         try:
-            self.logger.info(f"正在查询截至 run_id={run_id} 的最近20条测试记录（不分类型）...")
-            conn = self.get_db_connection()
-            # 设置事务隔离级别，允许脏读，解决写后立即读的数据可见性问题
-            conn.execute("PRAGMA read_uncommitted = true;")
-            conn.row_factory = sqlite3.Row  # 使结果可像字典一样访问
-            # 查询截至当前 run_id 的所有记录
-            query_sql = """
-                        SELECT run_id, \
-                               round_id, \
-                               actual_input, \
-                               expected_output, \
-                               expected_error_output, \
-                               expected_stuck_output, \
-                               actual_output, \
-                               expected_duration, \
-                               actual_duration, \
-                               status, \
-                               strategy, \
-                               type
-                        FROM test_runs
-                        WHERE run_id <= ?
-                        """
-            cursor = conn.execute(query_sql, (run_id,))
-            all_rows = cursor.fetchall()
-            # print(f"[DEBUG] 数据库查询返回了 {len(all_rows)} 行数据")
-
-            if not all_rows:
+            self.logger.info(f"正在获取截至 run_id={run_id} 的最近20条测试记录（不分类型）...")
+            recent_rows = self.durations.recent(run_id, self._load_recent_rows)
+
+            if not recent_rows:
                 self.logger.info(f"未找到任何测试记录")
                 return [], [], []
 
-            # 在 Python 中排序并获取最近的20条
-            all_rows.sort(key=lambda r: r['run_id'], reverse=True)
-            recent_rows = all_rows[:20]
-            
-            self.logger.info(f"查询到 {len(all_rows)} 条记录，选取最近的 {len(recent_rows)} 条进行分析。")
-
             # 提取字段
             duration_list = [int(row['actual_duration'] or 0) for row in recent_rows]
             run_id_list = [row['run_id'] for row in recent_rows]
@@ -285,9 +309,31 @@ class TestResultHandler:
             # return None
             return [], [], []
 
-        finally:
-            if conn:
-                conn.close()
+    def _load_recent_rows(self, run_id, limit):
+        """
+        冷启动回退查询：按主键倒序取截至 run_id 的最近 limit 条记录（不读取大字段输出）
+        :return: list of dict - 按 run_id 降序
+        """
+        # 查询前等待后台写入落库
+        self.flush()
+        conn = self.get_db_connection()
+        cursor = conn.execute("""
+                              SELECT run_id,
+                                     round_id,
+                                     actual_input,
+                                     actual_duration,
+                                     status,
+                                     strategy,
+                                     type
+                              FROM test_runs
+                              WHERE run_id <= ?
+                              ORDER BY run_id DESC LIMIT ?
+                              """, (run_id, limit))
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        self.logger.info(f"从数据库加载最近 {len(rows)} 条记录")
+        return rows
+
     # def get_recent_durations(self, run_id):
     #     """
     #     获取与指定run_id相同type的最近10条记录的actual_duration和run_id
@@ -322,107 +368,95 @@ class TestResultHandler:
 
     def analyze_durations(self, run_id):
         """
-        分析时间序列并根据条件创建日志
+        获取流式耗时异常检测对该记录的判定（检测在 store_test_result 写入时已完成）
         :param run_id: 测试运行ID
         :return: strategy值 (0 或 3)
         """
         try:
-            # print(f"[DEBUG] 开始分析时间，传入的 run_id: {run_id}")
-            # 获取最近20条测试记录的耗时与run_id
-            durations, related_run_ids, result_list = self.get_recent_durations(run_id)
+            return self.detector.strategy_for(run_id)
+        except Exception as e:
+            self.logger.error(f"分析执行时间失败: {str(e)}")
+            print(f"分析结果：分析执行时间失败: {str(e)}")
+            return 0
 
-            if len(related_run_ids) < 20:
-                print("分析结果：数据不足，跳过")
-                return 0
-            # 将最近记录按时间升序排列（从最早到最新），保持索引一致
-            durations_asc = list(reversed(durations))
-            run_ids_asc = list(reversed(related_run_ids))
-            # 计算相邻耗时差值
-            diffs = []
-            for i in range(len(durations_asc) - 1):
-                diffs.append(durations_asc[i + 1] - durations_asc[i])
-            # 连续增长的最小阈值（过滤抖动）
-            min_increase = 100
-            growth_block_start = None
-            # 检查是否存在四次连续增长的片段（对应五个点）
-            for start in range(len(diffs) - 3):
-                if diffs[start] > min_increase and diffs[start + 1] > min_increase and diffs[start + 2] > min_increase and diffs[start + 3] > min_increase:
-                    growth_block_start = start
-                    break
-            has_growth = growth_block_start is not None
-            # 检查是否存在单次耗时超过其他组2秒以上的异常孤点
-            outlier_index = None
-            for i in range(len(durations_asc)):
-                current = durations_asc[i]
-                others = durations_asc[:i] + durations_asc[i + 1:]
-                if not others:
-                    continue
-                if current - max(others) > 2000:
-                    outlier_index = i
-                    break
+    def reserve_duration(self, run_id):
+        """
+        并行执行指定 run_id 的用例（多台架回放）时，分发用例前预留其 run_id，
+        先完成的用例的耗时检测等之前的用例结束后按 run_id 顺序进行
+        """
+        try:
+            self._seed_detector(run_id)
+            self.detector.reserve(run_id)
+        except Exception as e:
+            self.logger.error(f"分析执行时间失败: {str(e)}")
+
+    def release_duration(self, run_id):
+        """用例结束（无论是否写入记录）后释放预留，检测因等待它而缓存的记录"""
+        try:
+            anomalies = self.detector.release(run_id)
+        except Exception as e:
+            self.logger.error(f"分析执行时间失败: {str(e)}")
+            return
+        for anomaly in anomalies:
+            self._record_duration_anomaly(anomaly)
+
+    def _seed_detector(self, run_id):
+        # 冷启动：用窗口内（或数据库中）此前的记录初始化检测器
+        self.detector.ensure_seeded(
+            lambda: list(reversed(self.durations.recent(run_id - 1, self._load_recent_rows))))
+
+    def _observe_duration(self, row):
+        """
+        将新记录送入流式检测器
+        :param row: 新插入记录的 run_id、耗时及 pro_input 所需字段
+        :return: 发现的异常列表
+        """
+        try:
+            self._seed_detector(row['run_id'])
+            return self.detector.observe(row)
+        except Exception as e:
+            self.logger.error(f"分析执行时间失败: {str(e)}")
+            return []
+
+    def _record_duration_anomaly(self, anomaly):
+        """
+        命中连续增长或孤点时记录错误日志与对应输入
+        :param anomaly: 检测器返回的异常（growth_rows / outlier_row / strategy）
+        """
+        try:
+            growth_rows = anomaly['growth_rows']
+            outlier_row = anomaly['outlier_row']
+            has_growth = bool(growth_rows)
 
             # 若命中任一异常类型则记录错误日志，并记录输入
-            if has_growth or outlier_index is not None:
-                log_id = str(uuid.uuid4())
-                error_type = 1 if has_growth else 2
-                conn = None
-                try:
-                    # 写入错误日志到 test_error_log
-                    conn = self.get_db_connection()
-                    cursor = conn.cursor()
-                    created_at = datetime.fromtimestamp(time.time()).isoformat()
-                    cursor.execute("""
-                          INSERT INTO test_error_log (log_id, error_type, created_at)
-                          VALUES (?, ?, ?) 
-                          """, (log_id, error_type, created_at))
-                    conn.commit()
-                except Exception as e:
-                    if conn:
-                        conn.rollback()
-                    self.logger.error(str(e))
-                finally:
-                    if conn:
-                        conn.close()
-
-                # 确保 pro_input 表存在
-                self.ensure_pro_input_table()
-                result_map = {row['run_id']: row for row in result_list}
+            log_id = str(uuid.uuid4())
+            error_type = 1 if has_growth else 2
+            # 写入错误日志到 test_error_log（后台批量提交）
+            created_at = datetime.fromtimestamp(time.time()).isoformat()
+            self.store.submit("""
+                  INSERT INTO test_error_log (log_id, error_type, created_at)
+                  VALUES (?, ?, ?) 
+                  """, (log_id, error_type, created_at))
+
+            # 确保 pro_input 表存在
+            self.ensure_pro_input_table()
+            if has_growth:
+                # 在 pro_input 记录增长片段的输入（reason_type=1）
+                for item in growth_rows:
+                    self.record_pro_input(item['run_id'], item.get('round_id'), item.get('type'), item.get('strategy'), item.get('actual_input'), 1, item.get('actual_duration'))
+                self.logger.warn(f"出现{len(growth_rows)}次耗时增长")
+                print(f"分析结果：连续{len(growth_rows)}次耗时增长")
+            if outlier_row is not None:
+                # 记录孤点的输入（reason_type=2）
+                self.record_pro_input(outlier_row['run_id'], outlier_row.get('round_id'), outlier_row.get('type'), outlier_row.get('strategy'), outlier_row.get('actual_input'), 2, outlier_row.get('actual_duration'))
+                self.logger.warn(f"出现单次运行耗时超过其他组{self.detector.outlier_ms / 1000:g}秒")
                 if has_growth:
-                    # 取该增长片段覆盖的4个点，并更新策略为非0（此处设为2）
-                    indices = [growth_block_start, growth_block_start + 1, growth_block_start + 2, growth_block_start + 3]
-                    target_run_ids = [run_ids_asc[idx] for idx in indices if idx < len(run_ids_asc)]
-                    # self.update_strategy_by_run_ids(target_run_ids, 2)  这句是修改原数据记录的srategy
-                    # 在 pro_input 记录这些 run 的输入（reason_type=1）
-                    for rid in target_run_ids:
-                        row = result_map.get(rid)
-                        if not row:
-                            continue
-                        self.record_pro_input(rid, row.get('round_id'), row.get('type'), row.get('strategy'), row.get('actual_input'), 1, row.get('actual_duration'))
-                    self.logger.warn("出现四次耗时增长")
-                    print("分析结果：连续四次耗时增长")
-                if outlier_index is not None:
-                    # 记录孤点的输入（reason_type=2）
-                    rid = run_ids_asc[outlier_index]
-                    row = result_map.get(rid)
-                    if row:
-                        self.record_pro_input(rid, row.get('round_id'), row.get('type'), row.get('strategy'), row.get('actual_input'), 2, row.get('actual_duration'))
-                    self.logger.warn("出现单次运行耗时超过其他组2秒")
-                    if has_growth:
-                        print("分析结果：同时存在连续增长与孤点超2秒")
-                    else:
-                        print("分析结果：耗时孤点超2秒")
-                # 有孤点返回策略3，仅有增长返回0，其余返回0
-                return 0 if has_growth and outlier_index is None else 3 if outlier_index is not None else 0
-
-            # 未发现异常情况
-            self.logger.info("20次运行中未出现异常情况")
-            print("分析结果：未发现异常情况")
-            return 0
-
+                    print("分析结果：同时存在连续增长与孤点")
+                else:
+                    print("分析结果：耗时孤点")
         except Exception as e:
             self.logger.error(f"分析执行时间失败: {str(e)}")
             print(f"分析结果：分析执行时间失败: {str(e)}")
-            return 0
 
     # def get_latest_round_id(self): # ****新增：获取数据库中最新一条记录的round_id****
     #     """
@@ -453,6 +487,8 @@ class TestResultHandler:
         """
         conn = None
         try:
+            # 查询前等待后台写入落库
+            self.flush()
             self.logger.debug("正在查询最新记录的round_id...")
 
             conn = self.get_db_connection()
@@ -471,7 +507,7 @@ class TestResultHandler:
                 return None
 
             round_id = row['round_id']
-            self.logger.debug(f"成功获取最新记录的round_id: {round_id}")
+            self.logger.debug("成功获取最新记录的round_id: %s", round_id)
             return round_id
 
         except Exception as e:
@@ -543,27 +579,19 @@ class TestResultHandler:
                 conn.close()
 
     def record_pro_input(self, run_id, round_id, type_value, strategy_value, actual_input_text, reason_type, actual_duration_value):
-        conn = None
         try:
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
             created_at = datetime.fromtimestamp(time.time()).isoformat()
-            cursor.execute(
+            # 后台批量提交
+            self.store.submit(
                 """
                 INSERT INTO pro_input (run_id, round_id, type, strategy, actual_input, actual_duration, reason_type, created_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (run_id, round_id, type_value, strategy_value, actual_input_text, int(actual_duration_value or 0), reason_type, created_at)
             )
-            conn.commit()
             print(f"[DEBUG] pro_input 写入: run_id={run_id}, actual_duration={int(actual_duration_value or 0)}, reason_type={reason_type}")
         except Exception as e:
-            if conn:
-                conn.rollback()
             self.logger.error(str(e))
-        finally:
-            if conn:
-                conn.close()
 
     def update_strategy_by_run_ids(self, run_ids, new_strategy):
         if not run_ids:
@@ -787,7 +815,7 @@ class TestResultHandler:
                     if signal.get('name') == first_signal.get('name'):
                         # 比较信号值
                         if signal.get('value') != first_signal.get('value'):
-                            self.logger.info(f"信号 {signal.get('name')} 发生变化: {first_signal.get('value')} -> {signal.get('value')}")
+                            self.logger.info("信号 %s 发生变化: %s -> %s", signal.get('name'), first_signal.get('value'), signal.get('value'))
                             has_changes = True
                         break
             
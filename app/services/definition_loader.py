@@ -0,0 +1,144 @@
+"""
+测试定义文件加载与缓存
+- 解析：test_*.json / assert_*.json 在线程池中并行解析；
+- 文件缓存：按 (路径, 修改时间, 文件大小) 缓存解析结果，文件未变化时不再重复解析；
+- 用例缓存：按目录签名（全部定义文件的名称、修改时间、大小）缓存 DataInit 整理后的 case_list，
+  跨轮次、跨测试任务复用；
+- 快照：可选地把 case_list 连同目录签名保存为 pickle 文件（DATA_DIR 下与 DIR_NAME 同级），
+  进程重启后签名一致即直接加载。
+缓存的数据由多个 DataInit / DataVariation 共享，使用方不得原地修改。
+"""
+
+import json
+import os
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+# 默认并行解析线程数
+DEFAULT_WORKERS = 4
+# 快照文件格式版本，结构变化时递增
+SNAPSHOT_VERSION = 1
+
+_files: Dict[str, Tuple[int, int, Any]] = {}
+_case_lists: Dict[str, Tuple[Tuple, List[Dict[str, Any]]]] = {}
+_lock = threading.Lock()
+
+
+def is_definition_file(filename: str) -> bool:
+    return (filename.startswith("test_") or filename.startswith("assert_")) and filename.endswith(".json")
+
+
+def directory_signature(data_dir: str, filenames: Optional[List[str]] = None) -> Tuple:
+    """
+    目录签名：定义文件的 (文件名, 修改时间ns, 大小)，任一文件增删改都会改变签名
+    :param filenames: 目录下的文件名列表，为空时重新列目录
+    """
+    if filenames is None:
+        filenames = os.listdir(data_dir)
+    signature = []
+    for filename in sorted(filenames):
+        if not is_definition_file(filename):
+            continue
+        stat = os.stat(os.path.join(data_dir, filename))
+        signature.append((filename, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def read_json(path: str) -> Any:
+    """读取 JSON 文件，文件未变化时返回缓存的解析结果；异常与 json.load 一致"""
+    stat = os.stat(path)
+    with _lock:
+        cached = _files.get(path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    with _lock:
+        _files[path] = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
+
+def read_json_files(data_dir: str, filenames: List[str],
+                    workers: Optional[int] = None) -> List[Tuple[str, Any, Optional[Exception]]]:
+    """
+    并行读取多个 JSON 文件
+    :return: 与 filenames 顺序一致的 [(文件名, 数据, 异常)]
+    """
+    def load(filename):
+        try:
+            return filename, read_json(os.path.join(data_dir, filename)), None
+        except Exception as e:
+            return filename, None, e
+
+    workers = max(1, min(int(workers or DEFAULT_WORKERS), len(filenames) or 1))
+    if workers == 1:
+        return [load(filename) for filename in filenames]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="definition-loader") as pool:
+        return list(pool.map(load, filenames))
+
+
+def snapshot_path(data_dir: str) -> str:
+    """快照文件路径：<DATA_DIR>/.<DIR_NAME>.definitions.pkl"""
+    data_dir = os.path.normpath(data_dir)
+    return os.path.join(os.path.dirname(data_dir), f".{os.path.basename(data_dir)}.definitions.pkl")
+
+
+def cached_case_list(data_dir: str, signature: Tuple, snapshot: bool = False,
+                     logger=None) -> Optional[List[Dict[str, Any]]]:
+    """
+    获取与目录签名一致的 case_list 缓存（先查内存，再查快照文件）
+    :return: 缓存的 case_list，没有或已过期时返回 None
+    """
+    key = os.path.abspath(data_dir)
+    with _lock:
+        cached = _case_lists.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    if not snapshot:
+        return None
+
+    path = snapshot_path(data_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as file:
+            data = pickle.load(file)
+    except Exception as e:
+        if logger is not None:
+            logger.error(f"读取测试定义快照失败 {path}: {e}")
+        return None
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION or data.get("signature") != signature:
+        return None
+    with _lock:
+        _case_lists[key] = (signature, data["case_list"])
+    return data["case_list"]
+
+
+def store_case_list(data_dir: str, signature: Tuple, case_list: List[Dict[str, Any]],
+                    snapshot: bool = False, logger=None) -> None:
+    """缓存整理后的 case_list，snapshot 为 True 时同时写入快照文件"""
+    with _lock:
+        _case_lists[os.path.abspath(data_dir)] = (signature, case_list)
+    if not snapshot:
+        return
+
+    path = snapshot_path(data_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            pickle.dump({"version": SNAPSHOT_VERSION, "signature": signature, "case_list": case_list}, file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        if logger is not None:
+            logger.error(f"写入测试定义快照失败 {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def clear_cache() -> None:
+    with _lock:
+        _files.clear()
+        _case_lists.clear()
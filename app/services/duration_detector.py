@@ -0,0 +1,221 @@
+"""
+流式耗时异常检测
+每存储一条测试记录更新一次，滑动窗口内检测两类异常：
+- 连续增长：相邻耗时差连续 DURATION_GROWTH_STEPS 次超过 DURATION_MIN_INCREASE；
+- 孤点：新记录的耗时比窗口内此前所有记录的最大值高出 DURATION_OUTLIER_MS 以上。
+窗口最大值用单调队列维护，增长用连续计数维护，每条记录的检测成本为 O(1)（均摊）。
+记录须按 run_id 递增检测：
+- 分配 run_id 的写入在 ordered() 锁内完成分配与 observe，检测顺序即分配顺序；
+- 指定 run_id 并行执行（多台架回放）时，分发时 reserve，结束时 release，先到的记录缓存到之前预留的
+  记录都到达（或释放）后再按 run_id 顺序检测；
+- 仍然晚到的旧记录（run_id 不大于已检测的最大值）无法检测，记录警告日志后忽略。
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.config import Config as DefaultConfig
+
+from .sqlite_store import resolve_db_path
+
+# 默认参数，与原20条固定窗口分析保持一致
+DEFAULT_WINDOW = 20
+DEFAULT_MIN_INCREASE = 100
+DEFAULT_OUTLIER_MS = 2000
+DEFAULT_GROWTH_STEPS = 4
+# 保留最近多少条记录的判定结果供 analyze_durations 查询
+_STRATEGY_HISTORY = 1000
+# 等待之前预留记录时最多缓存的记录数，超出时不再等待最早的预留
+_MAX_BUFFERED = 1000
+
+
+class DurationDetector:
+    """单个数据库的流式耗时异常检测器"""
+
+    def __init__(self, window: int = DEFAULT_WINDOW, min_increase: float = DEFAULT_MIN_INCREASE,
+                 outlier_ms: float = DEFAULT_OUTLIER_MS, growth_steps: int = DEFAULT_GROWTH_STEPS, logger=None):
+        """
+        :param window: 滑动窗口大小（孤点与窗口内其余记录比较）
+        :param min_increase: 连续增长的最小阈值(毫秒)，过滤抖动
+        :param outlier_ms: 孤点阈值(毫秒)
+        :param growth_steps: 连续增长次数
+        :param logger: 日志对象，忽略乱序记录时记录警告
+        """
+        self.window = max(2, int(window))
+        self.min_increase = min_increase
+        self.outlier_ms = outlier_ms
+        self.growth_steps = max(1, int(growth_steps))
+        self.logger = logger
+
+        # 可重入：ordered() 内调用 observe
+        self._lock = threading.RLock()
+        # 最近的记录（用于取增长片段对应的输入）
+        self._rows = deque(maxlen=max(self.window, self.growth_steps + 1))
+        # 单调递减队列 (序号, 耗时)，队首为窗口内最大耗时
+        self._max = deque()
+        self._seq = 0
+        self._last_run_id = None
+        self._streak = 0
+        self._strategies = OrderedDict()
+        # 已预留未检测的 run_id（升序），及其中已到达的记录（释放的为 None）
+        self._reserved = deque()
+        self._arrived: Dict[int, Optional[Dict[str, Any]]] = {}
+        self.seeded = False
+
+    def ordered(self):
+        """检测器锁：在锁内分配 run_id 并 observe，保证按分配顺序检测"""
+        return self._lock
+
+    def ensure_seeded(self, load: Callable[[], Iterable[Dict[str, Any]]]) -> None:
+        """
+        冷启动：首次使用时按 run_id 升序灌入历史记录，只建立状态不产生告警
+        :param load: 返回历史记录（run_id 升序）的函数
+        """
+        if self.seeded:
+            return
+        with self._lock:
+            if self.seeded:
+                return
+            for row in load():
+                self._push(row)
+            self.seeded = True
+
+    def reserve(self, run_id: int) -> None:
+        """预留一条将要写入的记录（按 run_id 升序调用），之后的记录等它到达或释放后再检测"""
+        with self._lock:
+            if self._last_run_id is not None and run_id <= self._last_run_id:
+                return
+            if self._reserved and run_id <= self._reserved[-1]:
+                return
+            self._reserved.append(run_id)
+
+    def release(self, run_id: int) -> List[Dict[str, Any]]:
+        """
+        结束一条预留（用例没有写入记录时也调用，已 observe 的无影响）
+        :return: 因此可以检测的后续记录中发现的异常
+        """
+        with self._lock:
+            if run_id not in self._arrived and run_id in self._reserved:
+                self._arrived[run_id] = None
+            return self._drain()
+
+    def observe(self, row: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        处理一条新记录
+        :param row: 至少包含 run_id、actual_duration，写 pro_input 时还需 round_id/type/strategy/actual_input
+        :return: 本次检测的记录（预留的记录可能连同之前缓存的一起检测）中发现的异常，
+                 每项为 {"growth_rows": [...], "outlier_row": row|None, "strategy": int}
+        """
+        with self._lock:
+            if row["run_id"] in self._reserved:
+                self._arrived[row["run_id"]] = row
+                return self._drain()
+            anomaly = self._detect(row)
+            return [anomaly] if anomaly else []
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        anomalies = []
+        while self._reserved and (self._reserved[0] in self._arrived or len(self._arrived) > _MAX_BUFFERED):
+            run_id = self._reserved.popleft()
+            row = self._arrived.pop(run_id, None)
+            if row is not None:
+                anomaly = self._detect(row)
+                if anomaly:
+                    anomalies.append(anomaly)
+        return anomalies
+
+    def _detect(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # 乱序到达的旧记录无法放回窗口中的位置，不参与检测
+        if self._last_run_id is not None and row["run_id"] <= self._last_run_id:
+            if self.logger is not None:
+                self.logger.warn("耗时检测忽略乱序到达的记录 run_id=%s（已检测到 run_id=%s）",
+                                 row["run_id"], self._last_run_id)
+            return None
+
+        duration = int(row.get("actual_duration") or 0)
+        # 窗口内此前 window-1 条记录的最大值
+        self._expire(self._seq - (self.window - 1))
+        enough_history = len(self._rows) >= self.window - 1
+        prev_max = self._max[0][1] if self._max else None
+        is_outlier = enough_history and prev_max is not None and duration - prev_max > self.outlier_ms
+
+        # 连续增长计数
+        if self._rows and duration - int(self._rows[-1].get("actual_duration") or 0) > self.min_increase:
+            self._streak += 1
+        else:
+            self._streak = 0
+        growth_rows = None
+        if self._streak == self.growth_steps:
+            # 与原分析一致：记录增长片段的前 growth_steps 个点
+            growth_rows = list(self._rows)[-self.growth_steps:]
+
+        self._push(row)
+
+        # 有孤点返回策略3，仅有增长返回0
+        strategy = 3 if is_outlier else 0
+        self._strategies[row["run_id"]] = strategy
+        while len(self._strategies) > _STRATEGY_HISTORY:
+            self._strategies.popitem(last=False)
+
+        if not is_outlier and growth_rows is None:
+            return None
+        return {"growth_rows": growth_rows or [], "outlier_row": row if is_outlier else None, "strategy": strategy}
+
+    def strategy_for(self, run_id: int) -> int:
+        """获取某条记录的检测结果策略（未检测过返回0）"""
+        with self._lock:
+            return self._strategies.get(run_id, 0)
+
+    def _push(self, row: Dict[str, Any]) -> None:
+        duration = int(row.get("actual_duration") or 0)
+        self._seq += 1
+        self._last_run_id = row["run_id"]
+        self._rows.append(row)
+        while self._max and self._max[-1][1] <= duration:
+            self._max.pop()
+        self._max.append((self._seq, duration))
+
+    def _expire(self, min_seq: int) -> None:
+        while self._max and self._max[0][0] <= min_seq:
+            self._max.popleft()
+
+
+def _config_value(config, name: str, default):
+    """读取配置项，未配置（None）时取默认值；配置为 0 时保留 0"""
+    value = getattr(config, name, None)
+    return default if value is None else value
+
+
+_detectors: Dict[str, DurationDetector] = {}
+_detectors_lock = threading.Lock()
+
+
+def get_duration_detector(db_url: str, config=None, logger=None) -> DurationDetector:
+    """
+    获取数据库对应的共享检测器
+    :param config: 配置对象，读取 DURATION_WINDOW / DURATION_MIN_INCREASE / DURATION_OUTLIER_MS / DURATION_GROWTH_STEPS
+    :param logger: 日志对象，检测器尚无日志对象时设置
+    """
+    config = config or DefaultConfig
+    path = resolve_db_path(db_url)
+    with _detectors_lock:
+        detector = _detectors.get(path)
+        if detector is None:
+            detector = DurationDetector(
+                window=_config_value(config, "DURATION_WINDOW", DEFAULT_WINDOW),
+                min_increase=_config_value(config, "DURATION_MIN_INCREASE", DEFAULT_MIN_INCREASE),
+                outlier_ms=_config_value(config, "DURATION_OUTLIER_MS", DEFAULT_OUTLIER_MS),
+                growth_steps=_config_value(config, "DURATION_GROWTH_STEPS", DEFAULT_GROWTH_STEPS),
+                logger=logger,
+            )
+            _detectors[path] = detector
+        elif detector.logger is None:
+            detector.logger = logger
+        return detector
+
+
+def discard_duration_detector(db_url: str) -> None:
+    """丢弃数据库对应的检测器（数据库的历史记录被重建后调用），下次使用时重新冷启动"""
+    with _detectors_lock:
+        _detectors.pop(resolve_db_path(db_url), None)
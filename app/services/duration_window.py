@@ -0,0 +1,92 @@
+"""
+耗时分析滑动窗口
+在内存中保存每个数据库最近 N 条测试记录（run_id、耗时及写 pro_input 所需字段），
+由 store_test_result 在插入时直接追加；只有冷启动或窗口覆盖不足时才查询数据库
+（ORDER BY run_id DESC LIMIT N，走主键索引），分析成本与历史数据量无关。
+"""
+
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List
+
+from .sqlite_store import resolve_db_path
+
+# 默认窗口大小
+DEFAULT_WINDOW_SIZE = 20
+
+
+class DurationWindow:
+    """最近 N 条测试记录的滑动窗口（按 run_id 升序保存）"""
+
+    def __init__(self, size: int = DEFAULT_WINDOW_SIZE):
+        self.size = size
+        self._rows = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """
+        追加一条记录，row 至少包含 run_id 和 actual_duration
+        并发写入时 run_id 可能乱序到达，按 run_id 插入到正确位置
+        """
+        with self._lock:
+            rows = self._rows
+            if not rows or rows[-1]["run_id"] < row["run_id"]:
+                rows.append(row)
+                return
+            ordered = sorted(list(rows) + [row], key=lambda r: r["run_id"])
+            rows.clear()
+            rows.extend(ordered[-self.size:])
+
+    def recent(self, run_id: int, loader: Callable[[int, int], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        获取截至 run_id 的最近 size 条记录（按 run_id 降序）
+        :param run_id: 上界 run_id
+        :param loader: 窗口覆盖不足时的回退查询 loader(run_id, limit)，返回按 run_id 降序的记录
+        """
+        with self._lock:
+            rows = [row for row in reversed(self._rows) if row["run_id"] <= run_id]
+        if len(rows) >= self.size:
+            return rows[:self.size]
+
+        loaded = loader(run_id, self.size)
+        # 冷启动：用数据库中的记录补齐窗口
+        with self._lock:
+            merged = {row["run_id"]: row for row in loaded}
+            merged.update((row["run_id"], row) for row in self._rows)
+            ordered = sorted(merged.values(), key=lambda r: r["run_id"])
+            self._rows.clear()
+            self._rows.extend(ordered[-self.size:])
+        return loaded
+
+    def discard(self, run_id: int) -> None:
+        """移除一条记录（写入失败时调用），窗口不足的部分在下次查询时从数据库补齐"""
+        with self._lock:
+            rows = [row for row in self._rows if row["run_id"] != run_id]
+            if len(rows) != len(self._rows):
+                self._rows.clear()
+                self._rows.extend(rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+
+
+_windows: Dict[str, DurationWindow] = {}
+_windows_lock = threading.Lock()
+
+
+def get_duration_window(db_url: str, size: int = DEFAULT_WINDOW_SIZE) -> DurationWindow:
+    """获取数据库对应的共享耗时窗口"""
+    path = resolve_db_path(db_url)
+    with _windows_lock:
+        window = _windows.get(path)
+        if window is None or window.size != size:
+            window = DurationWindow(size)
+            _windows[path] = window
+        return window
+
+
+def discard_duration_window(db_url: str) -> None:
+    """丢弃数据库对应的耗时窗口（数据库的历史记录被重建后调用）"""
+    with _windows_lock:
+        _windows.pop(resolve_db_path(db_url), None)
@@ -0,0 +1,146 @@
+"""
+参数取值域
+classify_cases 时为每个输入参数建立一次取值表，变异时不再重复生成候选值：
+- values：与原 get_param_values 一致的候选值（np.arange 后保留1位小数，in_range=1 时去掉边界），有序数组；
+- 邻近值：用 np.searchsorted 定位当前值（O(log n)），再按螺旋窗口向两侧取值；
+- 随机取值：与 generate_value 一致（in_range=1 时在 (min, max) 内按步长取值），
+  可一次为 M 个参数各取 K 个值。
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ParamDomain:
+    """单个输入参数的取值域"""
+
+    def __init__(self, param: Dict[str, Any]):
+        """
+        :param param: 参数配置（in_type / in_range / min / max / step_len）
+        """
+        self.param = param
+        self.in_type = param.get("in_type")
+        self.in_range = param.get("in_range")
+        self.min = _to_float(param.get("min", 0))
+        self.max = _to_float(param.get("max"))
+        self.step = _to_float(param.get("step_len", 1)) or 1.0
+        self.data_type = "int" if self.step.is_integer() else "float"
+        # 固定值：in_type=2 或 in_range=2
+        self.fixed = self.in_type == 2 or (self.in_type == 1 and self.in_range == 2)
+        # 范围内随机取值：步数上限（不含两端）
+        self.random_range = self.in_type == 1 and self.in_range == 1
+        self.range_size = int((self.max - self.min) / self.step) if None not in (self.min, self.max) else 0
+
+        self.error = None
+        self.values = self._build_values()
+        self.value_list = self.values.tolist()
+        self._sorted = bool(np.all(np.diff(self.values) >= 0))
+
+    def _build_values(self) -> np.ndarray:
+        if self.in_type == 2:  # 固定值
+            if self.min is None:
+                self.error = f"参数值转换失败: min={self.param.get('min')!r}"
+                return np.array([])
+            return np.array([self.min])
+        try:
+            min_val = float(self.param["min"])
+            max_val = float(self.param["max"])
+            step = float(self.param.get("step_len", 1))
+        except (ValueError, TypeError, KeyError) as e:
+            self.error = f"参数值转换失败: {str(e)}"
+            return np.array([])
+
+        try:
+            values = np.round(np.arange(min_val, max_val + step, step), 1)
+        except Exception as e:
+            self.error = f"生成参数值序列失败: {str(e)}"
+            return np.array([])
+
+        # 处理不包含边界的情况
+        if self.param.get("in_range", 0) == 1:  # 默认包含边界
+            values = values[~(np.isclose(values, min_val) | np.isclose(values, max_val))]
+        return values
+
+    def index_of(self, value: float) -> int:
+        """查找候选值下标，不存在时抛出 ValueError（与 list.index 一致）"""
+        if self._sorted:
+            index = int(np.searchsorted(self.values, value))
+            if index < len(self.value_list) and self.value_list[index] == value:
+                return index
+            raise ValueError(f"{value} is not in list")
+        return self.value_list.index(value)
+
+    def neighbors(self, value: float, count: int) -> List[float]:
+        """
+        螺旋式滑动窗口：以当前值为中心向两侧取至少 count 个候选值，去重并排除当前值
+        :raises ValueError: 当前值不在候选值中
+        """
+        index = self.index_of(value)
+        values = self.value_list
+        size = len(values)
+        picked = []
+        radius = 0
+        max_radius = max(index, size - index - 1)
+        while len(picked) < count and radius <= max_radius:
+            # 向左扩展
+            if index - radius >= 0:
+                picked.append(values[index - radius])
+            # 向右扩展（避免radius=0时重复添加当前值）
+            if radius != 0 and index + radius < size:
+                picked.append(values[index + radius])
+            radius += 1
+        return [v for v in list(set(picked)) if v != value]
+
+
+def _domain_key(param: Dict[str, Any]) -> Tuple:
+    return (param.get("uuid"), param.get("name"), param.get("in_type"), param.get("in_range"),
+            param.get("min"), param.get("max"), param.get("step_len"))
+
+
+class DomainIndex:
+    """参数取值域索引：同一参数配置只建立一次取值域"""
+
+    def __init__(self):
+        self._domains: Dict[Tuple, ParamDomain] = {}
+
+    def __len__(self) -> int:
+        return len(self._domains)
+
+    def get(self, param: Dict[str, Any]) -> ParamDomain:
+        key = _domain_key(param)
+        domain = self._domains.get(key)
+        if domain is None:
+            domain = ParamDomain(param)
+            self._domains[key] = domain
+        return domain
+
+    def sample_batch(self, domains: List[ParamDomain], k: int,
+                     rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        为 M 个参数各随机取 K 个值（分布与 generate_value 一致）
+        :param domains: 参数取值域列表
+        :param k: 每个参数取值个数
+        :param rng: numpy 随机数生成器
+        :return: (M, K) 数组，无法随机取值的参数为 nan
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        size = len(domains)
+        mins = np.array([np.nan if d.min is None else d.min for d in domains], dtype=float)
+        steps = np.array([d.step for d in domains], dtype=float)
+        randoms = np.array([d.random_range and d.range_size >= 2 for d in domains], dtype=bool)
+        valid = randoms | np.array([d.fixed for d in domains], dtype=bool)
+        # 随机参数在 [1, range_size) 内取步数，固定值取 0 步
+        low = np.where(randoms, 1, 0)
+        high = np.where(randoms, [d.range_size for d in domains], 1)
+        offsets = rng.integers(low[:, None], high[:, None], size=(size, k)) if size else np.zeros((0, k))
+        samples = mins[:, None] + offsets * steps[:, None]
+        samples[~valid] = np.nan
+        return samples
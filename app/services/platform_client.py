@@ -0,0 +1,146 @@
+"""
+测试平台接口客户端
+所有与测试平台(HIL台架)的HTTP交互共用一个带连接池的Session，保持长连接，
+并按接口(reset/mapping/read/send)区分连接/读取超时，统计每个接口的调用耗时。
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import Config as DefaultConfig
+
+# 默认连接池大小
+DEFAULT_POOL_SIZE = 10
+
+
+class PlatformClient:
+    """测试平台HTTP客户端：连接池复用、分接口超时、分接口耗时统计"""
+
+    def __init__(self, base_url: str, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeouts: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        :param base_url: 测试平台基础URL（仅用于标识台架）
+        :param pool_size: 连接池大小
+        :param timeouts: 各接口的 (连接超时, 读取超时)，未配置的接口使用 Config.PLATFORM_TIMEOUTS
+        """
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.timeouts = {k: tuple(v) for k, v in getattr(DefaultConfig, "PLATFORM_TIMEOUTS", {}).items()}
+        if timeouts:
+            self.timeouts.update({k: tuple(v) for k, v in timeouts.items()})
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Connection"] = "keep-alive"
+
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def post(self, endpoint: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送POST请求并记录耗时
+        :param endpoint: 接口名称（reset/mapping/read/send），用于选择超时和统计
+        :param url: 完整请求地址
+        :return: requests.Response，请求异常时向上抛出
+        """
+        kwargs.setdefault("timeout", self.timeouts.get(endpoint))
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = self.session.post(url, **kwargs)
+            ok = True
+            return response
+        finally:
+            self._record(endpoint, (time.perf_counter() - start) * 1000, ok)
+
+    def _record(self, endpoint: str, elapsed_ms: float, ok: bool) -> None:
+        with self._stats_lock:
+            stat = self._stats.get(endpoint)
+            if stat is None:
+                stat = {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+                self._stats[endpoint] = stat
+            stat["count"] += 1
+            if not ok:
+                stat["errors"] += 1
+            stat["total_ms"] += elapsed_ms
+            stat["last_ms"] = elapsed_ms
+            if elapsed_ms > stat["max_ms"]:
+                stat["max_ms"] = elapsed_ms
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """返回各接口的调用次数、失败次数、平均/最大/最近一次耗时(毫秒)"""
+        with self._stats_lock:
+            result = {}
+            for endpoint, stat in self._stats.items():
+                count = stat["count"]
+                result[endpoint] = {
+                    "count": count,
+                    "errors": stat["errors"],
+                    "avg_ms": round(stat["total_ms"] / count, 2) if count else 0,
+                    "max_ms": round(stat["max_ms"], 2),
+                    "last_ms": round(stat["last_ms"], 2),
+                }
+            return result
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._stats = {}
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_clients: Dict[str, PlatformClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_platform_client(config) -> PlatformClient:
+    """
+    获取共享的测试平台客户端，同一台架URL在进程内只创建一次
+    :param config: 配置对象，读取 TEST_PALTFORM_URL / PLATFORM_POOL_SIZE / PLATFORM_TIMEOUTS
+    """
+    base_url = getattr(config, "TEST_PALTFORM_URL", "") or ""
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            pool_size = getattr(config, "PLATFORM_POOL_SIZE", None) or DEFAULT_POOL_SIZE
+            timeouts = getattr(config, "PLATFORM_TIMEOUTS", None)
+            client = PlatformClient(base_url, pool_size=int(pool_size), timeouts=timeouts)
+            _clients[base_url] = client
+        return client
+
+
+class BenchConfig:
+    """单台架配置视图：覆盖平台URL及各接口地址，其余配置项透传给原配置对象"""
+
+    def __init__(self, config, base_url: str):
+        self._config = config
+        base_url = base_url.rstrip("/")
+        self.TEST_PALTFORM_URL = base_url
+        self.reset_api = f"{base_url}/api/v1/reset"
+        self.map_api = f"{base_url}/api/v1/mapping"
+        self.read_api = f"{base_url}/api/v1/read"
+        self.send_api = f"{base_url}/api/v1/send"
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name == "_config":
+            raise AttributeError(name)
+        return getattr(self._config, name)
+
+
+def get_bench_urls(config, key: str = "PLATFORM_BENCH_URLS") -> list:
+    """读取台架URL列表（配置项 key，列表或逗号分隔），未配置时只使用 TEST_PALTFORM_URL"""
+    urls = getattr(config, key, None) or []
+    if isinstance(urls, str):
+        urls = [u.strip() for u in urls.split(",")]
+    urls = [u for u in urls if u]
+    if not urls:
+        base_url = getattr(config, "TEST_PALTFORM_URL", "")
+        urls = [base_url] if base_url else []
+    return urls
@@ -1,9 +1,13 @@
+import itertools
+
 from .data_init import DataInit
 from .data_variation import DataVariation
 from .result_judge import ResultJudge
 from .bq_api import *
 from .database_handler import TestResultHandler
-from .replay_runner import ReplayService
+from .replay_runner import AsyncReplayRunner, ReplayService, prepare_replay_judge
+from .platform_client import get_platform_client, get_bench_urls
+from .async_runner import AsyncCampaignRunner
 
 
 
@@ -27,6 +31,8 @@ class ProcessCtrl:
         self.read_api = f"{self.api_base_url}/api/v1/read"  # 添加读取API的URL
         self.map_api = f"{self.api_base_url}/api/v1/mapping"  # 添加读取API的URL
         self.reset_api = f"{self.api_base_url}/api/v1/reset"  # 添加读取API的URL
+        # 测试平台客户端（连接池复用，复位/发送/读取共用）
+        self.platform_client = get_platform_client(self.config)
 
     # 主流程
     def run(self):
@@ -118,41 +124,27 @@ class ProcessCtrl:
                     break
                 pass
 
-            # 二、测试结果判断模块---创建结果判断模块实例
-            judge = ResultJudge(self.logger, config=self.config, round_id=current_round_id, app=self.app)
-            while not self.sing_stop:
-                # 测试平台接口交互模块发，送复位消息，成功继续运行，失败继续下一个用例
-                if self.reset==False:
-                    bak = api_reset(self)
-                    self.reset=True
-                if bak:
-                    pass
-                else:
-                    continue
-
-                # 测试输入数据变异模块---取出数据
-                tast_data = data_variation.pop_first_data()
-                if tast_data is None:
-                    self.logger.info("测试输入数据变异模块---取出数据---结束")
-                    break
-
-                # 测试结果判断模块---处理测试数据 & 调用用例运行策略
-                result = judge.process_test_data(tast_data)
-
-                # 测试结果判断模块---处理测试数据---失败
-                if 'status' in result:
-                    self.logger.error("测试结果判断模块---处理测试数据---失败")
-                    break
-
-                # 测试结果判断模块---调用用例运行策略---停止
-                if ('stop_signal' in result) and (result["stop_signal"] is True):
+            # 多台架：用例池分发到各台架并发执行
+            bench_urls = get_bench_urls(self.config)
+            if len(bench_urls) > 1:
+                runner = AsyncCampaignRunner(self.logger, self.config, bench_urls, round_id=current_round_id,
+                                             app=self.app, should_stop=lambda: self.sing_stop)
+                outcome = runner.run(data_variation)
+                if outcome["stop_signal"]:
                     self.logger.error("测试结果判断模块---调用用例运行策略---停止")
                     self.sing_stop = True
                     return
+                # 轮次切换前等待本轮结果全部落库
+                db_handler.flush()
+                self.round_times += 1
+                continue
 
-                # 测试输入数据变异模块---执行对应策略
-                # data_variation.trigger_variation(result)
+            # 二、测试结果判断模块---单台架顺序执行本轮用例
+            if self.run_cases(data_variation, current_round_id):
+                return
 
+            # 轮次切换前等待本轮结果全部落库，下一轮基于数据库中的新状态生成用例
+            db_handler.flush()
             # 轮次加1
             self.round_times += 1
 
@@ -162,19 +154,81 @@ class ProcessCtrl:
 
 
 
+    def run_cases(self, data_variation, round_id) -> bool:
+        """
+        在当前台架上顺序执行用例池中的用例，直到用例取完、处理失败或收到停止信号
+        :param data_variation: 测试输入数据变异模块实例
+        :param round_id: 当前轮次id
+        :return: 用例运行策略要求停止整个测试任务时返回 True
+        """
+        # 二、测试结果判断模块---创建结果判断模块实例
+        judge = ResultJudge(self.logger, config=self.config, round_id=round_id, app=self.app,
+                            platform_client=self.platform_client)
+        bak = True
+        while not self.sing_stop:
+            # 测试平台接口交互模块发，送复位消息，成功继续运行，失败继续下一个用例
+            if self.reset==False:
+                bak = api_reset(self)
+                self.reset=True
+            if bak:
+                pass
+            else:
+                continue
+
+            # 测试输入数据变异模块---取出数据
+            tast_data = data_variation.pop_first_data()
+            if tast_data is None:
+                self.logger.info("测试输入数据变异模块---取出数据---结束")
+                break
+
+            # 测试结果判断模块---处理测试数据 & 调用用例运行策略
+            result = judge.process_test_data(tast_data)
+
+            # 测试结果判断模块---处理测试数据---失败
+            if 'status' in result:
+                self.logger.error("测试结果判断模块---处理测试数据---失败")
+                break
+
+            # 测试结果判断模块---调用用例运行策略---停止
+            if ('stop_signal' in result) and (result["stop_signal"] is True):
+                self.logger.error("测试结果判断模块---调用用例运行策略---停止")
+                self.sing_stop = True
+                return True
+
+            # 测试输入数据变异模块---执行对应策略
+            # data_variation.trigger_variation(result)
+        return False
+
     def _run_replay_mode(self):
         self.sing_stop = False
         self.reset = False
         replay_service = ReplayService(self.logger, self.config, self.app)
-        cases = replay_service.load_cases()
-        if not cases:
+        # 逐条读取回放用例，取到第一条即开始执行
+        cases = replay_service.iter_cases()
+        first_case = next(cases, None)
+        if first_case is None:
             self.logger.warn("Replay mode did not yield any inputs to execute")
             return
 
         replay_config = replay_service.get_replay_config()
-        judge = ResultJudge(self.logger, config=replay_config, round_id=cases[0].round_id, app=self.app)
+        # 结果按源 run_id 写入回放库，断点记录之前用例全部完成的最大源 run_id
+        checkpoint = replay_service.checkpoint()
+
+        # 多台架：回放用例按源 run_id 顺序并行分发
+        if len(replay_service.bench_urls) > 1:
+            runner = AsyncReplayRunner(self.logger, replay_config, replay_service.bench_urls, checkpoint,
+                                       app=self.app, should_stop=lambda: self.sing_stop)
+            outcome = runner.run(itertools.chain([first_case], cases))
+            if outcome["stop_signal"]:
+                self.sing_stop = True
+            self._finish_replay(replay_service, cases, checkpoint)
+            return
 
-        for case in cases:
+        self.platform_client = replay_service.platform_client
+        judge = ResultJudge(self.logger, config=replay_config, round_id=first_case.round_id, app=self.app,
+                            platform_client=self.platform_client)
+
+        for case in itertools.chain([first_case], cases):
             # 检查停止信号
             if self.sing_stop:
                 self.logger.warn("Replay mode received external stop signal; stopping")
@@ -183,21 +237,18 @@ class ProcessCtrl:
             if not self.reset:
                 if not api_reset(self):
                     self.logger.error("Replay mode reset failed; aborting replay execution")
+                    cases.close()
                     return
                 self.reset = True
 
-            judge.round_id = case.round_id
-            case_payload = case.payload
-            case_type = case_payload.get("type")
-            if case_type == 2:
-                judge.test_times = 1
-            else:
-                judge.test_times = 0
+            checkpoint.dispatch(case.run_id)
+            prepare_replay_judge(judge, case)
 
-            result = judge.process_test_data(case_payload)
+            result = judge.process_test_data(case.payload)
 
             if 'status' in result:
                 self.logger.error(f"Replay mode failed for source run_id={case.run_id}: {result}")
+                checkpoint.complete(case.run_id)
                 continue
 
             if ('stop_signal' in result) and result["stop_signal"]:
@@ -205,11 +256,20 @@ class ProcessCtrl:
                 self.sing_stop = True
                 break
 
+            checkpoint.complete(case.run_id)
             self.logger.info(
                 f"Replay mode executed source run_id={case.run_id} with strategy {result.get('strategy')}"
             )
 
-        self.logger.info("Replay mode execution completed")
+        self._finish_replay(replay_service, cases, checkpoint)
+
+    def _finish_replay(self, replay_service, cases, checkpoint):
+        # 提前停止时关闭源数据库游标，等待结果与断点落库
+        cases.close()
+        checkpoint.flush()
+        done, total = replay_service.progress()
+        self.logger.info(f"Replay mode execution completed ({done}/{total} source rows, "
+                         f"checkpoint run_id={checkpoint.completed_run_id})")
 
 
 
@@ -0,0 +1,133 @@
+"""
+回放结果对比
+回放结果以源记录 run_id 为主键写入回放库，按 run_id 连接源库与回放库的 test_runs，一条查询流式读取；
+每批记录转换为 NumPy 数组后统计状态/策略变化分组计数与耗时差（回放 - 原始，毫秒）分位数，
+不为每条记录构建字典，内存只随耗时差数组（每条 8 字节）增长。
+"""
+
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 每次从游标读取的记录数
+DIFF_FETCH_ROWS = 100000
+# 耗时差分位数
+DURATION_PERCENTILES = (50, 90, 95, 99)
+# 状态/策略为空时的分组取值
+_NULL = -(2 ** 31)
+
+# 列：原状态、原策略、是否有回放记录、回放状态、回放策略、耗时差
+_DIFF_SQL = """
+    SELECT s.status, s.strategy, r.run_id IS NOT NULL, r.status, r.strategy,
+           r.actual_duration - s.actual_duration
+    FROM main.test_runs AS s
+    LEFT JOIN replay.test_runs AS r ON r.run_id = s.run_id
+"""
+
+
+def _value(code: int) -> Optional[int]:
+    return None if code == _NULL else code
+
+
+def _group_counts(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按行分组计数：各列分别编码后按混合进制合成一列整数，一维去重，避免按行排序
+    :return: (分组取值, 各组条数)
+    """
+    columns = [np.unique(column, return_inverse=True) for column in keys.T]
+    shape = tuple(len(values) for values, _ in columns)
+    codes, counts = np.unique(np.ravel_multi_index([inverse for _, inverse in columns], shape),
+                              return_counts=True)
+    indexes = np.unravel_index(codes, shape)
+    groups = np.stack([values[index] for (values, _), index in zip(columns, indexes)], axis=1)
+    return groups, counts
+
+
+def replay_diff(source_path: str, replay_path: str, start_run_id: Optional[int] = None,
+                end_run_id: Optional[int] = None, fetch_rows: int = DIFF_FETCH_ROWS) -> Dict[str, Any]:
+    """
+    对比源库与回放库中同一源 run_id 的测试结果
+    :param start_run_id: 源 run_id 下界（含），为空时不限
+    :param end_run_id: 源 run_id 上界（含），为空时不限
+    :return: dict - total / replayed / missing / unchanged / statusChanged / strategyChanged /
+             transitions(按条数降序，to 为 None 表示回放库中没有结果) / duration(耗时差统计)
+    :raises FileNotFoundError: 数据库文件不存在
+    """
+    for path in (source_path, replay_path):
+        if not path or not os.path.exists(path):
+            raise FileNotFoundError(f"数据库不存在: {path}")
+
+    conditions: List[str] = []
+    params: List[int] = []
+    if start_run_id is not None:
+        conditions.append("s.run_id >= ?")
+        params.append(int(start_run_id))
+    if end_run_id is not None:
+        conditions.append("s.run_id <= ?")
+        params.append(int(end_run_id))
+    sql = _DIFF_SQL + (" WHERE " + " AND ".join(conditions) if conditions else "")
+
+    # (原状态, 原策略, 是否回放, 回放状态, 回放策略) -> 条数
+    buckets: Dict[Tuple[int, ...], int] = {}
+    deltas: List[np.ndarray] = []
+    conn = sqlite3.connect(source_path)
+    try:
+        conn.execute("ATTACH DATABASE ? AS replay", (replay_path,))
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(fetch_rows)
+            if not rows:
+                break
+            # None 转换为 NaN
+            data = np.array(rows, dtype=np.float64)
+            keys = np.where(np.isnan(data[:, :5]), _NULL, data[:, :5]).astype(np.int64)
+            unique, counts = _group_counts(keys)
+            for key, count in zip(map(tuple, unique.tolist()), counts.tolist()):
+                buckets[key] = buckets.get(key, 0) + count
+            delta = data[:, 5]
+            deltas.append(delta[~np.isnan(delta)])
+    finally:
+        conn.close()
+
+    return _report(buckets, np.concatenate(deltas) if deltas else np.empty(0))
+
+
+def _report(buckets: Dict[Tuple[int, ...], int], deltas: np.ndarray) -> Dict[str, Any]:
+    total = replayed = status_changed = strategy_changed = unchanged = 0
+    transitions = []
+    # 按条数降序，条数相同时按分组取值排序，输出顺序与读取批次无关
+    for (status, strategy, has_replay, replay_status, replay_strategy), count in \
+            sorted(buckets.items(), key=lambda item: (-item[1], item[0])):
+        total += count
+        origin = {"status": _value(status), "strategy": _value(strategy)}
+        if not has_replay:
+            transitions.append({"from": origin, "to": None, "count": count})
+            continue
+        replayed += count
+        status_changed += count if status != replay_status else 0
+        strategy_changed += count if strategy != replay_strategy else 0
+        unchanged += count if status == replay_status and strategy == replay_strategy else 0
+        transitions.append({"from": origin, "to": {"status": _value(replay_status),
+                                                   "strategy": _value(replay_strategy)}, "count": count})
+
+    duration: Dict[str, Any] = {"count": int(deltas.size)}
+    if deltas.size:
+        percentiles = np.percentile(deltas, DURATION_PERCENTILES)
+        duration.update({
+            "mean": round(float(deltas.mean()), 2),
+            "min": float(deltas.min()),
+            "max": float(deltas.max()),
+        })
+        duration.update({f"p{p}": round(float(value), 2) for p, value in zip(DURATION_PERCENTILES, percentiles)})
+    return {
+        "total": total,
+        "replayed": replayed,
+        "missing": total - replayed,
+        "unchanged": unchanged,
+        "statusChanged": status_changed,
+        "strategyChanged": strategy_changed,
+        "transitions": transitions,
+        "duration": duration,
+    }
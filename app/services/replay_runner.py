@@ -1,11 +1,47 @@
 import copy
 import json
 import os
-import shutil
 import sqlite3
+import threading
+from collections import deque
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
+from .async_runner import AsyncCampaignRunner
+from .database_handler import TestResultHandler
+from .duration_detector import discard_duration_detector
+from .duration_window import discard_duration_window
+from .platform_client import get_bench_urls, get_platform_client
+from .sqlite_store import get_store
+
+# 回放断点表：单行，记录源库路径与之前用例全部完成的最大源 run_id
+CHECKPOINT_TABLE = "replay_checkpoint"
+_CHECKPOINT_SCHEMA = (
+    f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} "
+    "(id INTEGER PRIMARY KEY CHECK (id = 1), source_db TEXT, completed_run_id INTEGER)"
+)
+# 回放目标库中按结构重建的历史记录表，其余表（用户、配置等数据量小）连同数据一起复制
+HISTORY_TABLES = ("test_runs", "test_error_log", "test_run_log_relation", "pro_input", CHECKPOINT_TABLE)
+# 结构对象的创建顺序：先建表，再建依赖表的索引、视图、触发器
+_SCHEMA_ORDER = {"table": 0, "index": 1, "view": 2, "trigger": 3}
+_WORKSPACE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def resolve_workspace_path(path: Optional[str]) -> Optional[str]:
+    """回放相关的数据库路径：相对路径按项目根目录解析"""
+    if path is None:
+        return None
+    if os.path.isabs(path):
+        return path
+    return os.path.abspath(os.path.join(_WORKSPACE_ROOT, path))
+
+
+def replay_db_paths(config) -> Tuple[Optional[str], Optional[str]]:
+    """配置中的 (回放源库路径, 回放库路径)"""
+    return (
+        resolve_workspace_path(getattr(config, "REPLAY_SOURCE_DATABASE_URI", None) or config.DATABASE),
+        resolve_workspace_path(getattr(config, "REPLAY_DATABASE_URI", None) or os.path.join("app", "replay.db")),
+    )
 
 @dataclass
 class ReplayCase:
@@ -16,38 +52,160 @@ class ReplayCase:
     original_status: Optional[int] = None
 
 
+class ReplayCheckpoint:
+    """
+    回放断点：用例按源 run_id 升序分发，并行执行时乱序完成；completed_run_id 为之前用例全部完成的最大源 run_id。
+    断点经回放库的写入队列保存，排在已完成用例的结果之后提交，中断后从断点之后继续不会漏跑
+    """
+
+    def __init__(self, store, source_db_path: str, completed_run_id: Optional[int] = None):
+        self.store = store
+        self.source_db_path = source_db_path
+        self.completed_run_id = completed_run_id
+        # 已分发未推进断点的源 run_id（升序）及其中已完成的部分
+        self._pending = deque()
+        self._done = set()
+        self._lock = threading.Lock()
+
+    def dispatch(self, run_id: int) -> None:
+        with self._lock:
+            self._pending.append(run_id)
+
+    def complete(self, run_id: int) -> None:
+        with self._lock:
+            self._done.add(run_id)
+            advanced = False
+            while self._pending and self._pending[0] in self._done:
+                self.completed_run_id = self._pending.popleft()
+                self._done.discard(self.completed_run_id)
+                advanced = True
+            if advanced:
+                self.store.submit(
+                    f"INSERT OR REPLACE INTO {CHECKPOINT_TABLE} (id, source_db, completed_run_id) VALUES (1, ?, ?)",
+                    (self.source_db_path, self.completed_run_id),
+                )
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待结果与断点全部落库"""
+        return self.store.flush(timeout)
+
+
+class AsyncReplayRunner(AsyncCampaignRunner):
+    """多台架并行回放：回放用例按源 run_id 顺序分发到各台架，结果按源 run_id 写入回放库，与完成顺序无关"""
+
+    def __init__(self, logger, config, bench_urls: List[str], checkpoint: ReplayCheckpoint, app=None,
+                 concurrency: Optional[int] = None, should_stop=None):
+        super().__init__(logger, config, bench_urls, round_id=None, app=app, concurrency=concurrency,
+                         should_stop=should_stop)
+        self.checkpoint = checkpoint
+        # 回放库的耗时检测：用例乱序完成，按源 run_id 预留/释放后顺序检测
+        self.results = TestResultHandler(logger, config.SQLALCHEMY_DATABASE_URI)
+
+    async def _run_slot(self, url: str, judge, cases: Iterator[ReplayCase]) -> None:
+        while not self._stopped():
+            # 事件循环单线程取用例，分发顺序即源 run_id 顺序
+            case = next(cases, None)
+            if case is None:
+                break
+            self.checkpoint.dispatch(case.run_id)
+            self.results.reserve_duration(case.run_id)
+            prepare_replay_judge(judge, case)
+
+            result = await judge.process_test_data_async(case.payload)
+            self.results.release_duration(case.run_id)
+
+            if 'status' in result:
+                self.logger.error(f"Replay bench {url} failed for source run_id={case.run_id}: {result}")
+            elif result.get("stop_signal"):
+                self.logger.warn(f"Replay bench {url} received stop signal at source run_id={case.run_id}")
+                self.stop_signal = True
+                break
+            self.checkpoint.complete(case.run_id)
+            self.completed[url] += 1
+
+
+def prepare_replay_judge(judge, case: ReplayCase) -> None:
+    """按回放用例设置结果判断模块：原轮次、源 run_id，类型2的用例按休眠轮判断"""
+    judge.round_id = case.round_id
+    judge.replay_run_id = case.run_id
+    judge.test_times = 1 if case.payload.get("type") == 2 else 0
+
+
 class ReplayService:
     def __init__(self, logger, config, app=None):
         self.logger = logger
         self.config = config
         self.app = app
-        self._workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-        self.source_db_path = self._resolve_path(getattr(config, "REPLAY_SOURCE_DATABASE_URI", config.DATABASE))
-        self.target_db_path = self._resolve_path(getattr(config, "REPLAY_DATABASE_URI", os.path.join("app", "replay.db")))
+        self.source_db_path, self.target_db_path = replay_db_paths(config)
         self.start_run_id = self._coerce_run_id(getattr(config, "REPLAY_START_RUN_ID", None), "REPLAY_START_RUN_ID")
         self.end_run_id = self._coerce_run_id(getattr(config, "REPLAY_END_RUN_ID", None), "REPLAY_END_RUN_ID")
-        self._cases: List[ReplayCase] = []
+        self.fetch_rows = max(1, int(getattr(config, "REPLAY_FETCH_ROWS", 500) or 500))
+        self.progress_every = int(getattr(config, "REPLAY_PROGRESS_EVERY", 100) or 0)
+        self.resume = bool(getattr(config, "REPLAY_RESUME", False))
+        # 回放台架：REPLAY_BENCH_URLS，未配置时与正常测试使用相同的台架
+        bench_key = "REPLAY_BENCH_URLS" if getattr(config, "REPLAY_BENCH_URLS", None) else "PLATFORM_BENCH_URLS"
+        self.bench_urls = get_bench_urls(config, bench_key)
+        # 断点续跑时已完成的最大源 run_id
+        self.resume_run_id = None
+        # 源记录总数（COUNT 查询）与已读取条数，iter_cases 过程中更新
+        self.total_rows = 0
+        self.read_rows = 0
         self._replay_config = None
+        self.platform_client = get_platform_client(config)
 
     def load_cases(self) -> List[ReplayCase]:
+        return list(self.iter_cases())
+
+    def iter_cases(self) -> Iterator[ReplayCase]:
+        """
+        按 run_id 升序逐条产出回放用例：源记录按 REPLAY_FETCH_ROWS 分批从游标读取，JSON 在产出时才解析，
+        不在执行前把整个历史库读入内存
+        """
         if not self._prepare_target_db():
-            return []
-
-        rows = self._fetch_source_rows()
-        cases: List[ReplayCase] = []
-        for row in rows:
-            case = self._build_case(row)
-            if case is None or case.payload.get("in_data") is None:
-                self.logger.warn(f"Replay skipped run_id={row.get('run_id')}: missing input payload")
-                continue
-            cases.append(case)
-
-        self._cases = cases
-        self.logger.info(
-            f"Replay source range start={self.start_run_id} end={self.end_run_id} total_cases={len(cases)}"
-        )
-        self.logger.info(f"Replay collected {len(cases)} historical inputs for execution")
-        return cases
+            return
+
+        where, params = self._source_filter()
+        conn = sqlite3.connect(self.source_db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            self.total_rows = conn.execute(f"SELECT COUNT(*) FROM test_runs{where}", params).fetchone()[0]
+            self.read_rows = 0
+            self.logger.info(
+                f"Replay source range start={self.start_run_id} end={self.end_run_id} total_rows={self.total_rows}"
+            )
+            cursor = conn.execute(
+                "SELECT run_id, round_id, actual_input, expected_output, "
+                "expected_error_output, expected_stuck_output, expected_duration, "
+                f"type, strategy, status FROM test_runs{where} ORDER BY run_id ASC",
+                params,
+            )
+            yielded = 0
+            while True:
+                rows = cursor.fetchmany(self.fetch_rows)
+                if not rows:
+                    break
+                for row in rows:
+                    self.read_rows += 1
+                    if self.progress_every and self.read_rows % self.progress_every == 0:
+                        self.logger.info(f"Replay progress {self.read_rows}/{self.total_rows}")
+                    row = dict(row)
+                    case = self._build_case(row)
+                    if case is None or case.payload.get("in_data") is None:
+                        self.logger.warn(f"Replay skipped run_id={row.get('run_id')}: missing input payload")
+                        continue
+                    yielded += 1
+                    yield case
+            self.logger.info(f"Replay read {self.read_rows}/{self.total_rows} source rows, yielded {yielded} inputs")
+        finally:
+            conn.close()
+
+    def progress(self) -> Tuple[int, int]:
+        """(已读取的源记录数, 源记录总数)"""
+        return self.read_rows, self.total_rows
+
+    def checkpoint(self) -> ReplayCheckpoint:
+        """回放断点（iter_cases 准备回放库之后调用），与结果共用回放库的写入队列"""
+        return ReplayCheckpoint(get_store(self.target_db_path, self.logger), self.source_db_path, self.resume_run_id)
 
     def get_replay_config(self):
         if self._replay_config is None:
@@ -70,52 +228,123 @@ class ReplayService:
         if target_dir:
             os.makedirs(target_dir, exist_ok=True)
 
+        self.resume_run_id = None
         if not os.path.exists(self.target_db_path):
-            shutil.copyfile(self.source_db_path, self.target_db_path)
-        self._clear_target_tables()
+            self._create_target_db()
+        elif not (self.resume and self._load_checkpoint()):
+            self._reset_history_tables()
+        # 进程内缓存的耗时窗口与检测器属于之前的回放，从回放库重新冷启动
+        discard_duration_window(self.target_db_path)
+        discard_duration_detector(self.target_db_path)
+        conn = sqlite3.connect(self.target_db_path)
+        try:
+            conn.execute(_CHECKPOINT_SCHEMA)
+            conn.commit()
+        finally:
+            conn.close()
         return True
 
-    def _clear_target_tables(self) -> None:
-        tables = ["test_runs", "test_error_log", "test_run_log_relation", "pro_input"]
+    def _load_checkpoint(self) -> bool:
+        """断点续跑：回放库中有同一源库的断点时保留已有结果，返回 True"""
         conn = sqlite3.connect(self.target_db_path)
         try:
-            cursor = conn.cursor()
-            for table in tables:
-                try:
-                    cursor.execute(f"DELETE FROM {table}")
-                except sqlite3.OperationalError:
-                    continue
-            conn.commit()
+            if not self._has_table(conn, "main", CHECKPOINT_TABLE):
+                row = None
+            else:
+                row = conn.execute(f"SELECT source_db, completed_run_id FROM {CHECKPOINT_TABLE} WHERE id = 1").fetchone()
         finally:
             conn.close()
+        if row is None or row[0] != self.source_db_path:
+            self.logger.warn("Replay resume requested but no checkpoint for this source; starting over")
+            return False
+        self.resume_run_id = row[1]
+        self.logger.info(f"Replay resuming after source run_id={self.resume_run_id}")
+        return True
 
-    def _fetch_source_rows(self) -> List[dict]:
-        conn = sqlite3.connect(self.source_db_path)
-        conn.row_factory = sqlite3.Row
+    def _create_target_db(self) -> None:
+        """
+        按源数据库结构新建目标库：复制全部表、索引、视图、触发器的定义，
+        只复制非历史记录表的数据，耗时与历史记录条数无关；失败时删除未建完的目标库
+        """
+        conn = sqlite3.connect(self.target_db_path)
         try:
-            conditions = []
-            params = []
-            if self.start_run_id is not None:
-                conditions.append("run_id >= ?")
-                params.append(self.start_run_id)
-            if self.end_run_id is not None:
-                conditions.append("run_id <= ?")
-                params.append(self.end_run_id)
-
-            sql = (
-                "SELECT run_id, round_id, actual_input, expected_output, "
-                "expected_error_output, expected_stuck_output, expected_duration, "
-                "type, strategy, status FROM test_runs"
-            )
-            if conditions:
-                sql += " WHERE " + " AND ".join(conditions)
-            sql += " ORDER BY run_id ASC"
+            conn.execute("ATTACH DATABASE ? AS source", (self.source_db_path,))
+            schema = conn.execute(
+                "SELECT type, name, sql FROM source.sqlite_master "
+                "WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+            ).fetchall()
+            schema.sort(key=lambda item: _SCHEMA_ORDER.get(item[0], len(_SCHEMA_ORDER)))
+            for object_type, name, sql in schema:
+                # 虚拟表创建时会自动建立其影子表
+                if conn.execute("SELECT 1 FROM main.sqlite_master WHERE name = ?", (name,)).fetchone():
+                    continue
+                conn.execute(sql)
+                if object_type == "table" and name not in HISTORY_TABLES:
+                    conn.execute(f'INSERT INTO main."{name}" SELECT * FROM source."{name}"')
+            if self._has_table(conn, "main", "sqlite_sequence") and self._has_table(conn, "source", "sqlite_sequence"):
+                # 复制数据时已按最大ID写入自增序列，改为与源库一致（源库中已删除的ID不再复用）
+                conn.execute("DELETE FROM main.sqlite_sequence")
+                placeholders = ", ".join("?" for _ in HISTORY_TABLES)
+                conn.execute(
+                    f"INSERT INTO main.sqlite_sequence SELECT * FROM source.sqlite_sequence "
+                    f"WHERE name NOT IN ({placeholders})",
+                    HISTORY_TABLES,
+                )
+            conn.commit()
+            conn.execute("DETACH DATABASE source")
+        except Exception:
+            conn.close()
+            os.remove(self.target_db_path)
+            raise
+        conn.close()
+        self.logger.info(f"Replay target database created from source schema: {self.target_db_path}")
 
-            cursor = conn.execute(sql, params)
-            return [dict(row) for row in cursor.fetchall()]
+    def _reset_history_tables(self) -> None:
+        """已有目标库：按目标库自身的结构删除并重建历史记录表（连同其索引、触发器）"""
+        conn = sqlite3.connect(self.target_db_path)
+        try:
+            placeholders = ", ".join("?" for _ in HISTORY_TABLES)
+            schema = conn.execute(
+                f"SELECT type, name, tbl_name, sql FROM sqlite_master "
+                f"WHERE tbl_name IN ({placeholders}) AND sql IS NOT NULL ORDER BY rowid",
+                HISTORY_TABLES,
+            ).fetchall()
+            schema.sort(key=lambda item: _SCHEMA_ORDER.get(item[0], len(_SCHEMA_ORDER)))
+            for object_type, name, _, _ in schema:
+                if object_type == "table":
+                    conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+            for _, _, _, sql in schema:
+                conn.execute(sql)
+            conn.commit()
+            # 旧版本复制整个源库生成的目标库，删除历史记录后空闲页占大部分时收缩文件
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if freelist_count * 2 > page_count:
+                conn.execute("VACUUM")
         finally:
             conn.close()
 
+    @staticmethod
+    def _has_table(conn: sqlite3.Connection, schema: str, name: str) -> bool:
+        return conn.execute(f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?",
+                            (name,)).fetchone() is not None
+
+    def _source_filter(self) -> Tuple[str, List[int]]:
+        conditions = []
+        params = []
+        if self.start_run_id is not None:
+            conditions.append("run_id >= ?")
+            params.append(self.start_run_id)
+        if self.end_run_id is not None:
+            conditions.append("run_id <= ?")
+            params.append(self.end_run_id)
+        if self.resume_run_id is not None:
+            conditions.append("run_id > ?")
+            params.append(self.resume_run_id)
+        if not conditions:
+            return "", params
+        return " WHERE " + " AND ".join(conditions), params
+
     def _build_case(self, row: dict) -> Optional[ReplayCase]:
         actual_input = self._safe_json_loads(row.get("actual_input"))
         expected_output = self._safe_json_loads(row.get("expected_output")) or []
@@ -150,13 +379,6 @@ class ReplayService:
             return 0
         return max(int(duration_ms / 1000), 0)
 
-    def _resolve_path(self, path: Optional[str]) -> Optional[str]:
-        if path is None:
-            return None
-        if os.path.isabs(path):
-            return path
-        return os.path.abspath(os.path.join(self._workspace_root, path))
-
     def _safe_json_loads(self, raw):
         if raw in (None, ""):
             return None
@@ -14,25 +14,43 @@ import uuid
 from typing import Dict, List, Any, Union, Optional
 from .database_handler import TestResultHandler
 from .bq_api import *
+from .platform_client import get_platform_client
+from ..utils.log_ctrl import LazyJson
+from .state_waiter import StateWaiter
+from .signal_table import SignalTable, SignalSnapshot
 
 
 # 配置日志
 
+# 自定义初始信号值（uuid -> 值），不再从系统读取
+INITIAL_SIGNAL_VALUES = {
+    "630c86f7-14dd-11f0-ad8e-6c0b84df158f": 0.01,  # 功耗电流初始值
+    "35695f8f-14dd-11f0-a9e0-6c0b84df158f": 0,  # 整车State状态初始值
+    "b0bf7c0b-14dd-11f0-a72f-6c0b84df158f": 0,  # 总线报文发送标志位初始值
+    "c8391a2f-14dd-11f0-b145-6c0b84df158f": 0,  # PDCU唤醒原因初始值
+    "14b7c71b-14df-11f0-8f04-6c0b84df158f": 0  # 整车模式初始值
+}
+# 整车State状态信号的UUID
+VEHICLE_STATE_UUID = "35695f8f-14dd-11f0-a9e0-6c0b84df158f"
+
 
 class ResultJudge:
     """测试结果判断模块"""
 
-    def __init__(self, logger, config, round_id, app=None):
+    def __init__(self, logger, config, round_id, app=None, platform_client=None):
         """
         初始化结果判断模块
 
         Args:
             config_path: 配置文件路径，可选
             api_base_url: API基础URL
+            platform_client: 共享的测试平台客户端，不传则按配置获取
         """
         self.app = app
         self.logger = logger
         self.config = config
+        # 测试平台客户端（连接池复用）
+        self.platform_client = platform_client or get_platform_client(config)
         api_base_url = self.config.TEST_PALTFORM_URL
         db_url = self.config.SQLALCHEMY_DATABASE_URI
         # self.api_base_url = api_base_url
@@ -63,6 +81,8 @@ class ResultJudge:
 
         # 数据库插入数据后的ID
         self.run_id = 0
+        # 回放模式：结果按源记录 run_id 写入回放库，为 None 时自动分配
+        self.replay_run_id = None
         # 最近一次触发分析的 run_id，避免重复分析
         self.last_analyzed_run_id = 0
 
@@ -73,6 +93,9 @@ class ResultJudge:
         # 初始信号值
         self.initial_signal_values = {}
 
+        # 信号查找表，每个用例构建一次
+        self.signal_table = None
+
     def _load_signal_mapping(self) -> Dict[str, str]:
         """
         加载信号映射关系
@@ -103,12 +126,7 @@ class ResultJudge:
         try:
             # 加载测试数据(读取文件处理方式)
             # with open(test_data_path, 'r', encoding='utf-8') as f:
-
-            # 处理单引号字符为双引号字符
-            fixed_json = str(test_data_in).replace("'", '"')
-            fixed_json = fixed_json.replace("None", 'null')
-            # fixed_json = re.sub(r'\bNone\b', 'null', fixed_json)
-            test_data = json.loads(fixed_json)
+            test_data = self._normalize_test_data(test_data_in)
 
             # 开始处理测试流程
             return self.judge_test_result(test_data)
@@ -116,6 +134,15 @@ class ResultJudge:
             self.logger.error(f"处理测试数据时发生错误: {str(e)}")
             return {"status": "error", "message": f"处理测试数据时发生错误: {str(e)}"}
 
+    @staticmethod
+    def _normalize_test_data(test_data_in: Any) -> Dict[str, Any]:
+        """将用例数据规整为标准JSON结构（单引号转双引号、None转null）"""
+        # 处理单引号字符为双引号字符
+        fixed_json = str(test_data_in).replace("'", '"')
+        fixed_json = fixed_json.replace("None", 'null')
+        # fixed_json = re.sub(r'\bNone\b', 'null', fixed_json)
+        return json.loads(fixed_json)
+
     def ensure_list(self, param):
         if isinstance(param, list):
             return param
@@ -164,6 +191,7 @@ class ResultJudge:
             self.test_times += 1
             # 保存预期结果，供后续使用
             self.expected_results = test_data.get("expected_results", [])
+            self.signal_table = SignalTable(self.signal_mapping, self.expected_results)
 
             # 先读取当前系统中的信号并保存
             self.logger.info("读取当前系统中的信号作为基准值")
@@ -180,14 +208,8 @@ class ResultJudge:
             }
             """
             # 自定义初始信号值，不再从系统读取
-            self.initial_signal_values = {
-                "630c86f7-14dd-11f0-ad8e-6c0b84df158f": 0.01,  # 功耗电流初始值
-                "35695f8f-14dd-11f0-a9e0-6c0b84df158f": 0,  # 整车State状态初始值
-                "b0bf7c0b-14dd-11f0-a72f-6c0b84df158f": 0,  # 总线报文发送标志位初始值
-                "c8391a2f-14dd-11f0-b145-6c0b84df158f": 0,  # PDCU唤醒原因初始值
-                "14b7c71b-14df-11f0-8f04-6c0b84df158f": 0  # 整车模式初始值
-            }
-            self.logger.info(f"初始信号值: {json.dumps(self.initial_signal_values, ensure_ascii=False)}")
+            self.initial_signal_values = dict(INITIAL_SIGNAL_VALUES)
+            self.logger.info("初始信号值: %s", LazyJson(self.initial_signal_values))
 
             # 发送输入信号
             if not in_data:
@@ -201,80 +223,57 @@ class ResultJudge:
                 err = 1
                 return {"strategy": -1, "stop_signal": True, "in_data": in_data}
 
-            # 在预期时间内每隔read_interval读取一次信号
+            # 在预期时间内按自适应间隔读取信号
             # est_time = test_data.get("est_time", 5)
             est_time = 20
-            self.logger.info(f"预期时间: {est_time}秒，每隔{self.read_interval}秒读取一次信号")
-
-            start_time = time.time()
-            end_time = start_time + est_time
-            last_read_time = start_time - self.read_interval  # 确保第一次循环就读取
+            waiter = StateWaiter(self.config, est_time)
+            self.logger.info("预期时间: %s秒，读取间隔%s~%s秒自适应", est_time, waiter.interval_min, waiter.interval_max)
 
             # 使用预期结果中的整车状态作为目标值，如果不存在则按轮次设置默认目标
-            target_state = None
-            for item in self.expected_results:
-                if item.get("name") == "整车State状态":
-                    target_state = item.get("value")
-                    break
-            if target_state is None:
-                is_wakeup_round = self.test_times % 2
-                target_state = 170 if is_wakeup_round == 1 else 30
-                self.logger.info(f"未在预期结果中找到目标整车状态，按轮次使用默认值: {target_state}")
-            else:
-                self.logger.info(f"目标整车状态值来自预期结果: {target_state}")
+            target_state = self._resolve_target_state()
+            is_wakeup_round = self.test_times % 2
+            # 发送后的第一次读取需完整判断一次
+            self.signal_table.reset_baseline()
 
             # 在预期时间内循环读取信号
-            while time.time() < end_time:
-                current_time = time.time()
-
-                # 判断是否到达读取间隔
-                if current_time - last_read_time >= self.read_interval:
-                    # 读取信号
-                    self.logger.info(f"读取信号，已过时间: {current_time - start_time:.2f}秒")
-                    # 删除19秒
-                    # time.sleep(19)
-                    result = self._get_test_result()
-
-                    # 检查结果是否异常
-                    if self._is_result_abnormal(result):
-                        # 异常结果处理 - 直接保存错误信息并判断是否继续测试
-                        self._save_error_info(result)
-                        if not self._should_continue_test(result):
-                            self.logger.info("非预期异常，退出测试")
-                            err = 1
-                            return {"strategy": -1, "stop_signal": True, "in_data": in_data}
-                    else:
-                        # 检查整车状态是否达到目标值（根据轮次判断）
-                        actual_data = result.get("data", [])
-                        vehicle_state = None
-                        for item in actual_data:
-                            # 假设整车状态信号的UUID是"35695f8f-14dd-11f0-a9e0-6c0b84df158f"
-                            if item.get("uuid") == "35695f8f-14dd-11f0-a9e0-6c0b84df158f":
-                                vehicle_state = item.get("value")
-                                break
-
-                        if vehicle_state is not None and vehicle_state == target_state:
-                            self.logger.info(
-                                f"{'唤醒轮' if is_wakeup_round else '休眠轮'}测试通过，整车状态达到目标值: {target_state}")
-                            # 保存结果到数据库
-                            current_time = time.time() # 重新取现在的时间
-                            self.run_id = db.store_test_result(
-                                (current_time - start_time) * 1000,
-                                test_data=test_data,
-                                result_data=result,
-                                strategy=0,  # 测试通过策略为0
-                                round_id=self.round_id
-                            )
-                            
-                            print(f"数值插入成功，run_id: {self.run_id}，整车状态值：{vehicle_state}，耗时：{current_time - start_time:.2f}")
-                            self.logger.info(f"数据插入成功，run_id: {self.run_id}")
-                            return {"strategy": 0, "stop_signal": False, "in_data": in_data}
-
-                    # 更新上次读取时间
-                    last_read_time = current_time
-
-                # 短暂休眠，避免CPU占用过高
-                time.sleep(0.1)
+            for _ in waiter.polls():
+                # 读取信号
+                result = self._get_test_result()
+
+                # 检查结果是否异常
+                if self._is_result_abnormal(result):
+                    # 异常结果处理 - 直接保存错误信息并判断是否继续测试
+                    self._save_error_info(result)
+                    if not self._should_continue_test(result):
+                        self.logger.info("非预期异常，退出测试")
+                        err = 1
+                        return {"strategy": -1, "stop_signal": True, "in_data": in_data}
+                else:
+                    # 整车状态未变化时无需重新判断
+                    if not self._vehicle_state_moved(result):
+                        continue
+                    # 检查整车状态是否达到目标值（根据轮次判断）
+                    vehicle_state = self._extract_vehicle_state(result)
+                    waiter.observe(vehicle_state)
+
+                    if vehicle_state is not None and vehicle_state == target_state:
+                        self.logger.info(
+                            f"{'唤醒轮' if is_wakeup_round else '休眠轮'}测试通过，整车状态达到目标值: {target_state}")
+                        # 耗时取观测到状态变化的那次读取的时间戳
+                        duration = waiter.elapsed_ms(result)
+                        # 保存结果到数据库
+                        self.run_id = db.store_test_result(
+                            duration,
+                            test_data=test_data,
+                            result_data=self._storable_result(result),
+                            strategy=0,  # 测试通过策略为0
+                            round_id=self.round_id,
+                            run_id=self.replay_run_id
+                        )
+
+                        print(f"数值插入成功，run_id: {self.run_id}，整车状态值：{vehicle_state}，耗时：{duration / 1000:.2f}")
+                        self.logger.info("数据插入成功，run_id: %s，读取次数: %s", self.run_id, waiter.reads)
+                        return {"strategy": 0, "stop_signal": False, "in_data": in_data}
 
             # 预期时间结束，如果没有得到明确结果，默认返回继续测试
             self.logger.info("预期时间结束，未得到明确结果，默认继续测试")
@@ -286,18 +285,69 @@ class ResultJudge:
 
             if err is not None:
                 return {"strategy": -1, "stop_signal": True, "in_data": in_data}
+            return self._finish_case(in_data)
+
+    def _resolve_target_state(self) -> Any:
+        """
+        获取本用例的目标整车状态：优先取预期结果中的整车State状态，否则按轮次使用默认值
 
-            if self.new_processing_strategy == 0:
-                if self.run_id and self.run_id % 20 == 0 and self.run_id != self.last_analyzed_run_id:
-                    print(f"[DEBUG] 触发时间分析，当前 run_id: {self.run_id}")
-                    self.last_analyzed_run_id = self.run_id
-                    db = TestResultHandler(self.logger, self.db_url, app=self.app)
-                    strategy = db.analyze_durations(self.run_id)
-                    # print(f"分析结果：strategy={strategy}")
-                    return {"strategy": strategy, "stop_signal": False, "in_data": in_data}
-            if err is None:
-                self.stop_signal = False
-                return {"strategy": self.new_processing_strategy, "stop_signal": self.stop_signal, "in_data": in_data}
+        Returns:
+            目标整车状态值
+        """
+        for item in self.expected_results:
+            if item.get("name") == "整车State状态":
+                target_state = item.get("value")
+                self.logger.info("目标整车状态值来自预期结果: %s", target_state)
+                return target_state
+        is_wakeup_round = self.test_times % 2
+        target_state = 170 if is_wakeup_round == 1 else 30
+        self.logger.info("未在预期结果中找到目标整车状态，按轮次使用默认值: %s", target_state)
+        return target_state
+
+    def _extract_vehicle_state(self, result: Dict[str, Any]) -> Any:
+        """从读取结果中取出整车State状态的值，未读到返回None"""
+        data = result.get("data", [])
+        if isinstance(data, SignalSnapshot):
+            return data.value_by_uuid(VEHICLE_STATE_UUID)
+        for item in data:
+            if item.get("uuid") == VEHICLE_STATE_UUID:
+                return item.get("value")
+        return None
+
+    def _vehicle_state_moved(self, result: Dict[str, Any]) -> bool:
+        """判断本次读取中整车State状态相对上一次读取是否发生变化"""
+        data = result.get("data")
+        if not isinstance(data, SignalSnapshot):
+            return True
+        return data.has_changed(data.table.uuid_index.get(VEHICLE_STATE_UUID))
+
+    @staticmethod
+    def _storable_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """入库前将信号快照转换为 [{name, uuid, value}] 记录列表"""
+        data = result.get("data")
+        if isinstance(data, SignalSnapshot):
+            return dict(result, data=data.to_records())
+        return result
+
+    def _finish_case(self, in_data: Any) -> Dict[str, Any]:
+        """
+        用例结束后的策略处理：取流式耗时异常检测对本条记录的判定
+
+        Args:
+            in_data: 本用例的输入数据
+
+        Returns:
+            Dict: 判断结果，包含strategy、stop_signal和in_data
+        """
+        if self.new_processing_strategy == 0:
+            if self.run_id and self.run_id != self.last_analyzed_run_id:
+                self.last_analyzed_run_id = self.run_id
+                db = TestResultHandler(self.logger, self.db_url, app=self.app)
+                strategy = db.analyze_durations(self.run_id)
+                # print(f"分析结果：strategy={strategy}")
+                return {"strategy": strategy, "stop_signal": False, "in_data": in_data}
+        self.stop_signal = False
+        return {"strategy": self.new_processing_strategy, "stop_signal": self.stop_signal, "in_data": in_data}
 
     def _get_test_result(self) -> Dict[str, Any]:
         """
@@ -366,7 +416,7 @@ class ResultJudge:
         #         "timestamp": time.time()
         #     }
 
-    def _process_read_results(self, result_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _process_read_results(self, result_data: Dict[str, Any]) -> SignalSnapshot:
         """
         处理读取的结果
 
@@ -374,38 +424,13 @@ class ResultJudge:
             result_data: 读取的结果数据
 
         Returns:
-            List: 处理后的结果列表
+            SignalSnapshot: 信号快照，可按UUID/名称取值，入库时通过 to_records 转换为
+            [{name, uuid, value}] 记录列表
         """
-        processed_results = []
-
-        # 将结果转换为测试结果格式 {'挡位信号': 1, '整车State状态': 49, '蓄电池剩余电量SOC': 0.0}
-        for dspace_signal, value in result_data.items():
-            # 获取原始信号名称
-            original_signal = self.reverse_mapping.get(dspace_signal, dspace_signal)
-
-            # if not original_signal:
-            #     self.logger.warn(f"未找到信号 {dspace_signal} 的原始名称")
-            #     continue
-
-            # 查找对应的UUID
-            uuid = None
-            for item in self.expected_results:
-                if item.get("name") == original_signal:
-                    uuid = item.get("uuid")
-                    break
-
-            # if not uuid:
-            #     self.logger.warn(f"未找到信号 {original_signal} 的UUID")
-            #     continue
-
-            # 添加到处理结果
-            processed_results.append({
-                "name": original_signal,
-                "uuid": uuid,
-                "value": value
-            })
-
-        return processed_results
+        # 查找表按用例构建，未在用例中调用时按当前预期结果临时构建
+        if self.signal_table is None:
+            self.signal_table = SignalTable(self.signal_mapping, getattr(self, "expected_results", []))
+        return self.signal_table.snapshot(result_data)
 
     def _is_result_abnormal(self, result: Dict[str, Any]) -> bool:
         """
@@ -629,7 +654,7 @@ class ResultJudge:
                         break
 
             if error_match:
-                self.logger.info(f"匹配到已知错误类型: {error_type}")
+                self.logger.info("匹配到已知错误类型: %s", error_type)
                 # 如果是卡住情况（error_type为2）或者error_type为1，设置特殊返回值
                 if error_type == 1:
                     return {
@@ -693,7 +718,7 @@ class ResultJudge:
                 else:
                     # 初始状态中没有该信号，认为不相似
                     is_similar_to_initial = False
-                    self.logger.info(f"初始状态中没有信号 {item.get('name')}")
+                    self.logger.info("初始状态中没有信号 %s", item.get('name'))
                     break
 
             if is_similar_to_initial:
@@ -719,7 +744,7 @@ class ResultJudge:
             strategy = 1  # 单参数
         in_data_count = len(in_data)
 
-        self.logger.info(f"输入参数数量: {in_data_count}, 策略: {strategy}")
+        self.logger.info("输入参数数量: %s, 策略: %s", in_data_count, strategy)
 
         return {
             "match_type": "new",
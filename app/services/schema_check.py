@@ -0,0 +1,90 @@
+"""
+数据库索引检查
+test_runs 的常用查询（按轮次/类型/状态/策略过滤）依赖的索引定义，
+用于检查旧数据库文件缺少哪些索引，并可在副本上补建。
+索引变更需同时更新 migrations/versions 中对应的迁移脚本。
+"""
+
+import os
+import sqlite3
+from typing import Dict, List, Tuple
+
+# 索引名 -> (表名, 列)
+TEST_RUNS_INDEXES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    # get_first_actual_output_by_round_and_type：round_id + type，按 run_id 排序
+    "ix_test_runs_round_type_run": ("test_runs", ("round_id", "type", "run_id")),
+    # get_new_status_by_round：round_id + strategy IN (...)，按 run_id 排序
+    "ix_test_runs_round_strategy_run": ("test_runs", ("round_id", "strategy", "run_id")),
+    # get_type_count_by_run_id：按 type 计数
+    "ix_test_runs_type": ("test_runs", ("type",)),
+    # /charts/data：按轮次统计状态、异常数与平均耗时（覆盖索引）
+    "ix_test_runs_round_status_strategy_duration": ("test_runs", ("round_id", "status", "strategy", "actual_duration")),
+    # /control/status：status != 1 OR strategy < 0 计数（覆盖索引，含 rowid 即 run_id）
+    "ix_test_runs_status_strategy": ("test_runs", ("status", "strategy")),
+}
+
+
+def _existing_index_columns(conn: sqlite3.Connection, table: str) -> List[Tuple[str, ...]]:
+    columns = []
+    for index in conn.execute(f"PRAGMA index_list('{table}')").fetchall():
+        name = index[1]
+        info = conn.execute(f"PRAGMA index_info('{name}')").fetchall()
+        columns.append(tuple(col[2] for col in sorted(info, key=lambda c: c[0])))
+    return columns
+
+
+def missing_indexes(conn: sqlite3.Connection) -> List[str]:
+    """
+    检查数据库缺少的索引（按列比较，不要求索引名一致）
+    :param conn: sqlite3 连接
+    :return: 缺少的索引名列表；表不存在时不检查
+    """
+    missing = []
+    existing = {}
+    for name, (table, columns) in TEST_RUNS_INDEXES.items():
+        if table not in existing:
+            row = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+            existing[table] = _existing_index_columns(conn, table) if row else None
+        table_indexes = existing[table]
+        if table_indexes is None:
+            continue
+        # 已有索引以这些列为前缀即可覆盖
+        if not any(cols[:len(columns)] == columns for cols in table_indexes):
+            missing.append(name)
+    return missing
+
+
+def report_missing_indexes(db_path: str, logger) -> List[str]:
+    """
+    启动检查：记录数据库缺少的索引（不自动创建，需执行 flask db upgrade）
+    :return: 缺少的索引名列表，数据库不存在或无法打开时返回空列表
+    """
+    if not db_path or not os.path.exists(db_path):
+        return []
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            missing = missing_indexes(conn)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.error(f"检查数据库索引失败: {e}")
+        return []
+    if missing:
+        logger.warn(f"数据库 {db_path} 缺少索引: {missing}，请执行 flask db upgrade")
+    return missing
+
+
+def create_missing_indexes(conn: sqlite3.Connection) -> List[str]:
+    """
+    补建缺少的索引
+    :return: 新建的索引名列表
+    """
+    created = []
+    for name in missing_indexes(conn):
+        table, columns = TEST_RUNS_INDEXES[name]
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+        created.append(name)
+    if created:
+        conn.commit()
+    return created
@@ -0,0 +1,394 @@
+"""
+信号时间序列存储（列式）
+把 test_runs.actual_output 中的各信号值按 run_id 顺序整理为数组：每个信号一行 float64（缺失或非数值为 NaN），
+保存在数据库文件旁的 .<db文件名>.signals/ 目录下（values.npy、run_ids.npy 以内存映射方式读写，meta.json 记录
+信号名称与已整理条数）。非数值的信号值（如字符串）按原值另存于 texts.jsonl（每行 [信号名称, 位置, 原值]），
+pair() 对比时与数值一起返回，与逐条比较原始值的结果一致。
+- 增量整理：sync() 只解析 run_id 大于上次整理位置的新记录，JSON 在整理时解析一次；
+- 读取：series(name) 返回某个信号的数组切片，任意两个信号对比不再重新解析整库 JSON；
+- 数组中的第 i 个位置对应 run_id 升序的第 i+1 条记录（即对比图中的"数据序号"）。
+写入进程异步提交时最新的 run_id 可能短暂不连续：空缺只在距当前最大 run_id GAP_TAIL_ROWS 条以内、且更大的
+run_id 出现不足 GAP_SETTLE_SECONDS 时等待，其余空缺（删除、写入失败或回放库按源 run_id 写入的记录）直接跳过；
+离线数据库（上传的数据库、对比图脚本）用 sync(settle_gaps=False) 不等待。
+多进程之间用 sync.lock 文件互斥，整理期间每批刷新锁文件的修改时间，锁被其他进程当作过期锁接管时停止整理。
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .sqlite_store import resolve_db_path
+
+# 存储格式版本，结构变化时递增（2：保留非数值的信号值）
+STORE_VERSION = 2
+# 初始容量（记录条数 / 信号个数），不足时翻倍扩容
+INITIAL_ROWS = 4096
+INITIAL_SIGNALS = 16
+# 每次从数据库读取的记录数
+FETCH_ROWS = 5000
+# run_id 空缺等待时间(秒)：此时间之前已提交的最大 run_id 以下的空缺视为永久空缺
+GAP_SETTLE_SECONDS = 5.0
+# 写入可能尚未提交的范围：只等待 run_id 距当前最大 run_id 在此条数以内的空缺
+GAP_TAIL_ROWS = 1000
+# 整理锁超时时间(秒)：锁文件超过此时间未刷新时视为持锁进程已退出
+LOCK_STALE_SECONDS = 300
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _signal_values(actual_output: Any) -> Dict[str, Any]:
+    """解析 actual_output 中的 {信号名称: 原值}（同名信号取最后一个），无法解析时返回空字典"""
+    if not actual_output:
+        return {}
+    try:
+        output = json.loads(actual_output) if isinstance(actual_output, str) else actual_output
+        items = output.get("data", [])
+    except (ValueError, AttributeError):
+        return {}
+    values = {}
+    if not isinstance(items, list):
+        return values
+    for item in items:
+        if isinstance(item, dict) and item.get("name") is not None:
+            values[item.get("name")] = item.get("value")
+    return values
+
+
+def store_dir(db_path: str) -> str:
+    """信号存储目录：<数据库所在目录>/.<数据库文件名>.signals"""
+    return os.path.join(os.path.dirname(db_path), f".{os.path.basename(db_path)}.signals")
+
+
+class SignalStore:
+    """单个数据库文件的信号时间序列存储"""
+
+    def __init__(self, db_path: str, directory: Optional[str] = None):
+        """
+        :param db_path: 数据库文件路径
+        :param directory: 存储目录，默认 store_dir(db_path)
+        """
+        self.db_path = db_path
+        self.directory = directory or store_dir(db_path)
+        self._lock = threading.Lock()
+        # 此前整理时观察到的 (时间, 数据库最大 run_id)
+        self._observed: List[Tuple[float, int]] = []
+        # 本进程持有的整理锁标识
+        self._lock_token: Optional[str] = None
+        # 非数值信号值缓存：(texts.jsonl 大小, {信号名称: {位置: 原值}})
+        self._texts: Tuple[int, Dict[str, Dict[int, Any]]] = (0, {})
+
+    # ---------------------------------------------------------------- 读取
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def meta(self) -> Dict[str, Any]:
+        """已整理的信号名称与条数"""
+        try:
+            with open(self._path("meta.json"), "r", encoding="utf-8") as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return {"version": STORE_VERSION, "names": [], "count": 0, "last_run_id": None}
+        if meta.get("version") != STORE_VERSION:
+            return {"version": STORE_VERSION, "names": [], "count": 0, "last_run_id": None}
+        return meta
+
+    @property
+    def count(self) -> int:
+        return self.meta()["count"]
+
+    def names(self) -> List[str]:
+        return list(self.meta()["names"])
+
+    def run_ids(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """第 start 到 stop 个位置（从0开始，不含 stop）的 run_id"""
+        meta = self.meta()
+        start, stop = self._bounds(meta, start, stop)
+        if stop <= start:
+            return np.empty(0, dtype=np.int64)
+        return np.load(self._path("run_ids.npy"), mmap_mode="r")[start:stop]
+
+    def series(self, name: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        信号在第 start 到 stop 个位置的取值（内存映射的只读切片，缺失为 NaN）
+        :raises KeyError: 信号不存在
+        """
+        meta = self.meta()
+        index = meta["names"].index(name) if name in meta["names"] else None
+        if index is None:
+            raise KeyError(name)
+        start, stop = self._bounds(meta, start, stop)
+        if stop <= start:
+            return np.empty(0)
+        return np.load(self._path("values.npy"), mmap_mode="r")[index, start:stop]
+
+    def texts(self, name: str, start: int = 0, stop: Optional[int] = None) -> Dict[int, Any]:
+        """信号在第 start 到 stop 个位置中的非数值取值 {位置: 原值}（series 中对应位置为 NaN）"""
+        meta = self.meta()
+        start, stop = self._bounds(meta, start, stop)
+        values = self._load_texts().get(name, {})
+        return {position: value for position, value in values.items() if start <= position < stop}
+
+    def pair(self, name1: str, name2: str, start: int = 0,
+             stop: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        两个信号都有值（数值或非数值）的位置
+        :return: (位置数组, 信号1取值, 信号2取值)；范围内有非数值时取值数组为 object 类型，保留原值
+        """
+        values1 = self.series(name1, start, stop)
+        values2 = self.series(name2, start, stop)
+        texts1 = self.texts(name1, start, stop)
+        texts2 = self.texts(name2, start, stop)
+        if not texts1 and not texts2:
+            positions = np.nonzero(~np.isnan(values1) & ~np.isnan(values2))[0]
+            return positions + start, np.asarray(values1[positions]), np.asarray(values2[positions])
+
+        present1 = ~np.isnan(values1)
+        present2 = ~np.isnan(values2)
+        merged1 = np.asarray(values1).astype(object)
+        merged2 = np.asarray(values2).astype(object)
+        for texts, present, merged in ((texts1, present1, merged1), (texts2, present2, merged2)):
+            for position, value in texts.items():
+                present[position - start] = True
+                merged[position - start] = value
+        positions = np.nonzero(present1 & present2)[0]
+        return positions + start, merged1[positions], merged2[positions]
+
+    @staticmethod
+    def _bounds(meta: Dict[str, Any], start: int, stop: Optional[int]) -> Tuple[int, int]:
+        count = meta["count"]
+        stop = count if stop is None else min(stop, count)
+        return max(0, start), stop
+
+    # ---------------------------------------------------------------- 整理
+    def sync(self, settle_gaps: bool = True) -> int:
+        """
+        把数据库中新增的记录整理进存储
+        :param settle_gaps: 是否等待最新记录中的 run_id 空缺（数据库仍在写入时使用），False 时空缺直接跳过
+        :return: 本次新增的条数；其他进程正在整理时返回 0
+        """
+        with self._lock:
+            if not self._acquire_file_lock():
+                return 0
+            try:
+                return self._sync(settle_gaps)
+            finally:
+                self._release_file_lock()
+
+    def _acquire_file_lock(self) -> bool:
+        os.makedirs(self.directory, exist_ok=True)
+        lock_path = self._path("sync.lock")
+        try:
+            if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS:
+                os.remove(lock_path)
+        except OSError:
+            pass
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        self._lock_token = f"{os.getpid()}-{uuid.uuid4().hex}"
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(self._lock_token)
+        return True
+
+    def _refresh_file_lock(self) -> bool:
+        """刷新锁文件的修改时间；锁已被其他进程当作过期锁删除或接管时返回 False"""
+        lock_path = self._path("sync.lock")
+        try:
+            with open(lock_path, "r", encoding="utf-8") as file:
+                if file.read() != self._lock_token:
+                    return False
+            os.utime(lock_path)
+            return True
+        except OSError:
+            return False
+
+    def _release_file_lock(self) -> None:
+        try:
+            with open(self._path("sync.lock"), "r", encoding="utf-8") as file:
+                owned = file.read() == self._lock_token
+            if owned:
+                os.remove(self._path("sync.lock"))
+        except OSError:
+            pass
+        self._lock_token = None
+
+    def _sync(self, settle_gaps: bool) -> int:
+        meta = self.meta()
+        names: List[str] = list(meta["names"])
+        name_index = {name: i for i, name in enumerate(names)}
+        count = meta["count"]
+        last_run_id = meta["last_run_id"]
+        added = 0
+        if count == 0:
+            # 重新整理：丢弃之前的非数值信号值
+            try:
+                os.remove(self._path("texts.jsonl"))
+            except OSError:
+                pass
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            max_run_id = conn.execute("SELECT MAX(run_id) FROM test_runs").fetchone()[0] or 0
+            # 不超过该 run_id 的空缺不会再被写入，视为永久空缺
+            settled_below = self._settled_below(max_run_id) if settle_gaps else None
+            cursor = conn.execute("SELECT run_id, actual_output FROM test_runs WHERE run_id > ? ORDER BY run_id",
+                                  (last_run_id if last_run_id is not None else -1,))
+            stop = False
+            while not stop:
+                batch = cursor.fetchmany(FETCH_ROWS)
+                if not batch:
+                    break
+                run_ids: List[int] = []
+                rows: List[Dict[str, float]] = []
+                for run_id, actual_output in batch:
+                    if last_run_id is not None and run_id > last_run_id + 1 and settled_below is not None and \
+                            last_run_id + 1 > settled_below:
+                        stop = True
+                        break
+                    values = _signal_values(actual_output)
+                    for name in values:
+                        if name not in name_index:
+                            name_index[name] = len(names)
+                            names.append(name)
+                    run_ids.append(run_id)
+                    rows.append(values)
+                    last_run_id = run_id
+                if not run_ids:
+                    break
+                # 锁已被其他进程接管时不再写入
+                if not self._refresh_file_lock():
+                    break
+
+                # 按批写入数组，批内先在内存中组装再整块写入内存映射
+                values_array, run_id_array = self._open_for_write(len(names), count + len(run_ids), count)
+                block = np.full((len(names), len(run_ids)), np.nan)
+                texts = []
+                for position, values in enumerate(rows):
+                    for name, value in values.items():
+                        number = _to_float(value)
+                        block[name_index[name], position] = number
+                        if np.isnan(number) and value is not None:
+                            texts.append([name, count + position, value])
+                if texts:
+                    self._append_texts(texts)
+                values_array[:len(names), count:count + len(run_ids)] = block
+                run_id_array[count:count + len(run_ids)] = run_ids
+                values_array.flush()
+                run_id_array.flush()
+                del values_array, run_id_array
+
+                count += len(run_ids)
+                added += len(run_ids)
+                self._write_meta({"version": STORE_VERSION, "names": names, "count": count,
+                                  "last_run_id": last_run_id})
+        finally:
+            conn.close()
+        return added
+
+    def _settled_below(self, max_run_id: int) -> int:
+        """
+        永久空缺的上界：GAP_TAIL_ROWS 之前的记录，或 GAP_SETTLE_SECONDS 之前已观察到的最大 run_id
+        （写入进程已提交更大的 run_id 超过等待时间，更早的空缺不会再补上）
+        """
+        now = time.monotonic()
+        recent = [(seen, observed) for seen, observed in self._observed if now - seen < GAP_SETTLE_SECONDS]
+        aged = [observed for seen, observed in self._observed if now - seen >= GAP_SETTLE_SECONDS]
+        settled = max_run_id - GAP_TAIL_ROWS
+        if aged:
+            settled = max(settled, max(aged))
+            # 过期的观察只需保留最大值
+            recent.insert(0, (now - GAP_SETTLE_SECONDS, max(aged)))
+        self._observed = recent + [(now, max_run_id)]
+        return settled
+
+    def _open_for_write(self, signals: int, rows: int, count: int) -> Tuple[np.memmap, np.memmap]:
+        """打开可写的数组文件，容量不足时按翻倍扩容（写入新文件后替换）"""
+        values_path = self._path("values.npy")
+        run_ids_path = self._path("run_ids.npy")
+        values = np.load(values_path, mmap_mode="r+") if os.path.exists(values_path) else None
+        run_ids = np.load(run_ids_path, mmap_mode="r+") if os.path.exists(run_ids_path) else None
+        if values is not None and run_ids is not None and values.shape[0] >= signals and \
+                values.shape[1] >= rows and run_ids.shape[0] >= rows:
+            return values, run_ids
+
+        signal_capacity = max(INITIAL_SIGNALS, values.shape[0] if values is not None else 0)
+        while signal_capacity < signals:
+            signal_capacity *= 2
+        row_capacity = max(INITIAL_ROWS, values.shape[1] if values is not None else 0)
+        while row_capacity < rows:
+            row_capacity *= 2
+
+        new_values = np.lib.format.open_memmap(f"{values_path}.tmp", mode="w+", dtype=np.float64,
+                                               shape=(signal_capacity, row_capacity))
+        new_values[:] = np.nan
+        new_run_ids = np.lib.format.open_memmap(f"{run_ids_path}.tmp", mode="w+", dtype=np.int64,
+                                                shape=(row_capacity,))
+        if values is not None and run_ids is not None and count:
+            new_values[:values.shape[0], :count] = values[:, :count]
+            new_run_ids[:count] = run_ids[:count]
+        new_values.flush()
+        new_run_ids.flush()
+        del values, run_ids, new_values, new_run_ids
+        os.replace(f"{values_path}.tmp", values_path)
+        os.replace(f"{run_ids_path}.tmp", run_ids_path)
+        return np.load(values_path, mmap_mode="r+"), np.load(run_ids_path, mmap_mode="r+")
+
+    def _append_texts(self, texts: List[List[Any]]) -> None:
+        with open(self._path("texts.jsonl"), "a", encoding="utf-8") as file:
+            for entry in texts:
+                file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def _load_texts(self) -> Dict[str, Dict[int, Any]]:
+        """读取非数值信号值（按文件大小缓存，同一位置以后写入的为准）"""
+        path = self._path("texts.jsonl")
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return {}
+        cached_size, cached = self._texts
+        if size == cached_size:
+            return cached
+        texts: Dict[str, Dict[int, Any]] = {}
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    name, position, value = json.loads(line)
+                except ValueError:
+                    # 写到一半的最后一行
+                    continue
+                texts.setdefault(name, {})[position] = value
+        self._texts = (size, texts)
+        return texts
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        tmp_path = self._path(f"meta.json.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(meta, file, ensure_ascii=False)
+        os.replace(tmp_path, self._path("meta.json"))
+
+
+_stores: Dict[str, SignalStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_signal_store(db_url: str) -> SignalStore:
+    """获取数据库文件对应的共享信号存储"""
+    path = resolve_db_path(db_url)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = SignalStore(path)
+            _stores[path] = store
+        return store
@@ -0,0 +1,136 @@
+"""
+信号查找表与信号快照
+每个用例开始时按信号映射和预期结果构建一次查找表（dspace变量名->下标、信号名称->UUID），
+每次读取的结果保存为按下标排列的数值数组，并给出相对上一次读取发生变化的信号下标，
+只有在需要入库时才转换为 [{name, uuid, value}] 记录列表。
+"""
+
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class SignalTable:
+    """信号查找表：用例内复用，记录上一次读取的数值用于计算变化量"""
+
+    def __init__(self, signal_mapping: Dict[str, str], expected_results: Optional[List[Dict[str, Any]]] = None):
+        """
+        :param signal_mapping: 信号名称到mapping插件变量名的映射
+        :param expected_results: 预期结果列表，用于确定信号名称对应的UUID
+        """
+        name_to_uuid = {}
+        for item in expected_results or []:
+            name_to_uuid.setdefault(item.get("name"), item.get("uuid"))
+
+        self.names = list(signal_mapping.keys())
+        self.dspace_names = list(signal_mapping.values())
+        self.uuids = [name_to_uuid.get(name) for name in self.names]
+        self.dspace_index = {dspace: i for i, dspace in enumerate(self.dspace_names)}
+        self.uuid_index = {uid: i for i, uid in enumerate(self.uuids) if uid}
+        self.name_index = {name: i for i, name in enumerate(self.names)}
+        self._name_to_uuid = name_to_uuid
+        self._previous = None
+        self._previous_raw = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def reset_baseline(self) -> None:
+        """清除上一次读取的数值，下一次快照中所有已读到的信号都视为变化"""
+        self._previous = None
+        self._previous_raw = None
+
+    def snapshot(self, result_data: Dict[str, Any]) -> "SignalSnapshot":
+        """
+        将平台返回的 {dspace变量名: 值} 转换为快照，并计算相对上一次读取的变化
+        :param result_data: 平台读取接口返回的data
+        """
+        size = len(self.names)
+        values = np.full(size, np.nan)
+        raw = [None] * size
+        order = []
+        extras = {}
+        for dspace, value in result_data.items():
+            index = self.dspace_index.get(dspace)
+            if index is None:
+                # 未在映射中的信号按原样保留
+                extras[dspace] = value
+                order.append(dspace)
+                continue
+            values[index] = _to_float(value)
+            raw[index] = value
+            order.append(index)
+
+        previous = self._previous
+        if previous is None:
+            changed = np.flatnonzero(~np.isnan(values))
+        else:
+            both_nan = np.isnan(values) & np.isnan(previous)
+            changed_mask = ~((values == previous) | both_nan)
+            # 非数值信号按原始值比较
+            previous_raw = self._previous_raw
+            for i in np.flatnonzero(both_nan).tolist():
+                if raw[i] != previous_raw[i]:
+                    changed_mask[i] = True
+            changed = np.flatnonzero(changed_mask)
+        self._previous = values
+        self._previous_raw = raw
+        return SignalSnapshot(self, values, raw, changed, order, extras)
+
+
+class SignalSnapshot:
+    """单次读取的信号快照：数值数组 + 变化下标，按需转换为记录列表"""
+
+    def __init__(self, table: SignalTable, values: np.ndarray, raw: List[Any], changed: np.ndarray,
+                 order: List[Any], extras: Dict[str, Any]):
+        self.table = table
+        self.values = values
+        self.raw = raw
+        self.changed = changed
+        self._order = order
+        self._extras = extras
+        self._changed_set = None
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.to_records())
+
+    def has_changed(self, index: Optional[int]) -> bool:
+        """判断指定下标的信号相对上一次读取是否发生变化"""
+        if index is None:
+            return False
+        if self._changed_set is None:
+            self._changed_set = set(self.changed.tolist())
+        return index in self._changed_set
+
+    def value_by_uuid(self, uid: str) -> Any:
+        """按UUID取值（保持平台返回的原始类型），未读到返回None"""
+        index = self.table.uuid_index.get(uid)
+        return None if index is None else self.raw[index]
+
+    def value_by_name(self, name: str) -> Any:
+        index = self.table.name_index.get(name)
+        return None if index is None else self.raw[index]
+
+    def changed_names(self) -> List[str]:
+        return [self.table.names[i] for i in self.changed.tolist()]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """转换为 [{name, uuid, value}] 记录列表（与平台返回顺序一致），用于入库"""
+        table = self.table
+        records = []
+        for key in self._order:
+            if isinstance(key, int):
+                records.append({"name": table.names[key], "uuid": table.uuids[key], "value": self.raw[key]})
+            else:
+                records.append({"name": key, "uuid": table._name_to_uuid.get(key), "value": self._extras[key]})
+        return records
@@ -0,0 +1,249 @@
+"""
+SQLite 连接管理与后台批量写入
+每个数据库文件对应一个 SQLiteStore：
+- 写入：由后台写线程持有长连接（WAL + synchronous=NORMAL），把 test_runs / pro_input /
+  test_error_log 的插入按 DB_BATCH_ROWS 条或 DB_BATCH_MS 毫秒合并为一个事务提交；
+- 读取：每次读取打开一条短连接，调用方用完关闭（只有写连接常驻）；
+- flush()：写入屏障，等待此前提交的所有写操作落库，读取前需要看到最新数据时调用。
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from app.config import Config as DefaultConfig
+
+# 默认每批最多合并的写操作条数
+DEFAULT_BATCH_ROWS = 50
+# 默认每批最长等待时间(毫秒)
+DEFAULT_BATCH_MS = 50
+
+_FLUSH = object()
+_STOP = object()
+
+
+def resolve_db_path(db_url: str) -> str:
+    """将 sqlite:/// 形式的地址或相对路径转换为数据库文件绝对路径"""
+    if db_url.startswith("sqlite:///"):
+        db_url = db_url[len("sqlite:///"):]
+    return os.path.abspath(db_url)
+
+
+def open_reader(path: str, read_only: bool = False) -> sqlite3.Connection:
+    """
+    打开一条读连接（row_factory 为 sqlite3.Row），调用方用完后 close()
+    :param read_only: 以只读方式打开（mode=ro），不会创建或修改数据库文件
+    """
+    conn = sqlite3.connect(Path(path).as_uri() + "?mode=ro", uri=True) if read_only else sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class SQLiteStore:
+    """单个数据库文件的连接与写入管理"""
+
+    def __init__(self, path: str, logger=None, batch_rows: Optional[int] = None, batch_ms: Optional[int] = None):
+        """
+        :param path: 数据库文件路径
+        :param logger: 日志对象，写入失败时记录
+        :param batch_rows: 每批最多合并的写操作条数
+        :param batch_ms: 每批最长等待时间(毫秒)
+        """
+        self.path = path
+        self.logger = logger
+        self.batch_rows = max(1, int(batch_rows or getattr(DefaultConfig, "DB_BATCH_ROWS", DEFAULT_BATCH_ROWS)))
+        self.batch_ms = max(0, int(batch_ms if batch_ms is not None
+                                   else getattr(DefaultConfig, "DB_BATCH_MS", DEFAULT_BATCH_MS)))
+
+        self._queue = queue.Queue()
+        self._id_lock = threading.Lock()
+        self._next_ids: Dict[str, int] = {}
+
+        self._writer_conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._writer_conn.execute("PRAGMA journal_mode=WAL")
+        self._writer_conn.execute("PRAGMA synchronous=NORMAL")
+        self._writer = threading.Thread(target=self._write_loop, name=f"sqlite-writer-{os.path.basename(path)}",
+                                        daemon=True)
+        self._writer.start()
+
+    # ---------------------------------------------------------------- 读取
+    def connection(self) -> sqlite3.Connection:
+        """打开一条读连接（row_factory 为 sqlite3.Row），调用方用完后 close()"""
+        return open_reader(self.path)
+
+    # ---------------------------------------------------------------- 写入
+    def allocate_id(self, table: str, column: str) -> int:
+        """
+        在内存中分配自增主键，使写入可以异步进行而调用方立即拿到id
+        :param table: 表名
+        :param column: 主键列名
+        """
+        with self._id_lock:
+            next_id = self._next_ids.get(table)
+            if next_id is None:
+                next_id = load_max_id(self.path, table, column) + 1
+            self._next_ids[table] = next_id + 1
+            return next_id
+
+    def reload_ids(self) -> None:
+        """丢弃内存中的自增主键，下次分配时重新读取数据库（其他进程写入后调用）"""
+        with self._id_lock:
+            self._next_ids.clear()
+
+    def submit(self, sql: str, params: Sequence[Any] = ()) -> Future:
+        """
+        提交一条写操作到后台写线程
+        :return: Future，结果为该语句的 lastrowid，失败时为异常
+        """
+        future = Future()
+        self._queue.put((sql, tuple(params), future))
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """写入屏障：等待此前提交的写操作全部提交到数据库"""
+        if not self._writer.is_alive():
+            return False
+        future = Future()
+        self._queue.put((_FLUSH, None, future))
+        try:
+            future.result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        """提交剩余写操作并关闭写连接"""
+        if self._writer.is_alive():
+            self._queue.put((_STOP, None, None))
+            self._writer.join()
+        unregister_store(self)
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_ms / 1000.0
+            while len(batch) < self.batch_rows and batch[-1][0] is not _FLUSH and batch[-1][0] is not _STOP:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            writes = [item for item in batch if item[0] is not _FLUSH and item[0] is not _STOP]
+            if writes:
+                self._execute_batch(writes)
+            for sql, _, future in batch:
+                if sql is _FLUSH:
+                    future.set_result(True)
+            if batch[-1][0] is _STOP:
+                self._writer_conn.close()
+                return
+
+    def _execute_batch(self, writes) -> None:
+        conn = self._writer_conn
+        results = []
+        try:
+            conn.execute("BEGIN")
+            for sql, params, _ in writes:
+                results.append(conn.execute(sql, params).lastrowid)
+            conn.execute("COMMIT")
+        except Exception as e:
+            self._rollback()
+            self._log_error(f"批量写入失败，逐条重试: {e}")
+            self._execute_one_by_one(writes)
+            return
+        for (_, _, future), lastrowid in zip(writes, results):
+            future.set_result(lastrowid)
+
+    def _execute_one_by_one(self, writes) -> None:
+        conn = self._writer_conn
+        for sql, params, future in writes:
+            try:
+                conn.execute("BEGIN")
+                lastrowid = conn.execute(sql, params).lastrowid
+                conn.execute("COMMIT")
+                future.set_result(lastrowid)
+            except Exception as e:
+                self._rollback()
+                self._log_error(f"数据库写入失败: {e}")
+                future.set_exception(e)
+
+    def _rollback(self) -> None:
+        if self._writer_conn.in_transaction:
+            self._writer_conn.execute("ROLLBACK")
+
+    def _log_error(self, message: str) -> None:
+        if self.logger is not None:
+            self.logger.error(message)
+
+
+def load_max_id(path: str, table: str, column: str) -> int:
+    """读取表中已使用的最大主键"""
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute(f"SELECT MAX({column}) FROM {table}").fetchone()
+        max_id = int(row[0]) if row and row[0] is not None else 0
+        # AUTOINCREMENT 表不复用已删除的id
+        try:
+            seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+            if seq and seq[0] is not None:
+                max_id = max(max_id, int(seq[0]))
+        except sqlite3.OperationalError:
+            pass
+        return max_id
+    finally:
+        conn.close()
+
+
+_stores: Dict[str, SQLiteStore] = {}
+_stores_lock = threading.Lock()
+
+
+@atexit.register
+def _close_all() -> None:
+    # 进程退出前提交后台队列中剩余的写操作
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.close()
+
+
+def get_store(db_url: str, logger=None) -> SQLiteStore:
+    """获取数据库文件对应的共享 SQLiteStore，同一文件在进程内只创建一次"""
+    path = resolve_db_path(db_url)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = SQLiteStore(path, logger=logger)
+            _stores[path] = store
+        elif store.logger is None:
+            store.logger = logger
+        return store
+
+
+def register_store(db_url: str, store) -> None:
+    """
+    指定数据库文件在本进程内使用的 store（需提供 connection / allocate_id / submit / flush / close），
+    多进程执行时工作进程借此把写入转发给写入进程
+    """
+    with _stores_lock:
+        _stores[resolve_db_path(db_url)] = store
+
+
+def unregister_store(store) -> None:
+    with _stores_lock:
+        if _stores.get(store.path) is store:
+            del _stores[store.path]
+
+
+def flush_store(db_url: str, timeout: Optional[float] = None) -> bool:
+    """若该数据库已有共享 SQLiteStore，等待其写入全部落库"""
+    with _stores_lock:
+        store = _stores.get(resolve_db_path(db_url))
+    return store.flush(timeout) if store is not None else True
@@ -0,0 +1,105 @@
+"""
+状态等待模块
+发送输入信号后轮询读取平台信号，直到整车状态达到目标值或超时。
+轮询间隔自适应：发送后先以最小间隔快速读取，状态不变时按倍率退避到最大间隔，
+观测到状态变化后重新回到最小间隔；平台支持长轮询时由平台挂起读取请求直到信号变化，
+读取被挂起满长轮询时间后立即再次读取，提前返回（信号变化、平台忽略 waitMs 或读取立即失败）时仍按退避间隔休眠。
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterator, Optional
+
+# 默认最小读取间隔(毫秒)
+DEFAULT_INTERVAL_MIN = 20
+# 默认最大读取间隔(毫秒)
+DEFAULT_INTERVAL_MAX = 400
+# 默认退避倍率
+DEFAULT_BACKOFF_FACTOR = 2.0
+
+
+class StateWaiter:
+    """自适应退避的状态等待器"""
+
+    _unset = object()
+
+    def __init__(self, config, timeout: float):
+        """
+        :param config: 配置对象，读取 READ_INTERVAL_MIN / READ_INTERVAL_MAX / READ_BACKOFF_FACTOR / READ_LONG_POLL_MS
+        :param timeout: 最长等待时间(秒)
+        """
+        self.interval_min = (getattr(config, "READ_INTERVAL_MIN", None) or DEFAULT_INTERVAL_MIN) / 1000.0
+        self.interval_max = (getattr(config, "READ_INTERVAL_MAX", None) or DEFAULT_INTERVAL_MAX) / 1000.0
+        self.interval_max = max(self.interval_max, self.interval_min)
+        self.backoff_factor = max(1.0, float(getattr(config, "READ_BACKOFF_FACTOR", None) or DEFAULT_BACKOFF_FACTOR))
+        # 长轮询等待时间(毫秒)，0 表示平台不支持长轮询
+        self.long_poll_ms = int(getattr(config, "READ_LONG_POLL_MS", 0) or 0)
+        self.timeout = timeout
+
+        self.start_time = 0.0
+        self.interval = self.interval_min
+        self.reads = 0
+        self._last_value = self._unset
+        # 本次读取开始的时间
+        self._read_started = 0.0
+
+    def _begin(self) -> None:
+        self.start_time = time.time()
+        self.interval = self.interval_min
+        self.reads = 0
+        self._last_value = self._unset
+
+    def _remaining(self) -> float:
+        return self.start_time + self.timeout - time.time()
+
+    def _next_delay(self) -> float:
+        # 长轮询模式下读取已被平台挂起满等待时间，不再额外休眠
+        if self.long_poll_ms > 0 and time.time() - self._read_started >= self.long_poll_ms / 1000.0:
+            self.interval = self.interval_min
+            return 0.0
+        delay = min(self.interval, max(0.0, self._remaining()))
+        self.interval = min(self.interval * self.backoff_factor, self.interval_max)
+        return delay
+
+    def polls(self) -> Iterator[int]:
+        """
+        同步轮询：每次迭代由调用方读取一次信号，迭代之间按当前间隔休眠
+        :return: 迭代器，产出本次读取序号
+        """
+        self._begin()
+        while self._remaining() > 0:
+            self.reads += 1
+            self._read_started = time.time()
+            yield self.reads
+            delay = self._next_delay()
+            if delay > 0:
+                time.sleep(delay)
+
+    async def polls_async(self) -> AsyncIterator[int]:
+        """异步轮询，语义与 polls 相同，休眠使用 asyncio.sleep"""
+        self._begin()
+        while self._remaining() > 0:
+            self.reads += 1
+            self._read_started = time.time()
+            yield self.reads
+            delay = self._next_delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def observe(self, value: Any) -> None:
+        """记录本次读取到的状态值，状态发生变化时退避间隔回到最小值"""
+        if value != self._last_value:
+            self.interval = self.interval_min
+            self._last_value = value
+
+    def elapsed_ms(self, result: Optional[dict] = None) -> float:
+        """
+        计算耗时(毫秒)：优先使用读取结果自身的时间戳（观测到状态变化的那次读取），
+        而不是循环被唤醒的时间
+        """
+        timestamp = None
+        if result:
+            timestamp = result.get("timestamp")
+        if timestamp is None:
+            timestamp = time.time()
+        return (timestamp - self.start_time) * 1000
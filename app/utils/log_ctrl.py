@@ -1,73 +1,186 @@
 import os
+import json
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
 
+# 日志格式：text 为文本行，json 为每行一条 JSON（结构化日志）
+LOG_FORMATS = ("text", "json")
+
+
+class LazyJson:
+    """日志参数：写入线程输出时才序列化为 JSON，调用线程不承担序列化开销"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return json.dumps(self.value, ensure_ascii=False, default=str)
+
+
+class _TextFormatter(logging.Formatter):
+    """文本日志：结构化字段以 key=value 追加在消息后"""
+
+    def format(self, record):
+        message = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            message += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return message
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """结构化日志：每条日志一行 JSON（time/level/thread/message 及调用时传入的字段）"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """只把日志记录放入队列，消息在监听线程中格式化（参数在记录后不应再被修改）"""
+
+    def prepare(self, record):
+        return record
+
+
+class _LevelFilter(logging.Filter):
+    """只接收指定级别的日志"""
+
+    def __init__(self, level):
+        super().__init__()
+        self.level = level
+
+    def filter(self, record):
+        return record.levelno == self.level
+
+
+class _LogBackend:
+    """进程内共享的日志后台：调用线程只入队，监听线程写入三个日志文件"""
+
+    def __init__(self, log_dir, max_bytes, backup_count, log_format, name="main_logger"):
+        # 确保日志目录存在
+        os.makedirs(log_dir, exist_ok=True)
+
+        # 获取当前时间戳，用于命名日志文件
+        timestamp = datetime.now().strftime('%Y_%m_%d_%H_%M_%S')
+
+        # 创建日志文件路径
+        self.all_log_file = os.path.join(log_dir, f"log_{timestamp}.log")
+        self.error_log_file = os.path.join(log_dir, f"log_{timestamp}_err.log")
+        self.warn_log_file = os.path.join(log_dir, f"log_{timestamp}_warn.log")
+
+        # 配置日志格式
+        if log_format == "json":
+            formatter = JsonLinesFormatter()
+        else:
+            formatter = _TextFormatter('%(asctime)s - %(levelname)s - %(message)s')
+
+        # 主日志记录所有日志，错误日志只记录 error，警告日志只记录 warn（RotatingFileHandler，限制文件大小）
+        all_handler = RotatingFileHandler(self.all_log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        error_handler = RotatingFileHandler(self.error_log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        error_handler.setLevel(logging.ERROR)
+        warn_handler = RotatingFileHandler(self.warn_log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        warn_handler.addFilter(_LevelFilter(logging.WARNING))
+        for handler in (all_handler, error_handler, warn_handler):
+            handler.setFormatter(formatter)
+
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, all_handler, error_handler, warn_handler,
+                                      respect_handler_level=True)
+        self.listener.start()
+        self._stopped = False
+        # 退出时写完队列中剩余的日志
+        atexit.register(self.stop)
+
+        self.logger = logging.getLogger(name)
+        self.logger.propagate = False
+        self.logger.addHandler(_DeferredQueueHandler(self.queue))
+
+    def stop(self):
+        """写完队列中的日志后停止监听线程并关闭日志文件，可重复调用"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _get_backend(log_dir, max_bytes, backup_count, log_format):
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _LogBackend(log_dir, max_bytes, backup_count, log_format)
+        return _backend
+
 
 class Logger:
-    def __init__(self, log_dir='', max_bytes=5 * 1024 * 1024, backup_count=5):
+    def __init__(self, log_dir='', max_bytes=5 * 1024 * 1024, backup_count=5, level="DEBUG", log_format="text"):
         """
         初始化日志模块。
+        日志经队列交给后台线程写入文件，调用线程不做文件 I/O；同一进程内的 Logger 共用一组日志文件。
+        消息参数按 % 格式延迟到写入线程格式化（低于日志级别时不格式化），
+        关键字参数作为结构化字段输出（json 格式时为 JSON 字段）。
 
         :param log_dir: 日志文件存储目录
         :param max_bytes: 单个日志文件的最大字节数，默认 5MB
         :param backup_count: 备份文件数量
+        :param level: 日志级别（DEBUG/INFO/WARNING/ERROR）
+        :param log_format: 日志格式，text 或 json（每行一条 JSON）
         """
         # 获取当前目录
         current_directory = os.getcwd()
         # 日志目录
         log_dir = current_directory + "\\logs\\"
-        # 确保日志目录存在
-        os.makedirs(log_dir, exist_ok=True)
+        log_format = (log_format or "text").lower()
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"不支持的日志格式: {log_format}")
 
-        # 获取当前时间戳，用于命名日志文件
-        timestamp = datetime.now().strftime('%Y_%m_%d_%H_%M_%S')
+        backend = _get_backend(log_dir, max_bytes, backup_count, log_format)
+        self.all_log_file = backend.all_log_file
+        self.error_log_file = backend.error_log_file
+        self.warn_log_file = backend.warn_log_file
+        self.logger = backend.logger
+        self.logger.setLevel(logging.getLevelName(str(level or "DEBUG").upper()))
 
-        # 创建日志文件路径
-        self.all_log_file = os.path.join(log_dir, f"log_{timestamp}.log")
-        self.error_log_file = os.path.join(log_dir, f"log_{timestamp}_err.log")
-        self.warn_log_file = os.path.join(log_dir, f"log_{timestamp}_warn.log")
+    def _log(self, level, message, args, fields):
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, message, *args, extra={"fields": fields} if fields else None)
 
-        # 配置日志格式
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-
-        # 配置主日志记录器（记录所有日志）
-        self.logger = logging.getLogger("main_logger")
-        self.logger.setLevel(logging.DEBUG)
-
-        # 配置主日志处理器（RotatingFileHandler，限制文件大小）
-        all_handler = RotatingFileHandler(self.all_log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
-        all_handler.setFormatter(formatter)
-        self.logger.addHandler(all_handler)
-
-        # 配置错误日志记录器
-        self.error_logger = logging.getLogger("error_logger")
-        self.error_logger.setLevel(logging.ERROR)
-        error_handler = RotatingFileHandler(self.error_log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
-        error_handler.setFormatter(formatter)
-        self.error_logger.addHandler(error_handler)
-
-        # 配置警告日志记录器
-        self.warn_logger = logging.getLogger("warn_logger")
-        self.warn_logger.setLevel(logging.WARNING)
-        warn_handler = RotatingFileHandler(self.warn_log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
-        warn_handler.setFormatter(formatter)
-        self.warn_logger.addHandler(warn_handler)
-
-    def info(self, message):
+    def info(self, message, *args, **fields):
         """记录 Info 类型日志"""
-        self.logger.info(message)
+        self._log(logging.INFO, message, args, fields)
 
-    def error(self, message):
+    def error(self, message, *args, **fields):
         """记录 Error 类型日志"""
-        self.logger.error(message)
-        self.error_logger.error(message)
+        self._log(logging.ERROR, message, args, fields)
 
-    def warn(self, message):
+    def warn(self, message, *args, **fields):
         """记录 Warn 类型日志"""
-        self.logger.warning(message)
-        self.warn_logger.warning(message)
+        self._log(logging.WARNING, message, args, fields)
+
+    warning = warn
 
-    def debug(self, message):
+    def debug(self, message, *args, **fields):
         """记录 Debug 类型日志"""
-        self.logger.debug(message)
+        self._log(logging.DEBUG, message, args, fields)
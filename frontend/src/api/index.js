@@ -49,6 +49,25 @@ export const chartsApi = {
     if (roundId) params.round_id = roundId
     return api.get('/charts/data', { params })
   },
+
+  // 按 run_id 游标分页获取记录：cursor 为 { after } 或 { before }，fields 为返回字段列表
+  getPage: (roundId = null, cursor = {}, limit = 100, fields = null) => {
+    const params = { limit, ...cursor }
+    if (roundId) params.round_id = roundId
+    if (fields) params.fields = fields.join(',')
+    return api.get('/charts/data', { params })
+  },
+
+  // 获取单条记录详情（含完整 JSON 字段）
+  getRun: (runId) => api.get(`/charts/run/${runId}`),
+
+  // 回放结果对比：源 run_id 范围为空时使用回放配置
+  getReplayDiff: (start = null, end = null) => {
+    const params = {}
+    if (start !== null) params.start = start
+    if (end !== null) params.end = end
+    return api.get('/charts/replay-diff', { params, timeout: 120000 })
+  },
   
   // 上传数据库文件
   uploadDb: (formData) => {
@@ -6,6 +6,8 @@ const state = reactive({
   runs: 0,
   goal: 1000,
   exceptions: 0,
+  throughput: 0, // 最近一分钟用例数/分钟
+  eta: null, // 预计剩余时间(秒)
   isRunning: false,
   logs: [],
   dashboardLogs: []
@@ -27,6 +29,8 @@ export function useTestStore() {
     if (typeof data.runs === 'number') state.runs = data.runs
     if (typeof data.goal === 'number') state.goal = data.goal
     if (typeof data.exceptions === 'number') state.exceptions = data.exceptions
+    if (typeof data.throughput === 'number') state.throughput = data.throughput
+    state.eta = typeof data.eta === 'number' ? data.eta : null
     state.isRunning = !!data.running
     
     if (data.running) {
@@ -56,6 +60,8 @@ export function useTestStore() {
   const reset = () => {
     state.runs = 0
     state.exceptions = 0
+    state.throughput = 0
+    state.eta = null
     state.systemStatus = 'ready'
     state.isRunning = false
   }
@@ -66,6 +72,8 @@ export function useTestStore() {
     runs: readonly(state).runs,
     goal: readonly(state).goal,
     exceptions: readonly(state).exceptions,
+    throughput: readonly(state).throughput,
+    eta: readonly(state).eta,
     isRunning: readonly(state).isRunning,
     logs: readonly(state).logs,
     dashboardLogs: readonly(state).dashboardLogs,
@@ -0,0 +1,36 @@
+"""add_test_runs_indexes
+
+Revision ID: 8b3f1c2d9e47
+Revises: 45a00563e5ff
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3f1c2d9e47'
+down_revision = '45a00563e5ff'
+branch_labels = None
+depends_on = None
+
+
+# 与 app/services/schema_check.py 中 TEST_RUNS_INDEXES 保持一致
+INDEXES = [
+    ('ix_test_runs_round_type_run', ['round_id', 'type', 'run_id']),
+    ('ix_test_runs_round_strategy_run', ['round_id', 'strategy', 'run_id']),
+    ('ix_test_runs_type', ['type']),
+    ('ix_test_runs_round_status_strategy_duration', ['round_id', 'status', 'strategy', 'actual_duration']),
+    ('ix_test_runs_status_strategy', ['status', 'strategy']),
+]
+
+
+def upgrade():
+    for name, columns in INDEXES:
+        op.create_index(name, 'test_runs', columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='test_runs', if_exists=True)
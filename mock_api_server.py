@@ -6,8 +6,10 @@
 根据提供的测试数据生成符合预期和错误情况的响应
 """
 
+import argparse
 import json
 import random
+import threading
 import time
 from flask import Flask, request, jsonify
 
@@ -35,6 +37,8 @@ mock_data = {
     },
 }
 num = 0
+# 长轮询：收到发送信号请求时唤醒挂起的读取请求
+signal_changed = threading.Event()
 # 存储信号值的字典
 signal_values = {}
 # 测试数据
@@ -182,7 +186,8 @@ def send_signal():
             if reverse_mapping.get(signal) == "供电电压":
                 # 根据测试模式设置其他信号的值
                 set_other_signals_by_mode(test_mode)
-        
+
+        signal_changed.set()
         return jsonify({
             "ok": 1,
             "msg": "信号发送成功",
@@ -206,6 +211,12 @@ def read_signal():
         signals = data.get('signals', [])
         print(f"接收到读取信号请求: {json.dumps(data, ensure_ascii=False)}")
 
+        # 长轮询：挂起直到有新的发送信号或等待超时
+        wait_ms = data.get('waitMs', 0)
+        if wait_ms:
+            signal_changed.wait(wait_ms / 1000.0)
+            signal_changed.clear()
+
         global num
         if num == 0:
             pass
@@ -327,6 +338,11 @@ def index():
     })
 
 if __name__ == '__main__':
+    # 多台架调试时可启动多个实例，每个实例使用不同端口
+    parser = argparse.ArgumentParser(description="模拟测试平台API服务器")
+    parser.add_argument("--port", type=int, default=8080, help="监听端口")
+    args = parser.parse_args()
+
     # 初始化信号值
     for signal, value in initial_signal_values.items():
         signal_values[signal] = value
@@ -335,4 +351,4 @@ if __name__ == '__main__':
     print(f"信号映射: {json.dumps(signal_mapping, ensure_ascii=False, indent=2)}")
     print(f"初始信号值: {json.dumps(signal_values, ensure_ascii=False, indent=2)}")
     
-    app.run(host='127.0.0.1', port=8080, debug=True)
\ No newline at end of file
+    app.run(host='127.0.0.1', port=args.port, debug=True)
\ No newline at end of file
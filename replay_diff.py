@@ -0,0 +1,53 @@
+"""
+回放结果对比命令行
+按源 run_id 对比源库与回放库中的测试结果，输出状态/策略变化分组与耗时差分位数。
+默认使用配置中的 REPLAY_SOURCE_DATABASE_URI / REPLAY_DATABASE_URI 及回放范围 REPLAY_START_RUN_ID / REPLAY_END_RUN_ID。
+    python replay_diff.py [--source app/db.db] [--replay app/replay.db] [--start 1] [--end 100] [--json]
+"""
+
+import argparse
+import json
+import os
+
+from app.config import Config
+from app.services.replay_diff import replay_diff
+from app.services.replay_runner import replay_db_paths
+
+
+def _state(state):
+    if state is None:
+        return "无回放结果"
+    return f"status={state['status']} strategy={state['strategy']}"
+
+
+def print_report(report):
+    print(f"源记录: {report['total']}  已回放: {report['replayed']}  无回放结果: {report['missing']}")
+    print(f"结果一致: {report['unchanged']}  状态变化: {report['statusChanged']}  策略变化: {report['strategyChanged']}")
+    print("状态/策略变化:")
+    for item in report["transitions"]:
+        print(f"  {_state(item['from'])} -> {_state(item['to'])}: {item['count']}")
+    duration = report["duration"]
+    if duration["count"]:
+        percentiles = "  ".join(f"{key}={value}" for key, value in duration.items() if key.startswith("p"))
+        print(f"耗时差(回放-原始, 毫秒): 条数={duration['count']}  平均={duration['mean']}  "
+              f"最小={duration['min']}  最大={duration['max']}  {percentiles}")
+    else:
+        print("耗时差: 无可对比记录")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="回放结果对比")
+    parser.add_argument("--source", help="回放源数据库，默认 REPLAY_SOURCE_DATABASE_URI")
+    parser.add_argument("--replay", help="回放数据库，默认 REPLAY_DATABASE_URI")
+    parser.add_argument("--start", type=int, default=Config.REPLAY_START_RUN_ID, help="源 run_id 下界（含）")
+    parser.add_argument("--end", type=int, default=Config.REPLAY_END_RUN_ID, help="源 run_id 上界（含）")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    args = parser.parse_args()
+
+    source_path, replay_path = replay_db_paths(Config)
+    report = replay_diff(os.path.abspath(args.source) if args.source else source_path,
+                         os.path.abspath(args.replay) if args.replay else replay_path, args.start, args.end)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
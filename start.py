@@ -6,6 +6,7 @@ from app import create_app
 from app import setup_logger
 from app.config import *
 from app.services.process_control import ProcessCtrl
+from app.services.schema_check import report_missing_indexes
 
 logger = setup_logger()
 
@@ -13,6 +14,8 @@ logger = setup_logger()
 app = create_app(os.getenv('FLASK_CONFIG') or "development")
 
 logger.info('Server started')
+# 启动时检查数据库索引
+report_missing_indexes(app.config.get("DATABASE"), logger)
 
 
 
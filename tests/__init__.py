@@ -0,0 +1,26 @@
+class StubLogger:
+    """测试用日志对象：签名与 app.utils.log_ctrl.Logger 一致，记录格式化后的消息"""
+
+    def __init__(self):
+        self.messages = []
+        self.warnings = []
+        self.errors = []
+
+    def _record(self, message, args):
+        message = message % args if args else message
+        self.messages.append(message)
+        return message
+
+    def info(self, message, *args, **fields):
+        self._record(message, args)
+
+    def debug(self, message, *args, **fields):
+        self._record(message, args)
+
+    def warn(self, message, *args, **fields):
+        self.warnings.append(self._record(message, args))
+
+    warning = warn
+
+    def error(self, message, *args, **fields):
+        self.errors.append(self._record(message, args))
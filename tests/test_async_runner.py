@@ -0,0 +1,81 @@
+import unittest
+from unittest import mock
+
+from app.services import async_runner
+from app.services.async_runner import AsyncCampaignRunner
+from app.services.platform_client import BenchConfig, get_bench_urls
+from tests import StubLogger
+
+
+class _Config:
+    TEST_PALTFORM_URL = "http://127.0.0.1:8080"
+    PLATFORM_BENCH_URLS = []
+    BENCH_CONCURRENCY = 2
+
+
+class _Pool:
+    def __init__(self, size):
+        self.items = [{"in_data": [{"name": "s", "value": i}]} for i in range(size)]
+
+    def pop_first_data(self):
+        return self.items.pop(0) if self.items else None
+
+
+class _Judge:
+    def __init__(self, logger, config, round_id, app=None, platform_client=None):
+        self.config = config
+
+    async def process_test_data_async(self, test_data):
+        value = test_data["in_data"][0]["value"]
+        return {"strategy": 0, "stop_signal": value == self.stop_at, "in_data": test_data["in_data"]}
+
+    stop_at = None
+
+
+async def _reset_ok(judge):
+    return True
+
+
+class BenchUrlsTestCase(unittest.TestCase):
+    def test_fallback_to_platform_url(self):
+        self.assertEqual(get_bench_urls(_Config), ["http://127.0.0.1:8080"])
+
+    def test_comma_separated_urls(self):
+        class _Multi(_Config):
+            PLATFORM_BENCH_URLS = "http://a:1, http://b:2,"
+
+        self.assertEqual(get_bench_urls(_Multi), ["http://a:1", "http://b:2"])
+
+    def test_bench_config_overrides_api_urls(self):
+        bench = BenchConfig(_Config, "http://b:2/")
+        self.assertEqual(bench.read_api, "http://b:2/api/v1/read")
+        self.assertEqual(bench.BENCH_CONCURRENCY, 2)
+
+
+class AsyncCampaignRunnerTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher_judge = mock.patch.object(async_runner, "AsyncResultJudge", _Judge)
+        patcher_reset = mock.patch.object(async_runner, "api_reset_async", _reset_ok)
+        patcher_judge.start()
+        patcher_reset.start()
+        self.addCleanup(patcher_judge.stop)
+        self.addCleanup(patcher_reset.stop)
+        _Judge.stop_at = None
+
+    def test_pool_drained_across_benches(self):
+        runner = AsyncCampaignRunner(StubLogger(), _Config, ["http://a:1", "http://b:2"], round_id=1)
+        outcome = runner.run(_Pool(9))
+        self.assertFalse(outcome["stop_signal"])
+        self.assertEqual(sum(outcome["completed"].values()), 9)
+
+    def test_stop_signal_stops_all_benches(self):
+        _Judge.stop_at = 3
+        runner = AsyncCampaignRunner(StubLogger(), _Config, ["http://a:1", "http://b:2"], round_id=1)
+        pool = _Pool(50)
+        outcome = runner.run(pool)
+        self.assertTrue(outcome["stop_signal"])
+        self.assertGreater(len(pool.items), 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import multiprocessing
+import os
+import queue
+import sqlite3
+import tempfile
+import unittest
+
+from app.services.campaign_coordinator import CampaignCoordinator, RemoteStore, writer_main
+from app.services.sqlite_store import load_max_id
+from tests import StubLogger
+
+SCHEMA = """
+CREATE TABLE test_runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, round_id INTEGER, status INTEGER);
+"""
+
+
+class RemoteStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "db.db")
+        conn = sqlite3.connect(self.path)
+        conn.executescript(SCHEMA)
+        conn.execute("INSERT INTO test_runs (run_id, round_id, status) VALUES (5, 1, 1)")
+        conn.commit()
+        conn.close()
+
+        context = multiprocessing.get_context("spawn")
+        self.writes = context.Queue()
+        self.events = context.Queue()
+        self.run_ids = context.Value("q", load_max_id(self.path, "test_runs", "run_id"))
+        self.acks = [context.Queue(), context.Queue()]
+        self.writer = context.Process(target=writer_main, args=(self.path, self.writes, self.events, self.acks,
+                                                                10, 10))
+        self.writer.start()
+
+    def tearDown(self):
+        if self.writer.is_alive():
+            self.writes.put(None)
+            self.writer.join(10)
+        self.tmp.cleanup()
+
+    def test_shards_write_through_single_writer(self):
+        stores = [RemoteStore(self.path, self.writes, shard, {"test_runs": self.run_ids}, self.acks[shard])
+                  for shard in range(2)]
+        for i in range(3):
+            for shard, store in enumerate(stores):
+                run_id = store.allocate_id("test_runs", "run_id")
+                store.submit("INSERT INTO test_runs (run_id, round_id, status) VALUES (?, ?, ?)", (run_id, 2, shard))
+
+        for store in stores:
+            self.assertTrue(store.flush(timeout=10))
+        conn = stores[0].connection()
+        rows = conn.execute("SELECT run_id, status FROM test_runs WHERE round_id = 2").fetchall()
+        conn.close()
+        self.assertEqual([row["run_id"] for row in rows], list(range(6, 12)))
+        self.assertEqual(sum(row["status"] for row in rows), 3)
+        with self.assertRaises(KeyError):
+            stores[0].allocate_id("pro_input", "id")
+
+        # Future 在写入进程提交后完成，失败的写操作带回错误
+        duplicate = stores[1].submit("INSERT INTO test_runs (run_id, round_id, status) VALUES (?, ?, ?)", (5, 3, 1))
+        self.assertTrue(stores[1].flush(timeout=10))
+        self.assertIsInstance(duplicate.exception(), sqlite3.DatabaseError)
+        for store in stores:
+            store.close()
+
+        self.writes.put(None)
+        self.writer.join(10)
+        self.assertEqual(self.writer.exitcode, 0)
+
+
+class CampaignCoordinatorTestCase(unittest.TestCase):
+    def test_stop_and_shard_status(self):
+        coordinator = CampaignCoordinator(StubLogger(), object(), ["http://a:1", "http://b:2"])
+        self.assertFalse(coordinator.sing_stop)
+        coordinator.sing_stop = True
+        self.assertTrue(coordinator.sing_stop)
+        status = coordinator.shard_status()
+        self.assertEqual([shard["bench"] for shard in status], ["http://a:1", "http://b:2"])
+        status[0]["completed"] = 9
+        self.assertEqual(coordinator.shard_status()[0]["completed"], 0)
+
+    def test_stop_signal_from_one_shard_stops_the_rest(self):
+        coordinator = CampaignCoordinator(StubLogger(), object(), ["http://a:1", "http://b:2"])
+        events = queue.Queue()
+        events.put(("finished", 1, "stop_signal"))
+        states = {}
+        coordinator._drain_events(events, states, block=False)
+        self.assertEqual(states, {1: "stop_signal"})
+        self.assertTrue(coordinator.sing_stop)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from unittest import mock
+
+from app.services import campaign_stats
+from app.services.campaign_stats import CampaignStats, get_campaign_stats
+
+
+class CampaignStatsTestCase(unittest.TestCase):
+    def test_counts_match_status_query(self):
+        stats = CampaignStats()
+        stats.start()
+        for status, strategy in [(1, 0), (4, 1), (2, -2), (1, -4), (-1, -1), (1, 0)]:
+            stats.record(status, strategy)
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["runs"], 6)
+        self.assertEqual(snapshot["exceptions"], 4)
+        self.assertEqual(snapshot["statusCounts"], {1: 3, 4: 1, 2: 1, -1: 1})
+
+        stats.start()
+        self.assertEqual(stats.snapshot()["runs"], 0)
+
+    def test_throughput_and_eta(self):
+        clock = [100.0]
+        with mock.patch.object(campaign_stats.time, "monotonic", side_effect=lambda: clock[0]):
+            stats = CampaignStats(window=60)
+            stats.start()
+            self.assertIsNone(stats.snapshot(goal=10)["eta"])
+            for _ in range(5):
+                clock[0] += 6
+                stats.record(1, 0)
+            snapshot = stats.snapshot(goal=10)
+            self.assertEqual(snapshot["throughput"], 10.0)
+            self.assertEqual(snapshot["eta"], 30.0)
+
+            # 超出统计窗口的完成时刻不再计入
+            clock[0] += 120
+            self.assertEqual(stats.snapshot(goal=10)["throughput"], 0.0)
+
+    def test_shared_per_database(self):
+        self.assertIs(get_campaign_stats("sqlite:///stats.db"), get_campaign_stats("stats.db"))
+
+
+if __name__ == "__main__":
+    unittest.main()
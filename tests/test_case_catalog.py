@@ -0,0 +1,45 @@
+import unittest
+
+from app.services.case_catalog import CaseCatalog
+
+
+def _param(name, uuid):
+    return {"name": name, "uuid": uuid, "in_type": 1}
+
+
+class CaseCatalogTestCase(unittest.TestCase):
+    def setUp(self):
+        self.single = {"in_put": _param("a", "ua"), "out_put": []}
+        self.duplicate = {"in_put": _param("a", "ua"), "out_put": [{"name": "dup"}]}
+        self.multi = {"in_put": [_param("b", "ub"), _param("c", "uc")], "out_put": []}
+        self.catalog = CaseCatalog(
+            {1: [self.single, self.duplicate], 2: [self.multi]},
+            error_cases={1: [{"in_put": _param("a", "ua"), "error": ["e1"]},
+                             {"in_put": _param("a", "ua"), "error": ["e2"]}]},
+            stuck_cases={1: [{"in_put": _param("a", "ua"), "stuck": ["s1"]}]},
+        )
+
+    def test_param_lookup_returns_first_match(self):
+        self.assertIs(self.catalog.param_by_name("a", 1), self.single["in_put"])
+        self.assertIs(self.catalog.param_by_name("c", 2), self.multi["in_put"][1])
+        self.assertIsNone(self.catalog.param_by_name("c", 1))
+
+    def test_case_lookup_by_uuid(self):
+        self.assertEqual(self.catalog.case_by_uuid("ua", 1), (self.single, True))
+        self.assertEqual(self.catalog.case_by_uuid("uc", 2), (self.multi, False))
+        self.assertIsNone(self.catalog.case_by_uuid("ua", 2))
+
+    def test_position_matches_list_index(self):
+        self.assertEqual(self.catalog.position(self.duplicate, 1), 1)
+        self.assertEqual(self.catalog.position(self.multi, 2), 0)
+        with self.assertRaises(ValueError):
+            self.catalog.position((self.single, 1), 1)
+
+    def test_error_and_stuck_lookup(self):
+        self.assertEqual(self.catalog.errors_for("ua"), ["e1"])
+        self.assertEqual(self.catalog.stucks_for("ua"), ["s1"])
+        self.assertEqual(self.catalog.errors_for("ub", default=[]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from app.services.case_pool import CasePool, MutantCase
+
+
+def _case(i):
+    return {"in_data": {"value": i}}
+
+
+def _values(pool):
+    return [case["in_data"]["value"] for case in pool]
+
+
+class CasePoolTestCase(unittest.TestCase):
+    def test_mutations_run_before_remaining_seeds(self):
+        pool = CasePool()
+        pool.extend([_case(1), _case(2), _case(3)])
+        self.assertEqual(pool.pop()["in_data"]["value"], 1)
+        pool.push_front([_case(10), _case(11)])
+        pool.push_front([_case(20)])
+        self.assertEqual(len(pool), 5)
+        self.assertEqual(_values(pool), [20, 10, 11, 2, 3])
+        self.assertIsNone(pool.pop())
+
+    def test_lazy_source_materialised_on_pop(self):
+        generated = []
+
+        def seeds():
+            for i in range(1000000):
+                generated.append(i)
+                yield _case(i)
+
+        pool = CasePool()
+        pool.extend(seeds(), count=1000000)
+        pool.append(_case(-1))
+        self.assertEqual(len(pool), 1000001)
+        self.assertEqual(generated, [])
+        self.assertTrue(pool)
+        self.assertEqual(pool.pop()["in_data"]["value"], 0)
+        self.assertEqual(pool.pop()["in_data"]["value"], 1)
+        self.assertEqual(generated, [0, 1])
+        self.assertEqual(len(pool), 999999)
+
+    def test_sources_drain_in_order(self):
+        pool = CasePool()
+        pool.extend(iter([_case(1)]))
+        pool.extend([])
+        pool.extend((_case(i) for i in (2, 3)), count=2)
+        self.assertEqual(_values(pool), [1, 2, 3])
+        self.assertFalse(pool)
+        self.assertEqual(len(pool), 0)
+
+
+class MutantCaseTestCase(unittest.TestCase):
+    def test_single_param_override(self):
+        template = {"type": 1, "in_data": {"name": "a", "value": 1}, "expected_results": [{"name": "x"}],
+                    "error": [{"error_type": 1, "out_data": []}]}
+        case = MutantCase(template, {0: 5}).materialize()
+        self.assertEqual(case["in_data"], {"name": "a", "value": 5})
+        self.assertEqual(template["in_data"]["value"], 1)
+        self.assertIs(case["expected_results"], template["expected_results"])
+        self.assertIs(case["error"], template["error"])
+
+    def test_multi_param_override_and_updates(self):
+        template = {"type": 2, "in_data": [{"ID": "a", "value": "1"}, {"ID": "b", "value": "2"}], "est_time": 1}
+        case = MutantCase(template, {1: "9"}, {"est_time": 5}).materialize()
+        self.assertEqual([p["value"] for p in case["in_data"]], ["1", "9"])
+        self.assertEqual(case["est_time"], 5)
+        self.assertEqual(template["in_data"][1]["value"], "2")
+        self.assertEqual(template["est_time"], 1)
+
+    def test_pool_materialises_mutants_on_pop(self):
+        template = {"in_data": {"value": 0}}
+        pool = CasePool()
+        pool.extend([_case(1)])
+        pool.push_front(MutantCase(template, {0: v}) for v in (7, 8))
+        popped = [pool.pop() for _ in range(3)]
+        self.assertEqual([case["in_data"]["value"] for case in popped], [7, 8, 1])
+        self.assertIsNot(popped[0]["in_data"], popped[1]["in_data"])
+
+
+if __name__ == "__main__":
+    unittest.main()
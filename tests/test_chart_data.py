@@ -0,0 +1,123 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from app.services.chart_data import ChartDataService, parse_fields
+
+SCHEMA = """
+CREATE TABLE test_runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, round_id INTEGER, actual_input TEXT,
+    expected_output TEXT, actual_output TEXT, expected_duration INTEGER, actual_duration INTEGER,
+    status INTEGER, type INTEGER, strategy INTEGER);
+"""
+
+
+class ChartDataServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "db.db")
+        conn = sqlite3.connect(self.path)
+        conn.executescript(SCHEMA)
+        rows = [
+            (1, json.dumps([{"name": "a", "value": 1}]), 100, 1, 0),
+            (1, "{broken", 300, 2, -2),
+            (2, None, None, 4, 1),
+            (2, json.dumps({"ID": "u"}), 200, 1, -4),
+            (2, json.dumps([]), 400, 3, -3),
+        ]
+        conn.executemany("INSERT INTO test_runs (round_id, actual_input, actual_duration, status, strategy, type) "
+                         "VALUES (?, ?, ?, ?, ?, 1)", rows)
+        conn.commit()
+        conn.close()
+        self.service = ChartDataService(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_summary_matches_per_statistic_queries(self):
+        data = self.service.summary()
+        self.assertEqual(data["rounds"], [1, 2])
+        self.assertEqual(data["stats"], {"total": 5, "normal": 2, "error": 4, "avgDuration": 250.0})
+        self.assertEqual(data["statusCounts"], {1: 2, 2: 1, 3: 1, 4: 1})
+
+        round_two = self.service.summary("2")
+        self.assertEqual(round_two["stats"], {"total": 3, "normal": 1, "error": 3, "avgDuration": 300.0})
+        self.assertEqual(round_two["statusCounts"], {1: 1, 2: 0, 3: 1, 4: 1})
+        self.assertEqual(self.service.summary(9)["stats"]["total"], 0)
+
+    def test_records_parse_json_once(self):
+        records = self.service.records(start=1, end=2)
+        self.assertEqual([r["run_id"] for r in records], [1, 2])
+        self.assertEqual(records[0]["actual_input"], [{"name": "a", "value": 1}])
+        self.assertIsNone(records[1]["actual_input"])
+        self.assertEqual([r["run_id"] for r in self.service.records("2", start=2, end=3)], [4, 5])
+
+    def test_keyset_pages_walk_both_directions(self):
+        first = self.service.page(limit=2)
+        self.assertEqual([r["run_id"] for r in first["records"]], [1, 2])
+        self.assertEqual((first["nextAfter"], first["prevBefore"]), (2, None))
+        last = self.service.page(after=first["nextAfter"], limit=3)
+        self.assertEqual([r["run_id"] for r in last["records"]], [3, 4, 5])
+        self.assertEqual((last["nextAfter"], last["prevBefore"]), (None, 3))
+        back = self.service.page(before=5, limit=2)
+        self.assertEqual([r["run_id"] for r in back["records"]], [3, 4])
+        self.assertEqual((back["nextAfter"], back["prevBefore"]), (4, 3))
+
+        in_round = self.service.page("2", after=3, limit=5)
+        self.assertEqual([r["run_id"] for r in in_round["records"]], [4, 5])
+
+    def test_cursors_only_point_at_existing_rows(self):
+        # 前端以 after=第一条-1 打开第一页：轮次内没有更早的记录，不应给出上一页
+        first = self.service.page("2", after=2, limit=2)
+        self.assertEqual([r["run_id"] for r in first["records"]], [3, 4])
+        self.assertEqual((first["nextAfter"], first["prevBefore"]), (4, None))
+        last = self.service.page("2", after=first["nextAfter"], limit=2)
+        self.assertEqual((last["nextAfter"], last["prevBefore"]), (None, 5))
+        back = self.service.page("2", before=last["prevBefore"], limit=2)
+        self.assertEqual([r["run_id"] for r in back["records"]], [3, 4])
+        self.assertEqual((back["nextAfter"], back["prevBefore"]), (4, None))
+        self.assertEqual(self.service.page("1", after=0, limit=2)["nextAfter"], None)
+        self.assertEqual(self.service.page(9, after=0)["records"], [])
+
+    def test_cursor_scan_is_bounded_to_round(self):
+        statements = []
+
+        def connect():
+            conn = sqlite3.connect(self.path)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        with mock.patch.object(self.service, "_connect", side_effect=connect):
+            self.assertEqual(self.service.page("1", after=2, limit=2)["records"], [])
+        query = next(sql for sql in statements if "ORDER BY run_id" in sql)
+        conn = sqlite3.connect(self.path)
+        plan = conn.execute("EXPLAIN QUERY PLAN " + query).fetchall()
+        conn.close()
+        # 主键两端都有边界：越过轮次末尾不会扫描到表尾
+        self.assertIn("rowid>? AND rowid<?", plan[0][-1])
+
+    def test_field_projection(self):
+        fields = parse_fields("status, strategy")
+        self.assertEqual(fields, ("run_id", "status", "strategy"))
+        records = self.service.page(limit=1, fields=fields)["records"]
+        self.assertEqual(records, [{"run_id": 1, "status": 1, "strategy": 0}])
+        with self.assertRaises(ValueError):
+            parse_fields("status,actual_input;DROP")
+
+    def test_cache_until_database_changes(self):
+        first = self.service.chart_data()
+        with mock.patch.object(ChartDataService, "_connect", side_effect=AssertionError("queried")):
+            second = self.service.chart_data()
+        self.assertIs(first["records"], second["records"])
+
+        conn = sqlite3.connect(self.path)
+        conn.execute("INSERT INTO test_runs (round_id, actual_duration, status, strategy) VALUES (3, 50, 1, 0)")
+        conn.commit()
+        conn.close()
+        self.assertEqual(self.service.chart_data()["rounds"], [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
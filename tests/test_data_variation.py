@@ -0,0 +1,69 @@
+import unittest
+
+from app.services.data_variation import DataVariation
+from tests import StubLogger
+
+
+class _Config:
+    CASE_SEED = None
+
+
+def _param(name, uuid, min_value, max_value, step="1"):
+    return {"name": name, "uuid": uuid, "in_type": 1, "in_range": 1, "min": min_value, "max": max_value,
+            "step_len": step}
+
+
+def _variation():
+    dv = DataVariation(StubLogger(), _Config(), case_list=[])
+    dv.expected_time_type1 = 1000
+    dv.expected_case_type1 = [{"in_put": _param("a", "uuid-a", "0", "100"), "out_put": [{"name": "x"}]}]
+    dv.error_case_type1 = [{"error": [{"name": "e"}]}]
+    dv.stuck_case_type1 = [{"stuck": []}]
+    dv.expected_case_type2 = [{"in_put": [_param("b", "uuid-b", "0", "10", "0.5"), _param("c", "uuid-c", "0", "50")],
+                               "out_put": [{"name": "y"}]}]
+    dv.error_case_type2 = [{"error": []}]
+    dv.stuck_case_type2 = [{"stuck": []}]
+    dv._build_seed_templates()
+    return dv
+
+
+class SeedCaseTestCase(unittest.TestCase):
+    def test_same_seed_same_cases(self):
+        dv = _variation()
+        first = list(dv.iter_seed_cases(42, 5, 5, "MIX"))
+        second = list(_variation().iter_seed_cases(42, 5, 5, "MIX"))
+        self.assertEqual(first, second)
+        self.assertEqual([case["type"] for case in first], [1, 2] * 5)
+        self.assertEqual(first[0]["in_data"]["ID"], "uuid-a")
+        self.assertEqual(first[1]["in_data"][0]["data_type"], "float")
+
+    def test_resume_from_index(self):
+        dv = _variation()
+        full = list(dv.iter_seed_cases(7, 6, 4, "WAKE"))
+        resumed = list(dv.iter_seed_cases(7, 6, 4, "WAKE", start=4))
+        self.assertEqual(resumed, full[4:])
+        self.assertEqual([case["type"] for case in full], [1] * 6 + [2] * 4)
+
+    def test_shards_partition_seed_cases(self):
+        dv = _variation()
+        full = list(dv.iter_seed_cases(9, 5, 5, "MIX"))
+        shards = [list(dv.iter_seed_cases(9, 5, 5, "MIX", start=k, step=3)) for k in range(3)]
+        self.assertEqual([len(shard) for shard in shards], [4, 3, 3])
+        self.assertEqual(shards[1], full[1::3])
+        self.assertEqual(sorted(map(repr, sum(shards, []))), sorted(map(repr, full)))
+
+    def test_expected_and_error_shared_by_reference(self):
+        dv = _variation()
+        cases = list(dv.iter_seed_cases(1, 3, 0, "WAKE"))
+        self.assertIs(cases[0]["expected_results"], cases[1]["expected_results"])
+        self.assertIs(cases[0]["error"], cases[2]["error"])
+        self.assertIsNot(cases[0]["in_data"], cases[1]["in_data"])
+
+    def test_missing_templates_yield_nothing(self):
+        dv = _variation()
+        dv._seed_templates[2] = []
+        self.assertEqual([case["type"] for case in dv.iter_seed_cases(3, 2, 2, "MIX")], [1, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from app.services import definition_loader
+from app.services.data_init import DataInit
+from tests import StubLogger
+
+
+def _write(path, data):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+
+
+_TEST_DEF = {"case_type": 1, "types": [
+    {"name": "in1", "direction": "in", "data_type": "int", "factor": 1, "uuid": "u1",
+     "ranges": [{"min_value": 0, "max_value": 10}], "value_set": {"positive_values": []}},
+]}
+_ASSERT_DEF = {"value": [{"in_put": {"name": "in1", "uuid": "u1"}, "out_put": [], "error": [], "stuck": []}]}
+
+
+class DefinitionLoaderTestCase(unittest.TestCase):
+    def setUp(self):
+        definition_loader.clear_cache()
+        self.root = tempfile.mkdtemp()
+        self.data_dir = os.path.join(self.root, "case")
+        os.mkdir(self.data_dir)
+        _write(os.path.join(self.data_dir, "test_001.json"), _TEST_DEF)
+        _write(os.path.join(self.data_dir, "assert_001.json"), _ASSERT_DEF)
+
+        class _Config:
+            DATA_DIR = self.root + os.sep
+            DIR_NAME = "case"
+            DEFINITION_LOAD_WORKERS = 2
+            DEFINITION_SNAPSHOT = False
+
+        self.config = _Config
+
+    def tearDown(self):
+        definition_loader.clear_cache()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _load(self, logger=None):
+        data_init = DataInit(logger or StubLogger(), self.config)
+        ok, err = data_init.separate_data()
+        self.assertIsNone(err)
+        return data_init.case_list
+
+    def test_case_list_reused_until_files_change(self):
+        first = self._load()
+        with mock.patch.object(DataInit, "load_json_files", side_effect=AssertionError("reparsed")):
+            second = self._load()
+        self.assertEqual(first, second)
+        self.assertIs(first[0], second[0])
+
+        changed = dict(_ASSERT_DEF, value=_ASSERT_DEF["value"] * 2)
+        _write(os.path.join(self.data_dir, "assert_001.json"), changed)
+        third = self._load()
+        self.assertEqual(len(third[0]["expected_results"]["expected"]), 2)
+
+    def test_snapshot_survives_memory_cache_reset(self):
+        self.config.DEFINITION_SNAPSHOT = True
+        first = self._load()
+        self.assertTrue(os.path.exists(definition_loader.snapshot_path(self.data_dir)))
+        definition_loader.clear_cache()
+        with mock.patch.object(DataInit, "load_json_files", side_effect=AssertionError("reparsed")):
+            second = self._load()
+        self.assertEqual(first, second)
+
+    def test_files_paired_by_suffix(self):
+        # listdir 顺序与配对无关；缺少配对的文件告警后跳过
+        type2 = dict(_TEST_DEF, case_type=2)
+        _write(os.path.join(self.data_dir, "test_000.json"), type2)
+        _write(os.path.join(self.data_dir, "assert_000.json"), dict(_ASSERT_DEF, value=_ASSERT_DEF["value"] * 3))
+        _write(os.path.join(self.data_dir, "test_009.json"), _TEST_DEF)
+        _write(os.path.join(self.data_dir, "assert_010.json"), _ASSERT_DEF)
+        logger = StubLogger()
+        with mock.patch("os.listdir", return_value=["assert_001.json", "test_009.json", "test_000.json",
+                                                     "assert_010.json", "test_001.json", "assert_000.json"]):
+            case_list = self._load(logger)
+        self.assertEqual([case["expected_results"]["type"] for case in case_list], [2, 1])
+        self.assertEqual(case_list[0]["expected_results"]["time"], 60)
+        self.assertEqual(len(case_list[0]["expected_results"]["expected"]), 3)
+        self.assertEqual(len(case_list[0]["error_results"]["error"]), 3)
+        self.assertEqual(len(case_list[1]["expected_results"]["expected"]), 1)
+        self.assertEqual(len(logger.warnings), 1)
+        self.assertIn("test_009.json", logger.warnings[0])
+        self.assertIn("assert_010.json", logger.warnings[0])
+
+    def test_parallel_read_keeps_order_and_reports_errors(self):
+        with open(os.path.join(self.data_dir, "test_002.json"), "w", encoding="utf-8") as file:
+            file.write("{broken")
+        results = definition_loader.read_json_files(
+            self.data_dir, ["test_001.json", "test_002.json", "assert_001.json"], workers=3)
+        self.assertEqual([name for name, _, _ in results], ["test_001.json", "test_002.json", "assert_001.json"])
+        self.assertIsNone(results[0][2])
+        self.assertIsInstance(results[1][2], ValueError)
+        self.assertEqual(results[2][1], _ASSERT_DEF)
+
+
+if __name__ == "__main__":
+    unittest.main()
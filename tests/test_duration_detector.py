@@ -0,0 +1,99 @@
+import unittest
+
+from app.services.duration_detector import DurationDetector, get_duration_detector
+from tests import StubLogger
+
+
+def _row(run_id, duration):
+    return {"run_id": run_id, "actual_duration": duration}
+
+
+class DurationDetectorTestCase(unittest.TestCase):
+    def _feed(self, detector, durations, start=1):
+        anomalies = []
+        for offset, duration in enumerate(durations):
+            anomalies.extend(detector.observe(_row(start + offset, duration)))
+        return anomalies
+
+    def test_growth_reports_first_points_of_segment(self):
+        detector = DurationDetector(window=20, min_increase=100, growth_steps=4)
+        anomalies = self._feed(detector, [1000, 1000, 1200, 1400, 1600, 1800, 2000])
+        self.assertEqual(len(anomalies), 1)
+        self.assertEqual([r["run_id"] for r in anomalies[0]["growth_rows"]], [2, 3, 4, 5])
+        self.assertEqual(anomalies[0]["strategy"], 0)
+
+    def test_small_increase_is_jitter(self):
+        detector = DurationDetector(window=20, min_increase=100, growth_steps=4)
+        self.assertEqual(self._feed(detector, [1000, 1050, 1100, 1150, 1200, 1250]), [])
+
+    def test_outlier_needs_full_window(self):
+        detector = DurationDetector(window=5, outlier_ms=2000)
+        self.assertEqual(self._feed(detector, [1000, 5000]), [])
+        anomalies = self._feed(detector, [1000, 1000, 1000, 1000, 4000], start=3)
+        self.assertEqual(anomalies[-1]["outlier_row"]["run_id"], 7)
+        self.assertEqual(detector.strategy_for(7), 3)
+
+    def test_outlier_across_fixed_window_boundary(self):
+        # 孤点出现在第21条时，固定20条窗口的分析会漏掉；滑动窗口能检测到
+        detector = DurationDetector(window=20, outlier_ms=2000)
+        anomalies = self._feed(detector, [1000] * 20 + [3500])
+        self.assertEqual(anomalies[-1]["outlier_row"]["run_id"], 21)
+
+    def test_expired_max_leaves_window(self):
+        detector = DurationDetector(window=3, outlier_ms=2000)
+        self._feed(detector, [9000, 1000, 1000])
+        anomalies = self._feed(detector, [3500], start=4)
+        self.assertEqual(anomalies[0]["outlier_row"]["run_id"], 4)
+
+    def test_seed_builds_state_without_alerts(self):
+        detector = DurationDetector(window=3, outlier_ms=2000)
+        detector.ensure_seeded(lambda: [_row(1, 1000), _row(2, 1000)])
+        self.assertTrue(detector.seeded)
+        anomalies = self._feed(detector, [3500], start=3)
+        self.assertEqual(anomalies[0]["outlier_row"]["run_id"], 3)
+
+    def test_late_rows_are_ignored_with_warning(self):
+        logger = StubLogger()
+        detector = DurationDetector(window=20, min_increase=100, growth_steps=4, logger=logger)
+        self._feed(detector, [1000, 1200, 1400], start=1)
+        # 未预留的旧记录晚到：不打断增长计数，记录警告
+        self.assertEqual(detector.observe(_row(2, 100)), [])
+        self.assertEqual(len(logger.warnings), 1)
+        self.assertIn("run_id=2", logger.warnings[0])
+        anomalies = self._feed(detector, [1600, 1800], start=4)
+        self.assertEqual([r["run_id"] for r in anomalies[0]["growth_rows"]], [1, 2, 3, 4])
+        self.assertEqual(anomalies[0]["growth_rows"][1]["actual_duration"], 1200)
+
+    def test_reserved_rows_are_checked_in_run_id_order(self):
+        detector = DurationDetector(window=20, min_increase=100, growth_steps=3)
+        for run_id in range(1, 7):
+            detector.reserve(run_id)
+        # 并行回放乱序完成：先到的记录等之前的记录到达后再检测
+        self.assertEqual(detector.observe(_row(3, 1200)), [])
+        self.assertEqual(detector.observe(_row(5, 1600)), [])
+        self.assertEqual(detector.observe(_row(2, 1000)), [])
+        self.assertEqual(detector.observe(_row(1, 1000)), [])
+        self.assertEqual(detector.strategy_for(3), 0)
+        # run_id 4 没有写入记录：释放后 5 随之检测
+        self.assertEqual(detector.release(4), [])
+        anomalies = detector.observe(_row(6, 1800))
+        self.assertEqual([r["run_id"] for r in anomalies[0]["growth_rows"]], [2, 3, 5])
+        self.assertEqual(detector.release(6), [])
+        self.assertEqual(detector.observe(_row(7, 100)), [])
+
+    def test_zero_config_is_kept(self):
+        class _Config:
+            DURATION_WINDOW = None
+            DURATION_MIN_INCREASE = 0
+            DURATION_OUTLIER_MS = 0
+            DURATION_GROWTH_STEPS = 2
+
+        detector = get_duration_detector("sqlite:///zero-config-test.db", _Config)
+        self.assertEqual(detector.window, 20)
+        self.assertEqual(detector.min_increase, 0)
+        self.assertEqual(detector.outlier_ms, 0)
+        self.assertEqual(detector.growth_steps, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from app.services.duration_window import DurationWindow
+
+
+def _row(run_id, duration=100):
+    return {"run_id": run_id, "actual_duration": duration}
+
+
+class DurationWindowTestCase(unittest.TestCase):
+    def test_cold_start_uses_loader_once(self):
+        calls = []
+
+        def loader(run_id, limit):
+            calls.append((run_id, limit))
+            return [_row(i) for i in range(run_id, max(0, run_id - limit), -1)]
+
+        window = DurationWindow(size=5)
+        rows = window.recent(10, loader)
+        self.assertEqual([r["run_id"] for r in rows], [10, 9, 8, 7, 6])
+        window.append(_row(11))
+        rows = window.recent(11, loader)
+        self.assertEqual([r["run_id"] for r in rows], [11, 10, 9, 8, 7])
+        self.assertEqual(calls, [(10, 5)])
+
+    def test_window_keeps_last_n_in_run_id_order(self):
+        window = DurationWindow(size=3)
+        for run_id in (1, 2, 4, 3, 5):
+            window.append(_row(run_id))
+        rows = window.recent(5, lambda run_id, limit: self.fail("unexpected fallback"))
+        self.assertEqual([r["run_id"] for r in rows], [5, 4, 3])
+
+    def test_falls_back_when_upper_bound_not_covered(self):
+        window = DurationWindow(size=3)
+        for run_id in (7, 8, 9):
+            window.append(_row(run_id))
+        rows = window.recent(8, lambda run_id, limit: [_row(8), _row(7), _row(6)])
+        self.assertEqual([r["run_id"] for r in rows], [8, 7, 6])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import logging
+import shutil
+import tempfile
+import unittest
+
+from app.utils.log_ctrl import Logger, LazyJson, _LogBackend
+
+
+class _Value:
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "value"
+
+
+class LogCtrlTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _logger(self, log_format, name):
+        backend = _LogBackend(self.root, 1024 * 1024, 1, log_format, name=name)
+        logger = Logger.__new__(Logger)
+        logger.logger = backend.logger
+        logger.logger.setLevel(logging.INFO)
+        return backend, logger
+
+    @staticmethod
+    def _read(path):
+        with open(path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_json_lines_routed_by_level(self):
+        backend, logger = self._logger("json", "test_log_ctrl_json")
+        logger.info("API响应: %s", LazyJson({"ok": 1, "msg": "成功"}), run_id=3)
+        logger.warn("耗时异常")
+        logger.error("读取信号失败")
+        backend.stop()
+
+        entries = [json.loads(line) for line in self._read(backend.all_log_file)]
+        self.assertEqual([entry["level"] for entry in entries], ["INFO", "WARNING", "ERROR"])
+        self.assertEqual(entries[0]["message"], 'API响应: {"ok": 1, "msg": "成功"}')
+        self.assertEqual(entries[0]["run_id"], 3)
+        self.assertEqual([json.loads(line)["message"] for line in self._read(backend.warn_log_file)], ["耗时异常"])
+        self.assertEqual([json.loads(line)["message"] for line in self._read(backend.error_log_file)], ["读取信号失败"])
+
+    def test_arguments_formatted_only_when_enabled(self):
+        backend, logger = self._logger("text", "test_log_ctrl_text")
+        skipped, written = _Value(), _Value()
+        logger.debug("跳过: %s", skipped)
+        logger.info("写入: %s", written, bench=1)
+        backend.stop()
+
+        self.assertEqual(skipped.formatted, 0)
+        lines = self._read(backend.all_log_file)
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].endswith("INFO - 写入: value bench=1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from app.services.param_domain import DomainIndex, ParamDomain
+
+
+def _param(min_value="0", max_value="10", step="1", in_type=1, in_range=1, uuid="u"):
+    return {"uuid": uuid, "name": uuid, "in_type": in_type, "in_range": in_range, "min": min_value,
+            "max": max_value, "step_len": step}
+
+
+class ParamDomainTestCase(unittest.TestCase):
+    def test_values_exclude_boundaries(self):
+        domain = ParamDomain(_param(step="0.5", max_value="2"))
+        self.assertEqual(domain.value_list, [0.5, 1.0, 1.5])
+        self.assertEqual(domain.data_type, "float")
+        self.assertEqual(ParamDomain(_param(in_range=2, max_value="2")).value_list, [0.0, 1.0, 2.0])
+        self.assertEqual(ParamDomain(_param(min_value="3", in_type=2, max_value="")).value_list, [3.0])
+
+    def test_invalid_config_reports_error(self):
+        domain = ParamDomain(_param(max_value=""))
+        self.assertEqual(domain.value_list, [])
+        self.assertTrue(domain.error)
+
+    def test_neighbors_spiral_around_current_value(self):
+        domain = ParamDomain(_param(max_value="100"))
+        self.assertEqual(sorted(domain.neighbors(50.0, 5)), [48.0, 49.0, 51.0, 52.0])
+        self.assertEqual(sorted(domain.neighbors(1.0, 4)), [2.0, 3.0, 4.0])
+        with self.assertRaises(ValueError):
+            domain.neighbors(50.5, 5)
+
+    def test_index_shares_domains(self):
+        index = DomainIndex()
+        param = _param()
+        self.assertIs(index.get(param), index.get(dict(param)))
+        self.assertIsNot(index.get(param), index.get(_param(uuid="v")))
+        self.assertEqual(len(index), 2)
+
+
+class SampleBatchTestCase(unittest.TestCase):
+    def test_batch_matches_generate_value_distribution(self):
+        index = DomainIndex()
+        domains = [index.get(_param(max_value="10")), index.get(_param(min_value="7", in_type=2, uuid="f")),
+                   index.get(_param(step="0.5", max_value="3", uuid="h")), index.get(_param(in_type=3, uuid="x"))]
+        samples = index.sample_batch(domains, 1000, np.random.default_rng(0))
+        self.assertEqual(samples.shape, (4, 1000))
+        self.assertEqual(set(samples[0].tolist()), {float(i) for i in range(1, 10)})
+        self.assertTrue(np.all(samples[1] == 7.0))
+        self.assertEqual(set(samples[2].tolist()), {0.5, 1.0, 1.5, 2.0, 2.5})
+        self.assertTrue(np.all(np.isnan(samples[3])))
+
+    def test_same_rng_seed_same_samples(self):
+        index = DomainIndex()
+        domains = [index.get(_param(max_value="1000"))]
+        first = index.sample_batch(domains, 5, np.random.default_rng([1, 2]))
+        second = index.sample_batch(domains, 5, np.random.default_rng([1, 2]))
+        self.assertTrue(np.array_equal(first, second))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.platform_client import PlatformClient, get_platform_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    peers = set()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        _Handler.peers.add(self.client_address)
+        body = json.dumps({"ok": 1, "data": {}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PlatformClientTestCase(unittest.TestCase):
+    def setUp(self):
+        _Handler.peers = set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_keep_alive_reuses_connection(self):
+        client = PlatformClient(self.base_url, pool_size=2)
+        for _ in range(5):
+            response = client.post("read", f"{self.base_url}/api/v1/read", json={"signals": []})
+            self.assertEqual(response.json()["ok"], 1)
+        client.close()
+        self.assertEqual(len(_Handler.peers), 1)
+
+    def test_latency_stats_per_endpoint(self):
+        client = PlatformClient(self.base_url, timeouts={"read": (1, 1)})
+        client.post("read", f"{self.base_url}/api/v1/read", json={})
+        client.post("send", f"{self.base_url}/api/v1/send", json=[])
+        client.post("send", f"{self.base_url}/api/v1/send", json=[])
+        stats = client.latency_stats()
+        client.close()
+        self.assertEqual(stats["read"]["count"], 1)
+        self.assertEqual(stats["send"]["count"], 2)
+        self.assertEqual(stats["send"]["errors"], 0)
+        self.assertEqual(client.timeouts["read"], (1, 1))
+
+    def test_failed_request_counted_as_error(self):
+        client = PlatformClient(self.base_url)
+        with self.assertRaises(Exception):
+            client.post("reset", "http://127.0.0.1:1/api/v1/reset", json={}, timeout=(0.5, 0.5))
+        client.close()
+        self.assertEqual(client.latency_stats()["reset"]["errors"], 1)
+
+    def test_shared_client_per_platform_url(self):
+        class _Config:
+            TEST_PALTFORM_URL = self.base_url
+            PLATFORM_POOL_SIZE = 4
+
+        first = get_platform_client(_Config)
+        second = get_platform_client(_Config)
+        self.assertIs(first, second)
+        self.assertEqual(first.pool_size, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
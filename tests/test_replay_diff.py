@@ -0,0 +1,57 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from app.services.replay_diff import replay_diff
+
+
+class ReplayDiffTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.source = os.path.join(self.root, "source.db")
+        self.replay = os.path.join(self.root, "replay.db")
+        # 源记录 1..10：status=1/strategy=0，耗时 1000
+        self._create(self.source, [(run_id, 1, 0, 1000) for run_id in range(1, 11)])
+        # 回放：1..6 一致（耗时 +run_id*10），7、8 变为错误，9、10 无回放结果
+        rows = [(run_id, 1, 0, 1000 + run_id * 10) for run_id in range(1, 7)]
+        rows += [(7, 2, -2, 1500), (8, 2, -2, None)]
+        self._create(self.replay, rows)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    @staticmethod
+    def _create(path, rows):
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE test_runs (run_id INTEGER PRIMARY KEY, status INTEGER, strategy INTEGER, "
+                     "actual_duration INTEGER)")
+        conn.executemany("INSERT INTO test_runs VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+        conn.close()
+
+    def test_transitions_and_duration_percentiles(self):
+        report = replay_diff(self.source, self.replay, fetch_rows=3)
+        self.assertEqual((report["total"], report["replayed"], report["missing"]), (10, 8, 2))
+        self.assertEqual((report["unchanged"], report["statusChanged"], report["strategyChanged"]), (6, 2, 2))
+        self.assertEqual(report["transitions"], [
+            {"from": {"status": 1, "strategy": 0}, "to": {"status": 1, "strategy": 0}, "count": 6},
+            {"from": {"status": 1, "strategy": 0}, "to": None, "count": 2},
+            {"from": {"status": 1, "strategy": 0}, "to": {"status": 2, "strategy": -2}, "count": 2},
+        ])
+        duration = report["duration"]
+        # 耗时差：10..60 与 500，回放耗时为空的记录不计入
+        self.assertEqual(duration["count"], 7)
+        self.assertEqual((duration["min"], duration["max"], duration["p50"]), (10.0, 500.0, 40.0))
+
+    def test_run_id_range_and_missing_database(self):
+        report = replay_diff(self.source, self.replay, start_run_id=7, end_run_id=9)
+        self.assertEqual((report["total"], report["replayed"], report["statusChanged"]), (3, 2, 2))
+        self.assertEqual(report["duration"]["count"], 1)
+        with self.assertRaises(FileNotFoundError):
+            replay_diff(self.source, os.path.join(self.root, "missing.db"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import itertools
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from app.services.database_handler import TestResultHandler
+from app.services.replay_runner import ReplayCheckpoint, ReplayService
+from tests import StubLogger
+
+
+class ReplayServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        source = os.path.join(self.root, "source.db")
+        conn = sqlite3.connect(source)
+        conn.execute("CREATE TABLE test_runs (run_id INTEGER PRIMARY KEY, round_id INTEGER, actual_input TEXT, "
+                     "expected_output TEXT, expected_error_output TEXT, expected_stuck_output TEXT, "
+                     "expected_duration INTEGER, type INTEGER, strategy INTEGER, status INTEGER, "
+                     "actual_output TEXT, actual_duration INTEGER)")
+        rows = [(run_id, 1, json.dumps([{"name": "in1", "value": run_id}]), "[]", None, None, 3000, 1, 0, 1)
+                for run_id in range(1, 13)]
+        rows[4] = (5, 1, None, "[]", None, None, 0, 1, 0, 1)
+        conn.executemany("INSERT INTO test_runs (run_id, round_id, actual_input, expected_output, "
+                         "expected_error_output, expected_stuck_output, expected_duration, type, strategy, status) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.execute("CREATE INDEX ix_test_runs_type ON test_runs (type)")
+        conn.execute("CREATE TABLE SYUSER (ID INTEGER PRIMARY KEY AUTOINCREMENT, LOGINNAME TEXT)")
+        conn.execute("INSERT INTO SYUSER (LOGINNAME) VALUES ('admin')")
+        conn.commit()
+        conn.close()
+
+        class _Config:
+            DATABASE = source
+            REPLAY_SOURCE_DATABASE_URI = source
+            REPLAY_DATABASE_URI = os.path.join(self.root, "replay.db")
+            REPLAY_START_RUN_ID = 2
+            REPLAY_END_RUN_ID = 11
+            REPLAY_FETCH_ROWS = 3
+            REPLAY_PROGRESS_EVERY = 4
+            TEST_PALTFORM_URL = ""
+
+        self.config = _Config
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_iter_cases_streams_in_run_id_order(self):
+        logger = StubLogger()
+        service = ReplayService(logger, self.config)
+        cases = service.iter_cases()
+        first = next(cases)
+        # 取到第一条时只读取了第一批，总数已由 COUNT 得到
+        self.assertEqual(first.run_id, 2)
+        self.assertEqual(service.progress(), (1, 10))
+        self.assertEqual(first.payload["in_data"], [{"name": "in1", "value": 2}])
+        self.assertEqual(first.payload["est_time"], 3)
+
+        rest = list(cases)
+        self.assertEqual([case.run_id for case in rest], [3, 4, 6, 7, 8, 9, 10, 11])
+        self.assertEqual(service.progress(), (10, 10))
+        self.assertIn("Replay progress 4/10", logger.messages)
+        self.assertIn("Replay progress 8/10", logger.messages)
+
+    def test_target_created_from_schema(self):
+        service = ReplayService(StubLogger(), self.config)
+        self.assertEqual(len(service.load_cases()), 9)
+        conn = sqlite3.connect(self.config.REPLAY_DATABASE_URI)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM test_runs").fetchone()[0], 0)
+        self.assertEqual(conn.execute("SELECT LOGINNAME FROM SYUSER").fetchall(), [("admin",)])
+        self.assertEqual(conn.execute("SELECT name, seq FROM sqlite_sequence").fetchall(), [("SYUSER", 1)])
+        indexes = [row[1] for row in conn.execute("PRAGMA index_list('test_runs')").fetchall()]
+        self.assertEqual(indexes, ["ix_test_runs_type"])
+        conn.close()
+
+    def test_existing_target_history_recreated(self):
+        ReplayService(StubLogger(), self.config).load_cases()
+        conn = sqlite3.connect(self.config.REPLAY_DATABASE_URI)
+        conn.execute("INSERT INTO test_runs (run_id, round_id) VALUES (1, 1)")
+        conn.execute("INSERT INTO SYUSER (LOGINNAME) VALUES ('tester')")
+        conn.commit()
+        conn.close()
+
+        ReplayService(StubLogger(), self.config).load_cases()
+        conn = sqlite3.connect(self.config.REPLAY_DATABASE_URI)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM test_runs").fetchone()[0], 0)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM SYUSER").fetchone()[0], 2)
+        indexes = [row[1] for row in conn.execute("PRAGMA index_list('test_runs')").fetchall()]
+        self.assertEqual(indexes, ["ix_test_runs_type"])
+        conn.close()
+
+    def test_checkpoint_advances_over_completed_prefix(self):
+        class _Store:
+            def __init__(self):
+                self.writes = []
+
+            def submit(self, sql, params):
+                self.writes.append(params)
+
+        store = _Store()
+        checkpoint = ReplayCheckpoint(store, "source.db")
+        for run_id in (2, 3, 4):
+            checkpoint.dispatch(run_id)
+        checkpoint.complete(3)
+        self.assertIsNone(checkpoint.completed_run_id)
+        self.assertEqual(store.writes, [])
+        checkpoint.complete(2)
+        self.assertEqual(checkpoint.completed_run_id, 3)
+        checkpoint.complete(4)
+        self.assertEqual(store.writes, [("source.db", 3), ("source.db", 4)])
+
+    def test_resume_keeps_results_keyed_by_source_run_id(self):
+        service = ReplayService(StubLogger(), self.config)
+        cases = service.iter_cases()
+        first = next(cases)
+        checkpoint = service.checkpoint()
+        handler = TestResultHandler(StubLogger(), self.config.REPLAY_DATABASE_URI)
+        for case in itertools.chain([first], itertools.islice(cases, 2)):
+            checkpoint.dispatch(case.run_id)
+            handler.store_test_result(1000, test_data=case.payload, round_id=case.round_id, run_id=case.run_id)
+            checkpoint.complete(case.run_id)
+        # 续跑时重复执行的用例覆盖原记录
+        handler.store_test_result(1500, test_data={"in_data": []}, round_id=1, run_id=4)
+        cases.close()
+        checkpoint.flush()
+
+        self.config.REPLAY_RESUME = True
+        resumed = ReplayService(StubLogger(), self.config)
+        self.assertEqual([case.run_id for case in resumed.iter_cases()], [6, 7, 8, 9, 10, 11])
+        self.assertEqual(resumed.resume_run_id, 4)
+        conn = sqlite3.connect(self.config.REPLAY_DATABASE_URI)
+        rows = conn.execute("SELECT run_id, actual_duration FROM test_runs ORDER BY run_id").fetchall()
+        conn.close()
+        self.assertEqual(rows, [(2, 1000), (3, 1000), (4, 1500)])
+
+        self.config.REPLAY_RESUME = False
+        ReplayService(StubLogger(), self.config).load_cases()
+        conn = sqlite3.connect(self.config.REPLAY_DATABASE_URI)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM test_runs").fetchone()[0], 0)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM replay_checkpoint").fetchone()[0], 0)
+        conn.close()
+
+        # 重新回放写入相同的源 run_id：耗时窗口与检测器从重建后的回放库重新开始
+        logger = StubLogger()
+        rerun = TestResultHandler(logger, self.config.REPLAY_DATABASE_URI)
+        self.assertIsNot(rerun.detector, handler.detector)
+        self.assertIsNot(rerun.durations, handler.durations)
+        rerun.store_test_result(1000, test_data={"in_data": []}, round_id=1, run_id=2)
+        self.assertEqual([row["run_id"] for row in rerun.durations._rows], [2])
+        self.assertEqual(logger.warnings, [])
+        handler.store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from app.services.schema_check import TEST_RUNS_INDEXES, create_missing_indexes, missing_indexes
+
+SCHEMA = """
+CREATE TABLE test_runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, round_id INTEGER, actual_input TEXT,
+    expected_output TEXT, expected_error_output TEXT, expected_stuck_output TEXT, actual_output TEXT,
+    expected_duration INTEGER, actual_duration INTEGER, status INTEGER, type INTEGER, strategy INTEGER);
+"""
+
+
+class SchemaCheckTestCase(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.executescript(SCHEMA)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_old_database_reports_all_indexes(self):
+        self.assertEqual(sorted(missing_indexes(self.conn)), sorted(TEST_RUNS_INDEXES))
+
+    def test_create_missing_indexes(self):
+        created = create_missing_indexes(self.conn)
+        self.assertEqual(sorted(created), sorted(TEST_RUNS_INDEXES))
+        self.assertEqual(missing_indexes(self.conn), [])
+        plan = self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT actual_output FROM test_runs WHERE round_id = 1 AND type = 2 "
+            "ORDER BY run_id ASC LIMIT 1").fetchall()
+        self.assertIn("ix_test_runs_round_type_run", plan[0][3])
+
+    def test_existing_index_with_other_name_counts(self):
+        self.conn.execute("CREATE INDEX legacy_type ON test_runs (type, status)")
+        self.assertNotIn("ix_test_runs_type", missing_indexes(self.conn))
+
+    def test_database_without_test_runs_is_skipped(self):
+        conn = sqlite3.connect(":memory:")
+        self.assertEqual(missing_indexes(conn), [])
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
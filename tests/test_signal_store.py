@@ -0,0 +1,126 @@
+import json
+import math
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from app.services import signal_store
+from app.services.signal_store import SignalStore
+
+
+def _output(**values):
+    return json.dumps({"data": [{"name": name, "value": value} for name, value in values.items()]})
+
+
+class SignalStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "db.db")
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE test_runs (run_id INTEGER PRIMARY KEY, actual_output TEXT)")
+        conn.commit()
+        conn.close()
+        self.store = SignalStore(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _insert(self, rows):
+        conn = sqlite3.connect(self.path)
+        conn.executemany("INSERT INTO test_runs (run_id, actual_output) VALUES (?, ?)", rows)
+        conn.commit()
+        conn.close()
+
+    def test_series_and_pair(self):
+        self._insert([(1, _output(a=1, b=10)), (2, _output(a=2)), (3, "{broken"), (4, _output(a="x", b=40)),
+                      (5, _output(a=5, b=50))])
+        self.assertEqual(self.store.sync(), 5)
+        self.assertEqual(self.store.count, 5)
+        self.assertEqual(self.store.names(), ["a", "b"])
+        self.assertEqual(self.store.run_ids().tolist(), [1, 2, 3, 4, 5])
+        a = self.store.series("a").tolist()
+        self.assertEqual(a[:2] + a[4:], [1.0, 2.0, 5.0])
+        self.assertTrue(math.isnan(a[2]) and math.isnan(a[3]))
+
+        # 非数值在 series 中为 NaN，对比时保留原值
+        self.assertEqual(self.store.texts("a"), {3: "x"})
+        positions, values1, values2 = self.store.pair("a", "b")
+        self.assertEqual(positions.tolist(), [0, 3, 4])
+        self.assertEqual(values1.tolist(), [1.0, "x", 5.0])
+        self.assertEqual(values2.tolist(), [10.0, 40.0, 50.0])
+        positions, _, _ = self.store.pair("a", "b", 1, 5)
+        self.assertEqual(positions.tolist(), [3, 4])
+        positions, values1, _ = self.store.pair("a", "b", 4, 5)
+        self.assertEqual((positions.tolist(), values1.tolist()), ([4], [5.0]))
+        with self.assertRaises(KeyError):
+            self.store.series("missing")
+
+    def test_incremental_sync_and_growth(self):
+        self._insert([(1, _output(a=1))])
+        self.store.sync()
+        with mock.patch.object(signal_store, "INITIAL_ROWS", 2), \
+                mock.patch.object(signal_store, "FETCH_ROWS", 3):
+            self._insert([(run_id, _output(a=run_id, c=-run_id)) for run_id in range(2, 11)])
+            self.assertEqual(self.store.sync(), 9)
+        self.assertEqual(self.store.sync(), 0)
+
+        reopened = SignalStore(self.path)
+        self.assertEqual(reopened.count, 10)
+        self.assertEqual(reopened.series("a").tolist(), [float(i) for i in range(1, 11)])
+        c = reopened.series("c")
+        # 后出现的信号在之前的位置为 NaN
+        self.assertTrue(math.isnan(c[0]))
+        self.assertEqual(c[1:].tolist(), [float(-i) for i in range(2, 11)])
+
+    def test_run_id_gap_waits_before_skipping(self):
+        self._insert([(1, _output(a=1))])
+        self.store.sync()
+        self._insert([(3, _output(a=3))])
+        self.assertEqual(self.store.sync(), 0)
+        with mock.patch.object(signal_store, "GAP_SETTLE_SECONDS", 0):
+            self.assertEqual(self.store.sync(), 1)
+        self.assertEqual(self.store.run_ids().tolist(), [1, 3])
+
+    def test_permanent_gaps_do_not_stop_sync(self):
+        rows = [(run_id, _output(a=run_id)) for run_id in (1, 2, 3, 5, 6, 9, 10)]
+        self._insert(rows)
+        # 离线数据库：空缺直接跳过
+        self.assertEqual(SignalStore(self.path, os.path.join(self.root, "offline")).sync(settle_gaps=False), 7)
+        # 仍在写入的数据库：只等待最新记录附近的空缺，一次等待后所有更早的空缺一起跳过
+        with mock.patch.object(signal_store, "GAP_TAIL_ROWS", 4):
+            self.assertEqual(self.store.sync(), 5)
+            with mock.patch.object(signal_store, "GAP_SETTLE_SECONDS", 0):
+                self.assertEqual(self.store.sync(), 2)
+        self.assertEqual(self.store.run_ids().tolist(), [1, 2, 3, 5, 6, 9, 10])
+
+    def test_sync_refreshes_lock_and_stops_when_lock_is_taken_over(self):
+        self._insert([(run_id, _output(a=run_id)) for run_id in range(1, 7)])
+        lock_path = os.path.join(self.store.directory, "sync.lock")
+        refreshed = []
+        refresh = self.store._refresh_file_lock
+
+        def take_over_after_first_batch():
+            refreshed.append(os.path.getmtime(lock_path))
+            if len(refreshed) == 2:
+                # 其他进程把锁当作过期锁删除并重新获取
+                with open(lock_path, "w", encoding="utf-8") as file:
+                    file.write("other")
+            return refresh()
+
+        with mock.patch.object(signal_store, "FETCH_ROWS", 3), \
+                mock.patch.object(self.store, "_refresh_file_lock", side_effect=take_over_after_first_batch):
+            self.assertEqual(self.store.sync(), 3)
+        self.assertEqual(len(refreshed), 2)
+        # 不删除其他进程的锁
+        with open(lock_path, "r", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "other")
+        os.remove(lock_path)
+        self.assertEqual(self.store.sync(), 3)
+        self.assertFalse(os.path.exists(lock_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
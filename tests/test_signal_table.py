@@ -0,0 +1,53 @@
+import unittest
+
+from app.services.signal_table import SignalTable
+
+MAPPING = {
+    "功耗电流": "dspace_power_current",
+    "整车State状态": "dspace_vehicle_state",
+    "整车模式": "dspace_vehicle_mode",
+}
+EXPECTED = [
+    {"name": "整车State状态", "uuid": "state-uuid", "value": 170},
+    {"name": "功耗电流", "uuid": "current-uuid", "value": 0.01},
+]
+
+
+class SignalTableTestCase(unittest.TestCase):
+    def test_lookup_by_uuid_keeps_raw_value(self):
+        table = SignalTable(MAPPING, EXPECTED)
+        snapshot = table.snapshot({"dspace_vehicle_state": 170, "dspace_power_current": 0.02})
+        self.assertEqual(snapshot.value_by_uuid("state-uuid"), 170)
+        self.assertIsInstance(snapshot.value_by_uuid("state-uuid"), int)
+        self.assertIsNone(snapshot.value_by_uuid("missing"))
+
+    def test_changed_since_last_read(self):
+        table = SignalTable(MAPPING, EXPECTED)
+        first = table.snapshot({"dspace_vehicle_state": 0, "dspace_power_current": 0.01})
+        self.assertEqual(sorted(first.changed_names()), ["功耗电流", "整车State状态"])
+        second = table.snapshot({"dspace_vehicle_state": 30, "dspace_power_current": 0.01})
+        self.assertEqual(second.changed_names(), ["整车State状态"])
+        third = table.snapshot({"dspace_vehicle_state": 30, "dspace_power_current": 0.01})
+        self.assertEqual(third.changed_names(), [])
+        table.reset_baseline()
+        fourth = table.snapshot({"dspace_vehicle_state": 30, "dspace_power_current": 0.01})
+        self.assertTrue(fourth.has_changed(table.uuid_index["state-uuid"]))
+
+    def test_non_numeric_values_compared_raw(self):
+        table = SignalTable(MAPPING, EXPECTED)
+        table.snapshot({"dspace_vehicle_mode": "A"})
+        snapshot = table.snapshot({"dspace_vehicle_mode": "B"})
+        self.assertEqual(snapshot.changed_names(), ["整车模式"])
+
+    def test_records_follow_response_order(self):
+        table = SignalTable(MAPPING, EXPECTED)
+        snapshot = table.snapshot({"dspace_power_current": 0.01, "unknown_signal": 5, "dspace_vehicle_state": 170})
+        self.assertEqual(snapshot.to_records(), [
+            {"name": "功耗电流", "uuid": "current-uuid", "value": 0.01},
+            {"name": "unknown_signal", "uuid": None, "value": 5},
+            {"name": "整车State状态", "uuid": "state-uuid", "value": 170},
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from app.services import sqlite_store
+from app.services.database_handler import TestResultHandler
+from app.services.sqlite_store import SQLiteStore, get_store, resolve_db_path
+from tests import StubLogger
+
+SCHEMA = """
+CREATE TABLE test_runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, round_id INTEGER, actual_input TEXT,
+    expected_output TEXT, expected_error_output TEXT, expected_stuck_output TEXT, actual_output TEXT,
+    expected_duration INTEGER, actual_duration INTEGER, status INTEGER, type INTEGER, strategy INTEGER);
+"""
+
+
+class SQLiteStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "db.db")
+        conn = sqlite3.connect(self.path)
+        conn.executescript(SCHEMA)
+        conn.execute("INSERT INTO test_runs (run_id, round_id) VALUES (7, 1)")
+        conn.commit()
+        conn.close()
+        self.logger = StubLogger()
+        self.store = SQLiteStore(self.path, logger=self.logger, batch_rows=10, batch_ms=1000)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _count(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute("SELECT COUNT(1) FROM test_runs").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_allocate_id_continues_after_max(self):
+        self.assertEqual(self.store.allocate_id("test_runs", "run_id"), 8)
+        self.assertEqual(self.store.allocate_id("test_runs", "run_id"), 9)
+
+    def test_flush_is_a_write_barrier(self):
+        for _ in range(3):
+            run_id = self.store.allocate_id("test_runs", "run_id")
+            self.store.submit("INSERT INTO test_runs (run_id, round_id) VALUES (?, ?)", (run_id, 2))
+        self.assertTrue(self.store.flush(timeout=5))
+        self.assertEqual(self._count(), 4)
+        self.assertEqual(sqlite3.connect(self.path).execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_failed_row_does_not_drop_batch(self):
+        good = self.store.submit("INSERT INTO test_runs (run_id, round_id) VALUES (?, ?)", (20, 2))
+        bad = self.store.submit("INSERT INTO test_runs (run_id, round_id) VALUES (?, ?)", (7, 2))
+        self.store.flush(timeout=5)
+        self.assertEqual(good.result(), 20)
+        self.assertIsInstance(bad.exception(), sqlite3.IntegrityError)
+        self.assertEqual(self._count(), 2)
+        self.assertTrue(self.logger.errors)
+
+    def test_reader_connection_really_closes(self):
+        conn = self.store.connection()
+        self.assertEqual(conn.execute("SELECT COUNT(1) AS cnt FROM test_runs").fetchone()["cnt"], 1)
+        conn.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        other = self.store.connection()
+        self.assertIsNot(other, conn)
+        other.close()
+
+
+class TestResultHandlerStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "db.db")
+        conn = sqlite3.connect(self.path)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+    def tearDown(self):
+        get_store(self.path).close()
+        self.tmp.cleanup()
+
+    def test_store_result_then_latest_round_id(self):
+        handler = TestResultHandler(StubLogger(), "sqlite:///" + self.path)
+        self.assertEqual(resolve_db_path("sqlite:///" + self.path), os.path.abspath(self.path))
+        run_id = handler.store_test_result(123.4, test_data={"in_data": [], "expected_results": []},
+                                           result_data={"data": []}, strategy=0, round_id=5)
+        self.assertEqual(run_id, 1)
+        self.assertEqual(handler.get_latest_round_id(), 5)
+        self.assertEqual(handler.get_test_run_by_id(1)["status"], 1)
+        self.assertEqual(handler.stats.runs, 1)
+
+    def test_read_only_lookup_creates_no_store(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("INSERT INTO test_runs (run_id, round_id, status) VALUES (3, 1, 2)")
+        conn.commit()
+        conn.close()
+        handler = TestResultHandler(StubLogger(), self.path)
+        self.assertEqual(handler.get_test_run_by_id(3)["status"], 2)
+        self.assertIsNone(handler.get_test_run_by_id(4))
+        self.assertNotIn(resolve_db_path(self.path), sqlite_store._stores)
+        self.assertEqual(sqlite3.connect(self.path).execute("PRAGMA journal_mode").fetchone()[0], "delete")
+
+    def test_concurrent_results_detected_in_run_id_order(self):
+        logger = StubLogger()
+        handler = TestResultHandler(logger, self.path)
+        seen = []
+        observe = handler.detector.observe
+
+        def record(row):
+            seen.append(row["run_id"])
+            return observe(row)
+
+        handler.detector.observe = record
+
+        def worker():
+            for _ in range(10):
+                TestResultHandler(logger, self.path).store_test_result(100, test_data={"in_data": []}, round_id=1)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(seen, list(range(1, 41)))
+        self.assertEqual(logger.warnings, [])
+
+    def test_failed_insert_not_counted(self):
+        path = os.path.join(self.tmp.name, "strict.db")
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA.replace("round_id INTEGER", "round_id INTEGER NOT NULL"))
+        conn.close()
+        logger = StubLogger()
+        handler = TestResultHandler(logger, path)
+        handler.store_test_result(100, test_data={"in_data": []}, round_id=1)
+        # round_id 为空违反约束：后台写入失败
+        run_id = handler.store_test_result(200, test_data={"in_data": []})
+        self.assertTrue(handler.flush(timeout=5))
+        self.assertEqual(run_id, 2)
+        self.assertEqual(handler.stats.runs, 1)
+        self.assertEqual([row["run_id"] for row in handler.durations._rows], [1])
+        self.assertTrue(any("run_id = 2" in message for message in logger.errors))
+        handler.store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import time
+import unittest
+
+from app.services.state_waiter import StateWaiter
+
+
+class _Config:
+    READ_INTERVAL_MIN = 10
+    READ_INTERVAL_MAX = 80
+    READ_BACKOFF_FACTOR = 2.0
+    READ_LONG_POLL_MS = 0
+
+
+class StateWaiterTestCase(unittest.TestCase):
+    def test_backoff_grows_until_max(self):
+        waiter = StateWaiter(_Config, timeout=5)
+        intervals = []
+        for reads in waiter.polls():
+            waiter.observe(0)
+            intervals.append(waiter.interval)
+            if reads == 5:
+                break
+        self.assertEqual(intervals[0], 0.01)
+        self.assertEqual(intervals[-1], 0.08)
+
+    def test_state_change_resets_interval(self):
+        waiter = StateWaiter(_Config, timeout=5)
+        polls = waiter.polls()
+        for _ in range(4):
+            next(polls)
+            waiter.observe(0)
+        self.assertGreater(waiter.interval, waiter.interval_min)
+        waiter.observe(30)
+        self.assertEqual(waiter.interval, waiter.interval_min)
+
+    def test_stops_at_timeout(self):
+        waiter = StateWaiter(_Config, timeout=0.2)
+        start = time.time()
+        reads = sum(1 for _ in waiter.polls())
+        self.assertLess(time.time() - start, 0.4)
+        self.assertGreater(reads, 1)
+
+    def test_long_poll_backs_off_when_reads_return_early(self):
+        class _LongPollConfig(_Config):
+            READ_LONG_POLL_MS = 50
+
+        # 平台忽略 waitMs 或读取立即失败：仍按退避间隔休眠，不空转
+        waiter = StateWaiter(_LongPollConfig, timeout=0.3)
+        reads = sum(1 for _ in waiter.polls())
+        self.assertLess(reads, 10)
+
+        # 读取被挂起满长轮询时间：立即再次读取
+        waiter = StateWaiter(_LongPollConfig, timeout=5)
+        polls = waiter.polls()
+        next(polls)
+        time.sleep(0.06)
+        start = time.time()
+        next(polls)
+        self.assertLess(time.time() - start, waiter.interval_min)
+
+    def test_elapsed_uses_read_timestamp(self):
+        waiter = StateWaiter(_Config, timeout=5)
+        next(waiter.polls())
+        self.assertAlmostEqual(waiter.elapsed_ms({"timestamp": waiter.start_time + 0.25}), 250.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,27 +1,22 @@
 import json
 import matplotlib.pyplot as plt
-import sqlite3
 import os
-import numpy as np
 
 # 设置中文字体，确保中文正常显示
 plt.rcParams["font.family"] = ["SimHei"]
 plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
 
+from app.services.signal_store import get_signal_store
+
 SQLALCHEMY_DATABASE_URI = os.path.join('app', 'db.db')
 
 
 class YourDatabaseClass:
-    def get_db_connection(self):
-        conn = sqlite3.connect(SQLALCHEMY_DATABASE_URI)
-        conn.row_factory = sqlite3.Row
-        return conn
-
-    def get_all_test_runs(self):
-        conn = self.get_db_connection()
-        runs = conn.execute('SELECT * FROM test_runs').fetchall()
-        conn.close()
-        return [dict(run) for run in runs]
+    def get_signal_store(self):
+        """列式信号存储：先增量整理数据库中的新记录（run_id 空缺直接跳过，不等待写入）"""
+        store = get_signal_store(SQLALCHEMY_DATABASE_URI)
+        store.sync(settle_gaps=False)
+        return store
 
     def detect_extrema(self, values):
         """
@@ -87,10 +82,14 @@ class YourDatabaseClass:
 
         os.makedirs(save_dir, exist_ok=True)
 
-        # 获取所有测试数据
-        runs = self.get_all_test_runs()
-        total_runs = len(runs)
+        # 从信号存储读取测试数据（每条记录的信号值已整理为按数据序号排列的数组）
+        store = self.get_signal_store()
+        total_runs = store.count
         print(f"总测试数据量: {total_runs} 个")
+        missing = [name for name in (name1, name2) if name not in store.names()]
+        if missing:
+            print(f"⚠️ 信号存储中没有信号: {', '.join(missing)}")
+            return
 
         # 计算批次数量
         batches = [(i, min(i + batch_size, total_runs))
@@ -101,67 +100,19 @@ class YourDatabaseClass:
 
         # 按批次处理数据
         for batch_num, (start_idx, end_idx) in enumerate(batches, 1):
-            batch_runs = runs[start_idx:end_idx]
             print(f"处理第 {batch_num} 批数据 (数据范围: 第{start_idx + 1}个 - 第{end_idx}个)")
 
-            # 收集当前批次中两个信号的数据
-            data = {
-                name1: [],
-                name2: []
-            }
-
-            for idx, run in enumerate(batch_runs):
-                # 数据序号 = 起始索引 + 当前索引 + 1（从1开始计数）
-                data_index = start_idx + idx + 1  # 这就是"第几个数据"
-                run_id = run.get('id', data_index)  # 使用数据序号作为备用run_id
-                actual_output_str = run.get('actual_output', '')
-
-                if not actual_output_str:
-                    continue
-
-                try:
-                    actual_output = json.loads(actual_output_str)
-                    data_list = actual_output.get("data", [])
-                    if not isinstance(data_list, list):
-                        continue
-
-                    # 提取两个目标信号的值
-                    current_values = {name1: None, name2: None}
-                    for item in data_list:
-                        if item.get("name") == name1:
-                            current_values[name1] = item.get("value")
-                        elif item.get("name") == name2:
-                            current_values[name2] = item.get("value")
-
-                    # 只记录两个信号都有值的数据点
-                    if current_values[name1] is not None and current_values[name2] is not None:
-                        data[name1].append((data_index, current_values[name1]))  # 用数据序号作为x轴
-                        data[name2].append((data_index, current_values[name2]))
-
-                except (json.JSONDecodeError, TypeError, ValueError) as e:
-                    print(f"解析出错 (第{data_index}个数据): {e}")
-                    continue
+            # 只取两个信号都有值的数据点，数据序号 = 数组位置 + 1（从1开始计数）
+            positions, values1, values2 = store.pair(name1, name2, start_idx, end_idx)
+            indices = (positions + 1).tolist()
+            common_data1 = list(zip(indices, values1.tolist()))
+            common_data2 = list(zip(indices, values2.tolist()))
 
             # 如果当前批次没有有效数据则跳过
-            if not data[name1] or not data[name2]:
+            if not common_data1:
                 print(f"⚠️ 第 {batch_num} 批无有效数据，跳过绘图")
                 continue
 
-            # 确保数据按数据序号排序
-            for name in data:
-                data[name].sort(key=lambda x: x[0])
-
-            # 找到两个信号在当前批次中的共同数据序号
-            indices1 = {p[0] for p in data[name1]}
-            indices2 = {p[0] for p in data[name2]}
-            common_indices = indices1 & indices2
-
-            # 提取共同数据点
-            common_data1 = [p for p in data[name1] if p[0] in common_indices]
-            common_data2 = [p for p in data[name2] if p[0] in common_indices]
-            common_data1.sort(key=lambda x: x[0])
-            common_data2.sort(key=lambda x: x[0])
-
             # 提取值序列用于趋势分析
             values1 = [p[1] for p in common_data1]
             values2 = [p[1] for p in common_data2]